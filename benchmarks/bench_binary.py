@@ -0,0 +1,81 @@
+"""Compares loading a flexwrf.input from text, from the binary format and from raw arrays.
+
+Synthesizes an input with n_releases releases, writes it as text and with save_binary, and measures
+FlexwrfInput.read, load_binary (read and memory-mapped) and, as the lower bound, np.load of the same release columns
+saved as a plain NPZ archive.
+
+Usage: python benchmarks/bench_binary.py --n_releases 1000000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from flexwrfutils.binary import load_binary, save_binary
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from synthetic import synthesize_input
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading flexwrf.input files in the text and the binary format.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--n_releases", type=int, default=1000000)
+    parser.add_argument("--nspec", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def main():
+    args = get_parser().parse_args()
+    flexwrf_input = synthesize_input(args.n_releases, nspec=args.nspec)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        text_path = Path(tmp_dir) / "flexwrf.input"
+        binary_path = Path(tmp_dir) / "flexwrf.input.npz"
+        raw_path = Path(tmp_dir) / "raw.npz"
+        flexwrf_input.write(text_path)
+        save_binary(flexwrf_input, binary_path)
+        np.savez(
+            raw_path,
+            **{
+                key: release_argument.array.astype(str)
+                if release_argument.array.dtype == object
+                else release_argument.array
+                for key, release_argument in flexwrf_input.releases.release_arguments.items()
+            },
+        )
+
+        def load_raw():
+            with np.load(raw_path) as archive:
+                return {key: archive[key] for key in archive.files}
+
+        results = dict(
+            n_releases=args.n_releases,
+            nspec=args.nspec,
+            text_mb=text_path.stat().st_size / 2**20,
+            binary_mb=binary_path.stat().st_size / 2**20,
+            read_text=best_time(lambda: FlexwrfInput().read(text_path), args.repeat),
+            load_binary=best_time(lambda: load_binary(binary_path), args.repeat),
+            load_binary_mmap=best_time(
+                lambda: load_binary(binary_path, mmap=True), args.repeat
+            ),
+            raw_np_load=best_time(load_raw, args.repeat),
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compares the vectorized time to file assignment of make_AVAILABLE with stepping through the times.
+
+Synthesizes n_files WRF output files with overlapping time ranges that together hold n_timesteps timesteps and
+measures assign_file_indices for both overlap choices. The sequential loop over update_file_index (the former
+assign_files) is measured on the first n_sequential timesteps and extrapolated linearly.
+
+Usage: python benchmarks/bench_make_available.py --n_timesteps 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from flexwrfutils.scripts.make_AVAILABLE import (
+    assign_file_indices,
+    extract_datetime_strings,
+    update_file_index,
+)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the time to file assignment of make_AVAILABLE.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--n_timesteps", type=int, default=1000000)
+    parser.add_argument("--n_files", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=3)
+    parser.add_argument("--n_sequential", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def synthesize_timerange_info(
+    n_timesteps: int, n_files: int, overlap: int
+) -> pd.DataFrame:
+    steps_per_file = max(n_timesteps // n_files, 1)
+    first_steps = np.arange(n_files) * steps_per_file
+    last_steps = np.minimum(first_steps + steps_per_file - 1 + overlap, n_timesteps - 1)
+    start = np.datetime64("2010-01-01T00:00:00")
+    return pd.DataFrame(
+        dict(
+            file_path=[f"wrfout_d01_{i:06d}" for i in range(n_files)],
+            min=start + first_steps.astype("m8[m]"),
+            max=start + last_steps.astype("m8[m]"),
+        )
+    )
+
+
+def sequential_file_indices(times, timerange_info, overlap_choice):
+    file_index = 0
+    file_indices = []
+    for wrf_time in times:
+        file_index = update_file_index(
+            wrf_time, file_index, timerange_info, overlap_choice
+        )
+        file_indices.append(file_index)
+    return file_indices
+
+
+def main():
+    args = get_parser().parse_args()
+    timerange_info = synthesize_timerange_info(
+        args.n_timesteps, args.n_files, args.overlap
+    )
+    times = np.datetime64("2010-01-01T00:00:00") + np.arange(args.n_timesteps).astype(
+        "m8[m]"
+    )
+    minima = timerange_info["min"].to_numpy()
+    maxima = timerange_info["max"].to_numpy()
+    n_sequential = min(args.n_sequential, args.n_timesteps)
+    print(f"{args.n_timesteps} timesteps in {args.n_files} files")
+    for overlap_choice in ["start", "end"]:
+        vectorized = best_time(
+            lambda: assign_file_indices(times, minima, maxima, overlap_choice),
+            args.repeat,
+        )
+        start_time = time.perf_counter()
+        expected = sequential_file_indices(
+            times[:n_sequential], timerange_info, overlap_choice
+        )
+        sequential = (time.perf_counter() - start_time) * (
+            args.n_timesteps / n_sequential
+        )
+        file_indices = assign_file_indices(times, minima, maxima, overlap_choice)
+        assert file_indices[:n_sequential].tolist() == expected
+        print(
+            f"overlap_choice={overlap_choice}: vectorized {vectorized:.4f} s, "
+            f"sequential (extrapolated) {sequential:.1f} s"
+        )
+    strings = best_time(lambda: extract_datetime_strings(times), args.repeat)
+    print(f"extract_datetime_strings: {strings:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measures the memory footprint of FlexwrfInput objects.
+
+Reads the same test file n_inputs times and keeps all objects alive. The traced memory (tracemalloc) divided by
+n_inputs is the footprint of one parsed input. Run it on two revisions to compare them.
+
+Usage: python benchmarks/bench_memory_footprint.py --n_inputs 1000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from pathlib import Path
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+
+EXAMPLES_PATH = Path(__file__).parents[1] / "tests" / "file_examples"
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the memory footprint of FlexwrfInput objects.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--n_inputs", type=int, default=1000)
+    parser.add_argument(
+        "--file_name",
+        type=str,
+        nargs="+",
+        default=["flexwrf.input.backward2", "flexwrf.input.forward2"],
+    )
+    return parser
+
+
+def measure(file_path: Path, n_inputs: int) -> dict:
+    # parse once so that lazily created module and class level objects are not counted
+    FlexwrfInput().read(file_path)
+    gc.collect()
+    tracemalloc.start()
+    inputs = []
+    for i in range(n_inputs):
+        flexwrf_input = FlexwrfInput()
+        flexwrf_input.read(file_path)
+        inputs.append(flexwrf_input)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    empty = FlexwrfInput()
+    return dict(
+        file=file_path.name,
+        n_inputs=n_inputs,
+        bytes_per_input=current / n_inputs,
+        peak_bytes_per_input=peak / n_inputs,
+        n_argument_objects=sum(
+            1
+            for option in empty.options
+            for attribute in vars(option).values()
+            if hasattr(attribute, "_dummyline")
+        ),
+    )
+
+
+def main():
+    args = get_parser().parse_args()
+    for file_name in args.file_name:
+        print(json.dumps(measure(EXAMPLES_PATH / file_name, args.n_inputs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Scaling benchmark of the flexwrf.input hot paths.
+
+Synthesizes inputs for every combination of number of releases, number of species and emitvar and measures wall
+time, peak traced memory and throughput (lines/s) of FlexwrfInput.read, FlexwrfInput.lines, FlexwrfInput.write and
+Releases.add_copy. Every operation is timed without tracing first and then run again with tracemalloc for the peak
+memory. The results are written as JSON together with the versions used, so runs of two revisions can be compared
+with --compare.
+
+Usage:
+    python benchmarks/bench_scaling.py --output scaling.json
+    python benchmarks/bench_scaling.py --n_releases 10 1000 --nspec 1 --output new.json --compare scaling.json
+"""
+import argparse
+import gc
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from synthetic import synthesize_input
+
+OPERATIONS = ["read", "lines", "write", "add_copy"]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Scaling benchmark of FlexwrfInput read, lines, write and Releases.add_copy.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--n_releases", type=int, nargs="+", default=[10, 1000, 100000, 1000000]
+    )
+    parser.add_argument("--nspec", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--emitvar", type=int, nargs="+", default=[0, 1])
+    parser.add_argument(
+        "--operations", type=str, nargs="+", choices=OPERATIONS, default=OPERATIONS
+    )
+    parser.add_argument(
+        "--n_copies",
+        type=int,
+        default=10000,
+        help="Number of Releases.add_copy calls per configuration.",
+    )
+    parser.add_argument(
+        "--max_lines",
+        type=int,
+        default=2 * 10**7,
+        help="Configurations with more lines are skipped.",
+    )
+    parser.add_argument(
+        "--no_memory", action="store_true", help="Skip the traced runs for peak memory."
+    )
+    parser.add_argument("--output", type=str, default="bench_scaling.json")
+    parser.add_argument(
+        "--compare", type=str, default=None, help="Earlier output to compare with."
+    )
+    return parser
+
+
+def estimate_lines(n_releases: int, nspec: int, emitvar: int) -> int:
+    # the releases dominate: 11 lines plus one xmass line per species and release
+    return n_releases * (11 + nspec) + nspec * (1 + 31 * emitvar) + 2 * nspec + 100
+
+
+def count_lines(file_path: Path) -> int:
+    with file_path.open("rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(2**22), b""))
+
+
+def measure(
+    setup: Callable[[], Any], run: Callable[[Any], None], trace_memory: bool
+) -> Dict[str, float]:
+    """Times run(setup()) and optionally measures its peak traced memory in a second run. setup is not measured."""
+    state = setup()
+    gc.collect()
+    start_time = time.perf_counter()
+    run(state)
+    result = dict(seconds=time.perf_counter() - start_time)
+    if trace_memory:
+        state = setup()
+        gc.collect()
+        tracemalloc.start()
+        run(state)
+        result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def run_configuration(
+    n_releases: int,
+    nspec: int,
+    emitvar: int,
+    operations: List[str],
+    n_copies: int,
+    trace_memory: bool,
+) -> List[dict]:
+    def synthesize():
+        return synthesize_input(n_releases, nspec=nspec, emitvar=emitvar)
+
+    def add_copies(flexwrf_input: FlexwrfInput):
+        releases = flexwrf_input.releases
+        for index in copy_indices:
+            releases.add_copy(int(index))
+
+    copy_indices = np.random.default_rng(0).integers(0, n_releases, n_copies)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "flexwrf.input"
+        output_path = Path(tmp_dir) / "flexwrf.input.out"
+        synthesize().write(file_path)
+        n_lines = count_lines(file_path)
+
+        benchmarks = dict(
+            read=(lambda: None, lambda state: FlexwrfInput().read(file_path), n_lines),
+            lines=(synthesize, lambda flexwrf_input: flexwrf_input.lines, n_lines),
+            write=(
+                synthesize,
+                lambda flexwrf_input: flexwrf_input.write(output_path),
+                n_lines,
+            ),
+            add_copy=(synthesize, add_copies, n_copies * (11 + nspec)),
+        )
+        for operation in operations:
+            setup, run, operation_lines = benchmarks[operation]
+            result = measure(setup, run, trace_memory)
+            results.append(
+                dict(
+                    operation=operation,
+                    n_releases=n_releases,
+                    nspec=nspec,
+                    emitvar=emitvar,
+                    n_lines=operation_lines,
+                    lines_per_second=operation_lines / result["seconds"],
+                    **result,
+                )
+            )
+    return results
+
+
+def metadata() -> dict:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return dict(
+        revision=revision,
+        date=datetime.now().isoformat(timespec="seconds"),
+        python=sys.version.split()[0],
+        numpy=np.__version__,
+        platform=platform.platform(),
+    )
+
+
+def compare(results: List[dict], reference_path: Path):
+    with reference_path.open() as f:
+        reference = json.load(f)
+    key_names = ["operation", "n_releases", "nspec", "emitvar"]
+    reference_results = {
+        tuple(result[name] for name in key_names): result
+        for result in reference["results"]
+    }
+    print(
+        f"Compared with {reference_path} (revision {reference['metadata']['revision']}):"
+    )
+    for result in results:
+        key = tuple(result[name] for name in key_names)
+        if key not in reference_results:
+            continue
+        ratio = result["seconds"] / reference_results[key]["seconds"]
+        print(
+            "  {:8} n_releases={:<8} nspec={:<3} emitvar={}: {:.2f}x time".format(
+                *key, ratio
+            )
+        )
+
+
+def main():
+    args = get_parser().parse_args()
+    results = []
+    for n_releases, nspec, emitvar in itertools.product(
+        args.n_releases, args.nspec, args.emitvar
+    ):
+        if estimate_lines(n_releases, nspec, emitvar) > args.max_lines:
+            print(
+                f"skipped n_releases={n_releases} nspec={nspec} emitvar={emitvar}",
+                file=sys.stderr,
+            )
+            continue
+        for result in run_configuration(
+            n_releases,
+            nspec,
+            emitvar,
+            args.operations,
+            args.n_copies,
+            not args.no_memory,
+        ):
+            print(json.dumps(result))
+            results.append(result)
+
+    output_path = Path(args.output)
+    with output_path.open("w") as f:
+        json.dump(dict(metadata=metadata(), results=results), f, indent=2)
+    if args.compare is not None:
+        compare(results, Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Compares formatting and parsing of the fixed-width tables with the former cell by cell approach.
+
+The SPECIES table and the emission variation tables of RELEASES (24 hours and 7 days per species) are filled with
+n_rows random species. "cells" formats every cell with str.format and concatenates the cells, "table" uses the
+FixedWidthTable of the section. Both outputs are checked to be identical.
+
+Usage: python benchmarks/bench_tables.py --n_rows 100 1000 10000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+
+TEMPLATE_PATH = (
+    Path(__file__).parents[1] / "tests" / "file_examples" / "flexwrf.input.forward2"
+)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the fixed-width table formatting.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--n_rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def synthesize_tables(n_rows: int, seed: int = 0) -> FlexwrfInput:
+    rng = np.random.default_rng(seed)
+    flexwrf_input = FlexwrfInput()
+    flexwrf_input.read(TEMPLATE_PATH)
+    species = flexwrf_input.species
+    for argument in species._columns:
+        argument.value = []
+    species.name.extend([f"SPEC{i:<6}" for i in range(n_rows)])
+    for argument in species._columns[1:]:
+        argument.extend(rng.uniform(-9, 9, n_rows).round(2).tolist())
+
+    releases = flexwrf_input.releases
+    releases.link = rng.integers(1, n_rows + 1, n_rows)
+    releases.ihour = np.tile(np.arange(24), (n_rows, 1))
+    releases.area_hour = rng.uniform(0, 2, (n_rows, 24))
+    releases.point_hour = rng.uniform(0, 2, (n_rows, 24))
+    releases.idow = np.tile(np.arange(1, 8), (n_rows, 1))
+    releases.area_dow = rng.uniform(0, 2, (n_rows, 7))
+    releases.point_dow = rng.uniform(0, 2, (n_rows, 7))
+    return flexwrf_input
+
+
+def species_cells(species) -> str:
+    text = ""
+    for values in zip(*[argument.value for argument in species._columns]):
+        line = "    "
+        for argument, value in zip(species._columns, values):
+            if value is None:
+                line += " " * (argument.end_position - argument.start_position)
+            else:
+                line += argument.formatter.format(value)
+        text += line + "\n"
+    return text
+
+
+def emission_cells(releases) -> str:
+    lines = []
+    hour_arguments = [releases.ihour, releases.area_hour, releases.point_hour]
+    dow_arguments = [releases.idow, releases.area_dow, releases.point_dow]
+    for i in range(len(releases.link)):
+        for arguments in [hour_arguments, dow_arguments]:
+            for values in zip(*[argument.value[i] for argument in arguments]):
+                line = "   "
+                for argument, value in zip(arguments, values):
+                    line += argument.formatter.format(value)
+                lines.append(line + "\n")
+    return "".join(lines)
+
+
+def species_table(species) -> str:
+    return species._table.format([argument.value for argument in species._columns])
+
+
+def emission_table(releases) -> str:
+    lines = []
+    for values in zip(
+        releases.ihour.value,
+        releases.area_hour.value,
+        releases.point_hour.value,
+        releases.idow.value,
+        releases.area_dow.value,
+        releases.point_dow.value,
+    ):
+        lines.append(releases._hour_table.format(list(values[:3])))
+        lines.append(releases._dow_table.format(list(values[3:])))
+    return "".join(lines)
+
+
+def best_time(function, argument, repeat: int):
+    durations = []
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        result = function(argument)
+        durations.append(time.perf_counter() - start_time)
+    return min(durations), result
+
+
+def main():
+    args = get_parser().parse_args()
+    for n_rows in args.n_rows:
+        flexwrf_input = synthesize_tables(n_rows)
+        species, releases = flexwrf_input.species, flexwrf_input.releases
+        for section, cells, table, option in [
+            ("species", species_cells, species_table, species),
+            ("emission_variation", emission_cells, emission_table, releases),
+        ]:
+            cells_seconds, cells_text = best_time(cells, option, args.repeat)
+            table_seconds, table_text = best_time(table, option, args.repeat)
+            assert cells_text == table_text
+            lines = table_text.splitlines(keepends=True)
+            start_time = time.perf_counter()
+            if section == "species":
+                parsed = type(species)()
+                parsed.read_lines(["\n", f"{n_rows}\n", "\n"] + lines, 0)
+            else:
+                for argument in [
+                    releases.ihour,
+                    releases.area_hour,
+                    releases.point_hour,
+                ]:
+                    for index in range(0, len(lines), 31):
+                        argument.readcolumn_lines(lines, index)
+            parse_seconds = time.perf_counter() - start_time
+            print(
+                json.dumps(
+                    dict(
+                        section=section,
+                        n_rows=n_rows,
+                        n_lines=len(lines),
+                        cells_seconds=cells_seconds,
+                        table_seconds=table_seconds,
+                        speedup=cells_seconds / table_seconds,
+                        parse_seconds=parse_seconds,
+                    )
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
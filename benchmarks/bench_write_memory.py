@@ -0,0 +1,129 @@
+"""Compares peak memory and time of writing a large flexwrf.input file.
+
+"baseline" runs FlexwrfInput.write of the package at --baseline_ref (by default the first commit of the
+repository), which builds the list of all lines before writing. "stream" uses the buffered streaming
+FlexwrfInput.write and "cached" FlexwrfInput.write(cache=True), which keeps the text of every section for later
+writes.
+
+A synthesized input is written once; every mode then reads it in a fresh process and only the write is measured:
+peak memory with tracemalloc in one process and time without tracing in another.
+
+Usage: python benchmarks/bench_write_memory.py --n_releases 200000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+MODES = ["baseline", "stream", "cached"]
+REPOSITORY = Path(__file__).resolve().parent.parent
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark peak memory of FlexwrfInput.write.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--n_releases", type=int, default=200000)
+    parser.add_argument(
+        "--baseline_ref",
+        type=str,
+        default=None,
+        help="Git revision of the baseline writer. If None, the first commit.",
+    )
+    parser.add_argument("--mode", choices=MODES, default=None, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--measure", choices=["time", "memory"], default=None, help=argparse.SUPPRESS
+    )
+    parser.add_argument("--input_file", type=str, default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+def run_mode(mode: str, measure: str, input_file: Path) -> dict:
+    # imported here, so that the baseline process imports the package from PYTHONPATH
+    from flexwrfutils.flexwrfinput import FlexwrfInput
+
+    flexwrf_input = FlexwrfInput()
+    flexwrf_input.read(input_file)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "flexwrf.input"
+        if measure == "memory":
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        if mode == "cached":
+            flexwrf_input.write(file_path, cache=True)
+        else:
+            flexwrf_input.write(file_path)
+        duration = time.perf_counter() - start_time
+        if measure == "memory":
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return dict(peak_write_mb=peak / 2**20)
+        return dict(seconds=duration, file_mb=file_path.stat().st_size / 2**20)
+
+
+def export_baseline(baseline_ref: str, directory: Path):
+    if baseline_ref is None:
+        baseline_ref = subprocess.run(
+            ["git", "rev-list", "--max-parents=0", "HEAD"],
+            cwd=REPOSITORY,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()[-1]
+    archive = subprocess.run(
+        ["git", "archive", baseline_ref, "flexwrfutils"],
+        cwd=REPOSITORY,
+        check=True,
+        capture_output=True,
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", str(directory)], input=archive, check=True)
+
+
+def main():
+    args = get_parser().parse_args()
+    if args.mode is not None:
+        print(json.dumps(run_mode(args.mode, args.measure, Path(args.input_file))))
+        return
+
+    from synthetic import synthesize_input
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_file = Path(tmp_dir) / "flexwrf.input"
+        synthesize_input(args.n_releases).write(input_file)
+        baseline_directory = Path(tmp_dir) / "baseline"
+        baseline_directory.mkdir()
+        export_baseline(args.baseline_ref, baseline_directory)
+
+        for mode in MODES:
+            python_path = baseline_directory if mode == "baseline" else REPOSITORY
+            environment = dict(os.environ, PYTHONPATH=str(python_path))
+            result = dict(mode=mode, n_releases=args.n_releases)
+            for measure in ["time", "memory"]:
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--mode",
+                        mode,
+                        "--measure",
+                        measure,
+                        "--input_file",
+                        str(input_file),
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                    env=environment,
+                ).stdout
+                result.update(json.loads(output))
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
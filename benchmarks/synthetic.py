@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+
+TEMPLATE_PATH = (
+    Path(__file__).parents[1] / "tests" / "file_examples" / "flexwrf.input.backward2"
+)
+
+
+def set_species(flexwrf_input: FlexwrfInput, nspec: int, emitvar: int, seed: int = 0):
+    """Replaces the species of a FlexwrfInput by nspec copies of its first species, all of them released.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input without releases.
+        nspec (int): Number of species.
+        emitvar (int): 1 to add random emission variation tables, 0 without.
+        seed (int, optional): Seed for the emission variation factors. Defaults to 0.
+    """
+    rng = np.random.default_rng(seed)
+    species = flexwrf_input.species
+    for argument in species._columns:
+        first_value = argument[0]
+        argument.value = []
+        argument.extend([first_value] * nspec)
+    species.name.value = [f"SPEC{i:<6}" for i in range(nspec)]
+
+    releases = flexwrf_input.releases
+    releases.nspec = nspec
+    releases.link = np.arange(1, nspec + 1)
+    releases.emitvar = emitvar
+    releases.ihour = np.tile(np.arange(24), (nspec, 1)) if emitvar else []
+    releases.area_hour = rng.uniform(0, 2, (nspec, 24)) if emitvar else []
+    releases.point_hour = rng.uniform(0, 2, (nspec, 24)) if emitvar else []
+    releases.idow = np.tile(np.arange(1, 8), (nspec, 1)) if emitvar else []
+    releases.area_dow = rng.uniform(0, 2, (nspec, 7)) if emitvar else []
+    releases.point_dow = rng.uniform(0, 2, (nspec, 7)) if emitvar else []
+
+
+def synthesize_input(
+    n_releases: int,
+    seed: int = 0,
+    nspec: Optional[int] = None,
+    emitvar: Optional[int] = None,
+) -> FlexwrfInput:
+    """Creates a FlexwrfInput with n_releases random releases based on a test file.
+
+    Args:
+        n_releases (int): Number of releases.
+        seed (int, optional): Seed for the random coordinates. Defaults to 0.
+        nspec (Optional[int], optional): Number of species. Defaults to None (species of the test file).
+        emitvar (Optional[int], optional): Emission variation flag, only used with nspec. Defaults to None (0).
+
+    Returns:
+        FlexwrfInput: Synthetic input.
+    """
+    rng = np.random.default_rng(seed)
+    flexwrf_input = FlexwrfInput()
+    flexwrf_input.read(TEMPLATE_PATH)
+    releases = flexwrf_input.releases
+    releases.clear()
+    if nspec is not None:
+        set_species(flexwrf_input, nspec, emitvar or 0, seed)
+
+    start = np.datetime64("2010-05-18T00:00:00") + rng.integers(
+        0, 86400, n_releases
+    ).astype("timedelta64[s]")
+    xpoint1 = rng.uniform(-120, -115, n_releases)
+    ypoint1 = rng.uniform(32, 36, n_releases)
+    zpoint1 = rng.uniform(0, 1000, n_releases)
+    releases.extend(
+        start=start,
+        stop=start + np.timedelta64(3600, "s"),
+        xpoint1=xpoint1,
+        ypoint1=ypoint1,
+        xpoint2=xpoint1 + 0.02,
+        ypoint2=ypoint1 + 0.02,
+        kindz=1,
+        zpoint1=zpoint1,
+        zpoint2=zpoint1 + 10,
+        npart=rng.integers(100, 10000, n_releases),
+        xmass=rng.uniform(0, 1, (n_releases, releases.nspec.value)),
+        name=np.char.add("release", np.arange(n_releases).astype(str)).astype(object),
+    )
+    return flexwrf_input
@@ -1,2 +1,3 @@
 from .flexwrfinput import FlexwrfInput
 from .flexwrfoutput import combine, add_osm_subplot, FlexwrfOutput
+from .cache import ParseCache
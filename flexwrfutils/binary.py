@@ -0,0 +1,155 @@
+import io
+import json
+import struct
+import zipfile
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from .flexwrfinput import FlexwrfInput
+
+# bump whenever the layout of the binary files changes
+FORMAT_VERSION = 1
+HEADER_NAME = "header.json"
+# sections without per release columns are stored as their text in the header
+TEXT_SECTIONS = [
+    "pathnames",
+    "command",
+    "ageclasses",
+    "outgrid",
+    "outgrid_nest",
+    "receptor",
+    "species",
+]
+TABLE_NAMES = ["ihour", "area_hour", "point_hour", "idow", "area_dow", "point_dow"]
+
+
+def save_binary(flexwrf_input: FlexwrfInput, file_path: Union[str, Path]):
+    """Saves an input losslessly in a binary format.
+
+    The file is an uncompressed NPZ archive with one array per release argument (xmass of shape (numpoint, nspec))
+    and a JSON header with the other sections and the species settings of the releases. The file is replaced
+    atomically.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input to save.
+        file_path (Union[str, Path]): Path of the file, usually with the suffix .npz.
+    """
+    file_path = Path(file_path)
+    releases = flexwrf_input.releases
+    header = dict(
+        format_version=FORMAT_VERSION,
+        sections={name: getattr(flexwrf_input, name).text for name in TEXT_SECTIONS},
+        releases=dict(
+            emitvar=releases.emitvar.value,
+            link=releases.link.value,
+            tables={name: getattr(releases, name).value for name in TABLE_NAMES},
+        ),
+    )
+    tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr(HEADER_NAME, json.dumps(header))
+        for key, release_argument in releases.release_arguments.items():
+            array = release_argument.array
+            if array.dtype == object:
+                array = array.astype(str)
+            # stored members can be memory-mapped, see _map_array
+            with archive.open(f"{key}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(
+                    f, np.ascontiguousarray(array), allow_pickle=False
+                )
+    tmp_path.replace(file_path)
+
+
+def _map_array(file_path: Path, info: zipfile.ZipInfo) -> np.ndarray:
+    with file_path.open("rb") as f:
+        # the local file header has a fixed size of 30 bytes followed by the name and an extra field
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    # copy-on-write: changes of the arrays are not written back to the file
+    return np.memmap(
+        file_path,
+        dtype=dtype,
+        mode="c",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+def load_binary(file_path: Union[str, Path], mmap: bool = False) -> FlexwrfInput:
+    """Loads an input saved with save_binary.
+
+    Args:
+        file_path (Union[str, Path]): Path of the file.
+        mmap (bool, optional): Whether to memory-map the release columns instead of reading them. Changes of
+            mapped values are not written to the file. The names of the releases are always read. Defaults to False.
+
+    Raises:
+        ValueError: If the file was saved in another format version.
+
+    Returns:
+        FlexwrfInput: Loaded input.
+    """
+    file_path = Path(file_path)
+    flexwrf_input = FlexwrfInput()
+    with zipfile.ZipFile(file_path) as archive:
+        header = json.loads(archive.read(HEADER_NAME))
+        if header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"{file_path} has format version {header.get('format_version')}, expected {FORMAT_VERSION}."
+            )
+        for name in TEXT_SECTIONS:
+            text = header["sections"][name]
+            if text:
+                getattr(flexwrf_input, name).read_lines(
+                    io.StringIO(text).readlines(), 0
+                )
+
+        releases = flexwrf_input.releases
+        release_header = header["releases"]
+        releases.emitvar = release_header["emitvar"]
+        releases.link.extend(release_header["link"])
+        if releases.emitvar.value == 1:
+            for name in TABLE_NAMES:
+                getattr(releases, name).value = release_header["tables"][name]
+        for key, release_argument in releases.release_arguments.items():
+            member = f"{key}.npy"
+            if mmap and key != "name":
+                array = _map_array(file_path, archive.getinfo(member))
+            else:
+                with archive.open(member) as f:
+                    array = np.lib.format.read_array(f, allow_pickle=False)
+            if key == "name":
+                array = array.astype(object)
+            release_argument.set_array(array)
+    return flexwrf_input
+
+
+def convert(source: Union[str, Path], destination: Union[str, Path]):
+    """Converts an input between the text and the binary format.
+
+    Sources with the suffix .npz are read with load_binary and written as text, all other sources are read as text
+    and saved with save_binary.
+
+    Args:
+        source (Union[str, Path]): Path of the file to convert.
+        destination (Union[str, Path]): Path of the converted file.
+    """
+    source = Path(source)
+    if source.suffix == ".npz":
+        load_binary(source).write(destination)
+        return
+    flexwrf_input = FlexwrfInput()
+    flexwrf_input.read(source)
+    save_binary(flexwrf_input, destination)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# bump whenever the pickled layout of FlexwrfInput changes
+CACHE_VERSION = 5
+DEFAULT_CACHE_DIRECTORY = Path.home() / ".cache" / "flexwrfutils"
+
+
+def hash_file(file_path: Union[str, Path], chunk_size: int = 2**22) -> str:
+    """Computes a BLAKE2b hash of the content of a file.
+
+    Args:
+        file_path (Union[str, Path]): Path to the file.
+        chunk_size (int, optional): Number of bytes read at once. Defaults to 2**22.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with Path(file_path).open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of parsed files.
+
+    Entries are pickled objects keyed by path, size, mtime and content hash of the parsed file. The least recently
+    used entries are removed once the cache grows beyond max_size bytes. Only use directories that no one else can
+    write to, since entries are unpickled on load.
+
+    Args:
+        directory (Optional[Union[str, Path]], optional): Directory of the cache. Defaults to the environment variable
+            FLEXWRFUTILS_CACHE_DIR or ~/.cache/flexwrfutils.
+        max_size (int, optional): Maximal total size of the entries in bytes. Defaults to 2**30.
+        enabled (bool, optional): If False, load always misses and store does nothing. Defaults to True.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_size: int = 2**30,
+        enabled: bool = True,
+    ):
+        if directory is None:
+            directory = os.environ.get(
+                "FLEXWRFUTILS_CACHE_DIR", DEFAULT_CACHE_DIRECTORY
+            )
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.enabled = enabled
+
+    def key(self, file_path: Union[str, Path]) -> str:
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        key_string = "|".join(
+            [
+                str(CACHE_VERSION),
+                str(file_path),
+                str(stat.st_size),
+                str(stat.st_mtime_ns),
+                hash_file(file_path),
+            ]
+        )
+        return hashlib.blake2b(key_string.encode(), digest_size=20).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def load(self, file_path: Union[str, Path]) -> Optional[Any]:
+        """Returns the cached object for a file or None if there is no valid entry."""
+        if not self.enabled:
+            return None
+        entry_path = self.entry_path(self.key(file_path))
+        try:
+            with entry_path.open("rb") as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            entry_path.unlink(missing_ok=True)
+            return None
+        # mark entry as recently used
+        os.utime(entry_path)
+        return cached
+
+    def store(self, file_path: Union[str, Path], obj: Any):
+        """Stores the parsed object of a file and evicts old entries if necessary."""
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry_path = self.entry_path(self.key(file_path))
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def entries(self):
+        return list(self.directory.glob(f"*{self.suffix}"))
+
+    @property
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits into max_size."""
+        entries = []
+        for entry in self.entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total_size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+    def clear(self):
+        for entry in self.entries():
+            entry.unlink(missing_ok=True)
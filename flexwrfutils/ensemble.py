@@ -0,0 +1,203 @@
+import copy
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .fileutils import set_default_mode
+from .flexwrfinput import (
+    DynamicSpecifierArgument,
+    FlexwrfInput,
+    NestedSpecifierArgument,
+)
+
+_worker_base: Optional[FlexwrfInput] = None
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Expands a parameter grid into the list of all combinations.
+
+    Args:
+        grid (Dict[str, Sequence[Any]]): Values to use for each parameter, e.g. {"command.turboption": [1, 2]}.
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary of overrides per combination.
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def apply_overrides(flexwrf_input: FlexwrfInput, overrides: Dict[str, Any]):
+    """Sets arguments of a FlexwrfInput in place.
+
+    Keys are "<option>.<argument>" (e.g. "command.outputrate" or "releases.zpoint1"). Values are assigned through the
+    setters of the options. Scalars given for arguments with one value per entry (e.g. release heights) are used for
+    every entry. Callables are called with the current argument and their return value is assigned.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input to modify.
+        overrides (Dict[str, Any]): Values to set.
+    """
+    for key, value in overrides.items():
+        option_name, argument_name = key.split(".")
+        option = getattr(flexwrf_input, option_name)
+        argument = getattr(option, argument_name)
+        if callable(value):
+            value = value(argument)
+        if isinstance(argument, NestedSpecifierArgument) and np.ndim(value) < 2:
+            value = np.broadcast_to(
+                value, (argument.specifier1.value, argument.specifier2.value)
+            )
+        elif isinstance(argument, DynamicSpecifierArgument) and np.ndim(value) == 0:
+            value = [value] * argument.specifier.value
+        setattr(option, argument_name, value)
+
+
+def build_variant(
+    base: FlexwrfInput,
+    overrides: Dict[str, Any],
+    run_directory: Optional[Union[str, Path]] = None,
+) -> FlexwrfInput:
+    """Copies base and applies the overrides to the copy.
+
+    Args:
+        base (FlexwrfInput): Template input. It is not modified.
+        overrides (Dict[str, Any]): Values to set (see apply_overrides).
+        run_directory (Optional[Union[str, Path]], optional): If given, used as output path of the variant. Defaults to None.
+
+    Returns:
+        FlexwrfInput: Modified copy.
+    """
+    variant = copy.deepcopy(base)
+    apply_overrides(variant, overrides)
+    if run_directory is not None:
+        variant.pathnames.outputpath = run_directory
+    return variant
+
+
+def write_atomic(flexwrf_input: FlexwrfInput, file_path: Union[str, Path]):
+    """Writes to a temporary file next to file_path and renames it, so file_path is either complete or absent."""
+    file_path = Path(file_path)
+    file_descriptor, tmp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    os.close(file_descriptor)
+    try:
+        flexwrf_input.write(tmp_path)
+        set_default_mode(tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _init_worker(base: FlexwrfInput):
+    global _worker_base
+    _worker_base = base
+
+
+def _write_variant(
+    overrides: Dict[str, Any],
+    run_directory: Path,
+    file_name: str,
+    set_outputpath: bool,
+    base: Optional[FlexwrfInput] = None,
+) -> str:
+    base = _worker_base if base is None else base
+    run_directory.mkdir(parents=True, exist_ok=True)
+    variant = build_variant(base, overrides, run_directory if set_outputpath else None)
+    file_path = run_directory / file_name
+    write_atomic(variant, file_path)
+    return str(file_path)
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _resolve_callables(base: FlexwrfInput, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    resolved = {}
+    for key, value in overrides.items():
+        if callable(value):
+            option_name, argument_name = key.split(".")
+            value = value(getattr(getattr(base, option_name), argument_name))
+        resolved[key] = value
+    return resolved
+
+
+def write_ensemble(
+    base: FlexwrfInput,
+    variants: List[Dict[str, Any]],
+    output_directory: Union[str, Path],
+    workers: Optional[int] = None,
+    file_name: str = "flexwrf.input",
+    run_name: str = "run_{:04d}",
+    set_outputpath: bool = True,
+) -> Path:
+    """Writes one input file per variant into its own run directory and a manifest of all runs.
+
+    The base input is sent once to every worker process; the variants are built there from copies of it. Callable
+    overrides are called in the current process with the argument of base, so they do not have to be picklable,
+    and the manifest records the values they returned.
+
+    Args:
+        base (FlexwrfInput): Template input.
+        variants (List[Dict[str, Any]]): Overrides per run (see apply_overrides and parameter_grid).
+        output_directory (Union[str, Path]): Directory in which the run directories are created.
+        workers (Optional[int], optional): Number of worker processes. 1 writes in the current process.
+            Defaults to None (number of CPUs).
+        file_name (str, optional): Name of the input file in each run directory. Defaults to "flexwrf.input".
+        run_name (str, optional): Format string for the run directories, formatted with the run index. Defaults to "run_{:04d}".
+        set_outputpath (bool, optional): Whether to set the output path of each run to its run directory. Without
+            it, all runs write their output to the output path of base. Defaults to True.
+
+    Returns:
+        Path: Path of the manifest (manifest.json in output_directory).
+    """
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+    variants = [_resolve_callables(base, overrides) for overrides in variants]
+    run_directories = [
+        output_directory / run_name.format(i) for i in range(len(variants))
+    ]
+    arguments = [
+        (overrides, run_directory, file_name, set_outputpath)
+        for overrides, run_directory in zip(variants, run_directories)
+    ]
+
+    if workers == 1 or len(arguments) == 0:
+        file_paths = [_write_variant(*argument, base=base) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(base,)
+        ) as executor:
+            file_paths = list(executor.map(_write_variant, *zip(*arguments)))
+
+    manifest = [
+        dict(
+            run=run_directory.name,
+            directory=str(run_directory),
+            file=file_path,
+            parameters={key: _to_json(value) for key, value in overrides.items()},
+        )
+        for overrides, run_directory, file_path in zip(
+            variants, run_directories, file_paths
+        )
+    ]
+    manifest_path = output_directory / "manifest.json"
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
@@ -0,0 +1,32 @@
+import os
+import re
+
+
+def _read_umask() -> int:
+    # /proc shows the umask without changing it, elsewhere it has to be set and restored once
+    try:
+        with open("/proc/self/status") as f:
+            match = re.search(r"^Umask:\s*([0-7]+)$", f.read(), re.MULTILINE)
+        if match:
+            return int(match.group(1), 8)
+    except OSError:
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# read once at import, so that writing files never changes the umask of the process
+UMASK = _read_umask()
+
+
+def set_default_mode(file_path):
+    """Gives a file the mode open() would have created it with (0o666 minus the umask).
+
+    Files created with tempfile.mkstemp are only readable by their owner, which would be kept when they are renamed
+    to their final path.
+
+    Args:
+        file_path (Union[str, Path]): Path of the file.
+    """
+    os.chmod(file_path, 0o666 & ~UMASK)
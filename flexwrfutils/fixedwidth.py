@@ -0,0 +1,161 @@
+import itertools
+import re
+from typing import Any, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+_FORMATTER_PATTERN = re.compile(
+    r"^\{:(?P<width>\d*)(?:\.(?P<precision>\d+))?(?P<kind>[a-zA-Z]?)\}$"
+)
+
+
+def to_printf_format(formatter: str, type=float) -> str:
+    """Converts a str.format field like "{:10.1f}" to the equivalent printf style field like "%10.1f".
+
+    Fields without a presentation type are formatted like str.format does it for the given type: strings are
+    left aligned, numbers right aligned.
+
+    Args:
+        formatter (str): Format field with a width and optional precision and presentation type.
+        type (optional): Type of the formatted values. Defaults to float.
+
+    Raises:
+        ValueError: If the formatter has no printf equivalent.
+
+    Returns:
+        str: printf style field.
+    """
+    match = _FORMATTER_PATTERN.match(formatter)
+    if match is None:
+        raise ValueError(f"Formatter '{formatter}' can not be converted.")
+    width, precision, kind = match.group("width", "precision", "kind")
+    if precision is not None:
+        width = f"{width}.{precision}"
+    if kind:
+        return f"%{width}{kind}"
+    if type is str:
+        return f"%-{width}s"
+    if type is int:
+        return f"%{width}d"
+    raise ValueError(f"Formatter '{formatter}' needs a presentation type for {type}.")
+
+
+class FixedWidthTable:
+    """Formats tables with one fixed-width column per argument.
+
+    The row format is compiled once, whole tables are formatted with a single %-operation per chunk of rows. The
+    output is the same as formatting every cell with str.format and concatenating the cells.
+
+    Args:
+        formatters (List[str]): str.format field of every column (e.g. "{:10.1f}").
+        types (List[Any]): Type of every column.
+        positions (Optional[List[tuple]], optional): (start, end) character positions of every column. Only
+            needed for columns with missing (None) values, which are left blank. Defaults to None.
+        prefix (str, optional): Characters in front of the first column. Defaults to "".
+        suffix (str, optional): Characters after the last column. Defaults to "\\n".
+    """
+
+    def __init__(
+        self,
+        formatters: List[str],
+        types: List[Any],
+        positions: Optional[List[tuple]] = None,
+        prefix: str = "",
+        suffix: str = "\n",
+    ):
+        self.formatters = formatters
+        self.types = types
+        self.positions = positions
+        self.printf_formats = [
+            to_printf_format(formatter, type)
+            for formatter, type in zip(formatters, types)
+        ]
+        self.prefix = prefix
+        self.suffix = suffix
+        self.row_format = prefix + "".join(self.printf_formats) + suffix
+
+    def _blank_cells(self, column: Sequence, index: int) -> Optional[List[str]]:
+        # columns with missing values are formatted cell by cell, missing cells are left blank
+        if not any(value is None for value in column):
+            return None
+        start, end = self.positions[index]
+        return [
+            " " * (end - start) if value is None else self.printf_formats[index] % value
+            for value in column
+        ]
+
+    def format(self, columns: List[Sequence]) -> str:
+        """Formats the rows of the given columns.
+
+        Args:
+            columns (List[Sequence]): Values of every column, all of the same length. None cells are left blank
+                if positions are given.
+
+        Returns:
+            str: Formatted rows.
+        """
+        columns = [
+            column.tolist() if isinstance(column, np.ndarray) else column
+            for column in columns
+        ]
+        n_rows = len(columns[0]) if columns else 0
+        if n_rows == 0:
+            return ""
+        row_format = self.row_format
+        if self.positions is not None:
+            printf_formats = list(self.printf_formats)
+            for i, column in enumerate(columns):
+                cells = self._blank_cells(column, i)
+                if cells is not None:
+                    columns[i] = cells
+                    printf_formats[i] = "%s"
+            row_format = self.prefix + "".join(printf_formats) + self.suffix
+        values = tuple(itertools.chain.from_iterable(zip(*columns)))
+        return (row_format * n_rows) % values
+
+    def iter_lines(
+        self, columns: List[Sequence], chunksize: int = 10000
+    ) -> Iterator[str]:
+        """Yields the formatted rows one by one, formatting chunksize rows at once."""
+        n_rows = len(columns[0]) if columns else 0
+        for start in range(0, n_rows, chunksize):
+            text = self.format(
+                [column[start : start + chunksize] for column in columns]
+            )
+            yield from text.splitlines(keepends=True)
+
+
+def parse_fixed_width(
+    lines: List[str], start: int, end: int, type=float, allow_blank: bool = False
+) -> list:
+    """Parses the column between the character positions start and end of the given lines at once.
+
+    Args:
+        lines (List[str]): Lines of the table.
+        start (int): First character of the column.
+        end (int): End of the column (exclusive).
+        type (optional): Type of the values. Strings are kept as they are, including spaces. Defaults to float.
+        allow_blank (bool, optional): Whether blank cells are allowed. They are returned as None. Defaults to False.
+
+    Returns:
+        list: Values of the column.
+    """
+    snippets = [line[start:end] for line in lines]
+    if not allow_blank:
+        return _cast(snippets, type)
+    is_blank = [snippet.strip() == "" for snippet in snippets]
+    if not any(is_blank):
+        return _cast(snippets, type)
+    values = iter(
+        _cast(
+            [snippet for snippet, blank in zip(snippets, is_blank) if not blank], type
+        )
+    )
+    return [None if blank else next(values) for blank in is_blank]
+
+
+def _cast(snippets: List[str], type) -> list:
+    # map is faster than casting arrays of strings with NumPy
+    if type is str:
+        return snippets
+    return list(map(type, snippets))
@@ -1,9 +1,21 @@
-from typing import TextIO, Any, List, Union
+import copy
+import heapq
+import io
+import mmap
+import time
+from typing import TextIO, Any, Dict, Iterator, List, Literal, Optional, Union
 from pathlib import Path
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
 
+from . import profiling
+from .cache import ParseCache
+from .fixedwidth import FixedWidthTable, parse_fixed_width
+
+
+DATETIME_FORMAT = "%Y%m%d %H%M%S"
+
 
 def peek_line(f: TextIO):
     pos = f.tell()
@@ -12,11 +24,242 @@ def peek_line(f: TextIO):
     return line
 
 
+def scan_section_offsets(file_path: Union[str, Path]) -> List[int]:
+    """Finds the byte offsets of the "====" lines of a flexwrf.input file.
+
+    The scan stops at the header following the SPECIES header (the RELEASES header), so the releases are not scanned.
+
+    Args:
+        file_path (Union[str, Path]): Path to the file.
+
+    Returns:
+        List[int]: Byte offsets of the beginnings of the lines.
+    """
+    offsets = []
+    with Path(file_path).open("rb") as f:
+        if Path(file_path).stat().st_size == 0:
+            return offsets
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            after_species = False
+            position = mapped_file.find(b"====")
+            while position != -1:
+                line_start = mapped_file.rfind(b"\n", 0, position) + 1
+                line_end = mapped_file.find(b"\n", position)
+                offsets.append(line_start)
+                if after_species:
+                    break
+                after_species = b"SPECIES" in mapped_file[line_start:line_end]
+                if line_end == -1:
+                    break
+                position = mapped_file.find(b"====", line_end)
+    return offsets
+
+
+def _string_to_datetime64(string: str) -> np.datetime64:
+    string = string.strip()
+    try:
+        return np.datetime64(datetime.strptime(string, DATETIME_FORMAT), "s")
+    except ValueError:
+        return np.datetime64(string, "s")
+
+
+def strings_to_datetime64(strings: Union[List[str], np.ndarray]) -> np.ndarray:
+    """Converts "YYYYMMDD HHMISS" strings as used in flexwrf.input files to datetime64[s].
+
+    Args:
+        strings (Union[List[str], np.ndarray]): Datetime strings.
+
+    Returns:
+        np.ndarray: Array of dtype datetime64[s].
+    """
+    strings = np.asarray(strings, dtype=str).reshape(-1)
+    if len(strings) == 0:
+        return np.empty(0, dtype="datetime64[s]")
+    if (np.char.str_len(strings) == 15).all():
+        chars = strings.astype("S15").view(np.uint8).reshape(-1, 15)
+        if (chars[:, 8] == ord(" ")).all():
+            iso_chars = np.empty((len(strings), 19), dtype=np.uint8)
+            iso_chars[:, [0, 1, 2, 3, 5, 6, 8, 9]] = chars[:, :8]
+            iso_chars[:, [11, 12, 14, 15, 17, 18]] = chars[:, 9:]
+            iso_chars[:, [4, 7]] = ord("-")
+            iso_chars[:, 10] = ord("T")
+            iso_chars[:, [13, 16]] = ord(":")
+            return iso_chars.view("S19").reshape(-1).astype("datetime64[s]")
+    return np.array(
+        [_string_to_datetime64(string) for string in strings], dtype="datetime64[s]"
+    )
+
+
+def datetime64_to_strings(times: np.ndarray) -> np.ndarray:
+    """Converts datetime64 values to "YYYYMMDD HHMISS" strings as used in flexwrf.input files.
+
+    Args:
+        times (np.ndarray): Datetime values (anything accepted by np.asarray with dtype datetime64[s]).
+
+    Returns:
+        np.ndarray: Array of strings.
+    """
+    times = np.asarray(times, dtype="datetime64[s]").reshape(-1)
+    iso_strings = np.datetime_as_string(times, unit="s")
+    if len(times) == 0 or not (np.char.str_len(iso_strings) == 19).all():
+        return np.array(
+            [pd.to_datetime(time).strftime(DATETIME_FORMAT) for time in times],
+            dtype=str,
+        )
+    iso_chars = iso_strings.astype("S19").view(np.uint8).reshape(-1, 19)
+    chars = np.empty((len(times), 15), dtype=np.uint8)
+    chars[:, :8] = iso_chars[:, [0, 1, 2, 3, 5, 6, 8, 9]]
+    chars[:, 8] = ord(" ")
+    chars[:, 9:] = iso_chars[:, [11, 12, 14, 15, 17, 18]]
+    return chars.view("S15").reshape(-1).astype(str)
+
+
+def to_datetime_strings(values: Any) -> List[str]:
+    """Converts datetime values to "YYYYMMDD HHMISS" strings. Strings are kept as they are.
+
+    Arrays of dtype datetime64 and DatetimeIndex objects are converted as a whole.
+
+    Args:
+        values (Any): Sequence of strings, datetimes or datetime64 values.
+
+    Returns:
+        List[str]: Datetime strings.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return datetime64_to_strings(array).tolist()
+    if array.dtype.kind == "U":
+        return array.reshape(-1).tolist()
+    array = array.reshape(-1)
+    is_string = np.array([isinstance(value, str) for value in array], dtype=bool)
+    strings = array.astype(object)
+    if (~is_string).any():
+        strings[~is_string] = datetime64_to_strings(to_datetime64(array[~is_string]))
+    return strings.tolist()
+
+
+def to_datetime64(values: Any) -> np.ndarray:
+    """Converts strings, datetimes, datetime64 values or a DatetimeIndex to a datetime64[s] array.
+
+    Args:
+        values (Any): Single value or sequence of values. Strings have to be in the "YYYYMMDD HHMISS" or ISO format.
+
+    Returns:
+        np.ndarray: Array of dtype datetime64[s].
+    """
+    if isinstance(values, (str, datetime, np.datetime64)):
+        values = [values]
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[s]").reshape(-1)
+    if array.dtype.kind in "US":
+        return strings_to_datetime64(array.astype(str))
+    new_values = []
+    for value in array.reshape(-1):
+        if isinstance(value, str):
+            new_values.append(_string_to_datetime64(value))
+        else:
+            new_values.append(np.datetime64(value, "s"))
+    return np.array(new_values, dtype="datetime64[s]")
+
+
+def _counted(lines: Iterator[str], counts: List[int]) -> Iterator[str]:
+    # counts lines and characters of a stream for the profiling of streamed writes
+    for line in lines:
+        counts[0] += 1
+        counts[1] += len(line)
+        yield line
+
+
+def _coerce_datetime64(values: np.ndarray) -> np.ndarray:
+    try:
+        return to_datetime64(values)
+    except (ValueError, TypeError):
+        # only bad input gets here, the invalid values become NaT
+        array = np.empty(len(values), dtype="datetime64[s]")
+        for i, value in enumerate(values):
+            try:
+                array[i] = to_datetime64(value)[0]
+            except (ValueError, TypeError):
+                array[i] = np.datetime64("NaT")
+        return array
+
+
+def frame_to_columns(
+    frame: pd.DataFrame, types: Dict[str, Any], allow_missing: bool = False
+) -> Dict[str, np.ndarray]:
+    """Converts the columns of a DataFrame to typed arrays and reports all invalid columns and values at once.
+
+    Args:
+        frame (pd.DataFrame): DataFrame with exactly the columns in types.
+        types (Dict[str, Any]): Type of every column: int, float, str or "datetime64[s]".
+        allow_missing (bool, optional): Whether NaN/None values are allowed (they are kept as NaN or None).
+            Defaults to False.
+
+    Raises:
+        ValueError: If columns are missing or unknown or values cannot be converted.
+
+    Returns:
+        Dict[str, np.ndarray]: One array per column. String columns have dtype object.
+    """
+    problems = []
+    missing = [key for key in types if key not in frame.columns]
+    unknown = [key for key in frame.columns if key not in types]
+    if missing:
+        problems.append(f"missing columns {missing}")
+    if unknown:
+        problems.append(f"unknown columns {unknown}")
+    columns = {}
+    for key, type in types.items():
+        if key not in frame.columns:
+            continue
+        values = frame[key].to_numpy()
+        is_missing = np.asarray(pd.isna(values), dtype=bool)
+        if type == "datetime64[s]":
+            array = _coerce_datetime64(values)
+            invalid = np.isnat(array) & ~is_missing
+        elif type is str:
+            array = values.astype(object)
+            array[is_missing] = None
+            invalid = np.zeros(len(array), dtype=bool)
+        else:
+            array = pd.to_numeric(frame[key], errors="coerce").to_numpy(dtype=float)
+            invalid = np.isnan(array) & ~is_missing
+            if type is int:
+                invalid |= ~is_missing & ~np.isnan(array) & (array != np.round(array))
+                if not allow_missing:
+                    array = np.where(np.isnan(array), 0, array).astype(np.int64)
+        if not allow_missing:
+            invalid |= is_missing
+        if invalid.any():
+            rows = np.flatnonzero(invalid)
+            problems.append(
+                f"{key}: {len(rows)} invalid values in rows {rows[:10].tolist()}"
+            )
+        columns[key] = array
+    if problems:
+        raise ValueError("Invalid DataFrame: " + "; ".join(problems))
+    return columns
+
+
 class BaseArgument:
+    __slots__ = ("_type", "_dummyline", "_value", "_version", "_serialized")
+
     def __init__(self, type=None, dummyline=None):
         self._type = type
         self._dummyline = dummyline
         self._value = None
+        self._version = 0
+        self._serialized = None
+
+    def _changed(self):
+        self._version += 1
+
+    def _cached(self, serialize):
+        # the serialized form is reused until the argument is changed
+        if self._serialized is None or self._serialized[0] != self._version:
+            self._serialized = (self._version, serialize())
+        return self._serialized[1]
 
     @property
     def value(self):
@@ -25,26 +268,35 @@ class BaseArgument:
     @value.setter
     def value(self, value):
         self._value = self._type(value)
+        self._changed()
 
     def read(self, file: TextIO):
         line = file.readline()
         self.value = self.linecaster(line)
 
+    def read_lines(self, lines: List[str], index: int) -> int:
+        self.value = self.linecaster(lines[index])
+        return index + 1
+
     def linecaster(self, line: str) -> Any:
         decoded_line = self._type(line.strip().split(" ")[0])
         return decoded_line
 
 
 class StaticArgument(BaseArgument):
+    __slots__ = ()
+
     def __init__(self, type=None, dummyline=None):
         super().__init__(type, dummyline)
 
     @property
     def line(self):
-        return self._dummyline.replace("#", str(self._value))
+        return self._cached(lambda: self._dummyline.replace("#", str(self._value)))
 
 
 class DynamicArgument(BaseArgument):
+    __slots__ = ("_n_values",)
+
     def __init__(self, type=None, dummyline=None):
         super().__init__(type, dummyline)
         self._n_values = 0
@@ -57,6 +309,7 @@ class DynamicArgument(BaseArgument):
     def value(self, value):
         new_values = [self._type(new_value) for new_value in value]
         self._value = new_values
+        self._changed()
 
     def readline(self, file: TextIO):
         line = file.readline()
@@ -69,25 +322,35 @@ class DynamicArgument(BaseArgument):
 
     @property
     def lines(self):
-        lines = [self._dummyline.replace("#", str(value)) for value in self._value]
-        return lines
+        return list(
+            self._cached(
+                lambda: [
+                    self._dummyline.replace("#", str(value)) for value in self._value
+                ]
+            )
+        )
 
     def append(self, value):
         self._value.append(value)
         self._n_values += 1
+        self._changed()
 
     def remove(self, index):
         self._value.remove(self.value[-1])
         self._n_values -= 1
+        self._changed()
 
     def __getitem__(self, index):
         return self.value[index]
 
     def __setitem__(self, index, value):
         self.value[index] = self._type(value)
+        self._changed()
 
 
 class DatetimeArgument(StaticArgument):
+    __slots__ = ()
+
     def __init__(self, dummyline=None):
         super().__init__(dummyline=dummyline)
 
@@ -100,16 +363,18 @@ class DatetimeArgument(StaticArgument):
     def value(self, value: Union[str, np.datetime64, datetime]) -> str:
         if isinstance(value, str):
             self._value = value
-        elif isinstance(value, np.datetime64):
-            value = pd.to_datetime(value)
-            value = value.strftime("%Y%m%d %H%M%S")
-            self._value = value
-        elif isinstance(value, datetime):
-            value = value.strftime("%Y%m%d %H%M%S")
-            self._value = value
+        elif isinstance(value, (np.datetime64, datetime)):
+            self._value = str(datetime64_to_strings(to_datetime64(value))[0])
+        self._changed()
+
+    @property
+    def datetime64(self) -> np.datetime64:
+        return strings_to_datetime64([self._value])[0]
 
 
 class StaticSpecifierArgument(StaticArgument):
+    __slots__ = ("children",)
+
     def __init__(self, type=None, dummyline=None):
         super().__init__(type, dummyline)
         self._type = int
@@ -117,6 +382,8 @@ class StaticSpecifierArgument(StaticArgument):
 
 
 class DynamicSpecifierArgument(BaseArgument):
+    __slots__ = ("specifier",)
+
     def __init__(
         self,
         specifier: StaticSpecifierArgument,
@@ -131,6 +398,7 @@ class DynamicSpecifierArgument(BaseArgument):
     def value(self, value):
         new_values = [self._type(new_value) for new_value in value]
         self._value = new_values
+        self._changed()
 
     def __len__(self):
         return len(self._value)
@@ -140,6 +408,7 @@ class DynamicSpecifierArgument(BaseArgument):
 
     def __setitem__(self, index, value):
         self.value[index] = self._type(value)
+        self._changed()
 
     def readline(self, file: TextIO):
         line = file.readline()
@@ -151,21 +420,50 @@ class DynamicSpecifierArgument(BaseArgument):
             line = file.readline()
             self.append(self.linecaster(line))
 
+    def read_lines(self, lines: List[str], index: int) -> int:
+        n_values = self.specifier.value
+        self.extend_lines(lines[index : index + n_values])
+        return index + n_values
+
+    def extend_lines(self, lines: List[str]):
+        for line in lines:
+            self.append(self.linecaster(line))
+
     @property
     def lines(self):
-        lines = [self._dummyline.replace("#", str(value)) for value in self._value]
-        return lines
+        return list(
+            self._cached(
+                lambda: [
+                    self._dummyline.replace("#", str(value)) for value in self._value
+                ]
+            )
+        )
 
     def append(self, value):
         self._value.append(value)
         self.specifier.value = len(self._value)
+        self._changed()
+
+    def extend(self, values):
+        self._value.extend(values)
+        self.specifier.value = len(self._value)
+        self._changed()
 
     def remove(self, index):
         self._value.remove(self.value[index])
         self.specifier.value = len(self._value)
+        self._changed()
 
 
 class DynamicDatetimeArgument(DynamicSpecifierArgument):
+    """DynamicSpecifierArgument for dates, stored as "YYYYMMDD HHMISS" strings.
+
+    The datetime64[s] array of the strings is kept next to them until the argument is changed, so array does not
+    parse the strings again. Arrays assigned to value are kept directly.
+    """
+
+    __slots__ = ("_datetimes",)
+
     def __init__(
         self,
         specifier: StaticSpecifierArgument,
@@ -173,14 +471,14 @@ class DynamicDatetimeArgument(DynamicSpecifierArgument):
         dummyline=None,
     ):
         super().__init__(specifier, type, dummyline)
+        self._datetimes = None
 
     def __setitem__(self, index, value):
-        if isinstance(value, np.datetime64):
-            value = pd.to_datetime(value)
-            value = value.strftime("%Y%m%d %H%M%S")
-        elif isinstance(value, datetime):
-            value = value.strftime("%Y%m%d %H%M%S")
-        self.value[index] = self._type(value)
+        if isinstance(index, slice):
+            self.value[index] = to_datetime_strings(value)
+        else:
+            self.value[index] = to_datetime_strings([value])[0]
+        self._changed()
 
     def linecaster(self, line: str) -> str:
         decoded_line = line.strip().split(" ")[:2]
@@ -188,19 +486,29 @@ class DynamicDatetimeArgument(DynamicSpecifierArgument):
         return decoded_line
 
     @DynamicSpecifierArgument.value.setter
-    def value(self, value: List[Union[str, np.datetime64, datetime]]) -> str:
-        new_values = []
-        for new_value in value:
-            if isinstance(new_value, np.datetime64):
-                new_value = pd.to_datetime(new_value)
-                new_value = new_value.strftime("%Y%m%d %H%M%S")
-            elif isinstance(new_value, datetime):
-                new_value = new_value.strftime("%Y%m%d %H%M%S")
-            new_values.append(new_value)
-        self._value = new_values
+    def value(
+        self, value: Union[List[Union[str, np.datetime64, datetime]], np.ndarray]
+    ) -> str:
+        self._value = to_datetime_strings(value)
+        self._changed()
+        if (
+            isinstance(value, (np.ndarray, pd.DatetimeIndex))
+            and value.dtype.kind == "M"
+        ):
+            self._datetimes = (self._version, to_datetime64(value))
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._datetimes is None or self._datetimes[0] != self._version:
+            self._datetimes = (self._version, strings_to_datetime64(self._value))
+        array = self._datetimes[1].view()
+        array.flags.writeable = False
+        return array
 
 
 class SpeciesArgument(DynamicSpecifierArgument):
+    __slots__ = ("formatter", "start_position", "end_position")
+
     def __init__(
         self,
         specifier: StaticSpecifierArgument,
@@ -216,17 +524,25 @@ class SpeciesArgument(DynamicSpecifierArgument):
 
     def read(self, file: TextIO):
         start_line_index = file.tell()
-        for i in range(self.specifier.value):
-            line = file.readline()
-            line_snippet = line[self.start_position : self.end_position]
-            if line_snippet.strip() == "":
-                new_value = None
-            else:
-                new_value = self._type(line_snippet)
-            self.append(new_value)
+        lines = [file.readline() for i in range(self.specifier.value)]
         file.seek(start_line_index)
+        self.extend_lines(lines)
+
+    def extend_lines(self, lines: List[str]):
+        self.extend(
+            parse_fixed_width(
+                lines,
+                self.start_position,
+                self.end_position,
+                self._type,
+                allow_blank=True,
+            )
+        )
 
     def as_strings(self):
+        return list(self._cached(self._format_strings))
+
+    def _format_strings(self):
         strings = []
         for value in self.value:
             if value is None:
@@ -238,6 +554,8 @@ class SpeciesArgument(DynamicSpecifierArgument):
 
 
 class DynamicTableArgument(DynamicSpecifierArgument):
+    __slots__ = ("length", "start_position", "end_position", "formatter")
+
     def __init__(
         self,
         specifier: StaticSpecifierArgument,
@@ -263,18 +581,29 @@ class DynamicTableArgument(DynamicSpecifierArgument):
             ]
             casted_new_values.append(casted_new_value_list)
         self._value = casted_new_values
+        self._changed()
 
     def readcolumn(self, f):
         start_line_index = f.tell()
-        new_values = []
-        for i in range(self.length):
-            line = f.readline()
-            line_snippet = line[self.start_position : self.end_position]
-            new_values.append(self._type(line_snippet))
-        self._value.append(new_values)
+        lines = [f.readline() for i in range(self.length)]
         f.seek(start_line_index)
+        self.readcolumn_lines(lines, 0)
+
+    def readcolumn_lines(self, lines: List[str], index: int) -> int:
+        new_values = parse_fixed_width(
+            lines[index : index + self.length],
+            self.start_position,
+            self.end_position,
+            self._type,
+        )
+        self._value.append(new_values)
+        self._changed()
+        return index + self.length
 
     def as_strings(self):
+        return list(self._cached(self._format_strings))
+
+    def _format_strings(self):
         strings = []
         for values in self._value:
             new_strings = [self.formatter.format(value) for value in values]
@@ -292,6 +621,17 @@ class DynamicTableArgument(DynamicSpecifierArgument):
 
 
 class NestedSpecifierArgument:
+    __slots__ = (
+        "specifier1",
+        "specifier2",
+        "formatter",
+        "_type",
+        "_dummyline",
+        "_value",
+        "_version",
+        "_serialized",
+    )
+
     def __init__(
         self,
         specifier1: StaticSpecifierArgument,
@@ -306,6 +646,11 @@ class NestedSpecifierArgument:
         self._type = type
         self._dummyline = dummyline
         self._value: List[List[self._type]] = []
+        self._version = 0
+        self._serialized = None
+
+    _changed = BaseArgument._changed
+    _cached = BaseArgument._cached
 
     def __getitem__(self, index):
         return self.value[index]
@@ -313,6 +658,7 @@ class NestedSpecifierArgument:
     def __setitem__(self, index, value):
         value = [self._type(v) for v in value]
         self.value[index] = value
+        self._changed()
 
     def readblock(self, f: TextIO):
         new_values = []
@@ -320,6 +666,13 @@ class NestedSpecifierArgument:
             line = f.readline()
             new_values.append(self.linecaster(line))
         self.value.append(new_values)
+        self._changed()
+
+    def readblock_lines(self, lines: List[str], index: int) -> int:
+        n_values = self.specifier2.value
+        new_values = [self.linecaster(line) for line in lines[index : index + n_values]]
+        self.append(new_values)
+        return index + n_values
 
     def as_string(self):
         strings = []
@@ -330,6 +683,9 @@ class NestedSpecifierArgument:
 
     @property
     def lines(self):
+        return list(self._cached(self._format_lines))
+
+    def _format_lines(self):
         lines = []
         for strings in self.as_string():
             new_lines = [self._dummyline.replace("#", string) for string in strings]
@@ -349,6 +705,7 @@ class NestedSpecifierArgument:
             ]
             casted_new_values.append(casted_new_value_list)
         self._value = casted_new_values
+        self._changed()
 
     def read(self, file: TextIO):
         line = file.readline()
@@ -361,10 +718,345 @@ class NestedSpecifierArgument:
     def append(self, value):
         self._value.append(value)
         self.specifier1.value = len(self._value)
+        self._changed()
 
     def remove(self, index):
         self._value.remove(self.value[index])
         self.specifier1.value = len(self._value)
+        self._changed()
+
+
+class _ValueList(list):
+    """List returned by value of the array backed arguments.
+
+    Item assignment (also value[i][j] = x for nested arguments) is written through to the argument, like it was
+    for the lists the arguments used to store. Changes of the length raise, they have to go through the argument
+    (append, extend, remove) so that the specifier is updated. Copies and pickles are plain lists.
+    """
+
+    def __init__(self, values, argument, row: Optional[int] = None, nested=False):
+        super().__init__(values)
+        self._argument = argument
+        self._row = row
+        self._nested = nested
+
+    def _item(self, position: int):
+        if self._row is not None:
+            return self._argument.array[self._row, position].item()
+        if self._nested:
+            return _ValueList(self._argument[position], self._argument, position)
+        return self._argument[position]
+
+    def __setitem__(self, index, value):
+        self._argument[index if self._row is None else (self._row, index)] = value
+        positions = range(len(self))[index]
+        if isinstance(positions, int):
+            positions = [positions]
+        for position in positions:
+            super().__setitem__(position, self._item(position))
+
+    def _resize(self, *args, **kwargs):
+        raise TypeError(
+            "value can not change its length or order, use append, extend or remove of the argument."
+        )
+
+    __delitem__ = append = extend = insert = pop = remove = clear = _resize
+    sort = reverse = __iadd__ = __imul__ = _resize
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+class ArraySpecifierArgument(DynamicSpecifierArgument):
+    """DynamicSpecifierArgument that stores its values in a typed NumPy array.
+
+    Appended values are collected and only merged into the array when it is accessed, so appending
+    stays cheap while reading large files. The list based API (value, __getitem__, lines) is kept.
+    """
+
+    __slots__ = ("_dtype", "_pending")
+
+    def __init__(
+        self,
+        specifier: StaticSpecifierArgument,
+        type=None,
+        dummyline=None,
+        dtype=None,
+    ):
+        super().__init__(specifier, type, dummyline)
+        self._dtype = np.dtype(type if dtype is None else dtype)
+        self._value = np.empty(0, dtype=self._dtype)
+        self._pending = []
+
+    def _cast(self, value):
+        return self._type(value)
+
+    def _to_array(self, values) -> np.ndarray:
+        if self._dtype == object and self._type is str:
+            # casting through a fixed width string array avoids a Python call per value
+            return np.asarray(values, dtype=str).reshape(-1).astype(object)
+        if self._dtype == object:
+            return np.array([self._cast(value) for value in values], dtype=object)
+        return np.array(values, dtype=self._dtype).reshape(-1)
+
+    def _consolidate(self):
+        if self._pending:
+            new_values = self._to_array(self._pending)
+            self._value = np.concatenate([self._value, new_values])
+            self._pending = []
+
+    @property
+    def array(self) -> np.ndarray:
+        self._consolidate()
+        array = self._value.view()
+        array.flags.writeable = False
+        return array
+
+    @property
+    def value(self):
+        return _ValueList(self.array.tolist(), self)
+
+    @value.setter
+    def value(self, value):
+        self._value = self._to_array(value)
+        self._pending = []
+        self._changed()
+
+    def __len__(self):
+        return len(self._value) + len(self._pending)
+
+    def set_array(self, array: np.ndarray):
+        """Replaces the values by an array, which is used without a copy if it has the dtype of the argument.
+
+        This keeps e.g. memory-mapped arrays mapped. Changes through __setitem__ are written to the array.
+
+        Args:
+            array (np.ndarray): New values.
+        """
+        if array.dtype != self._dtype or array.ndim != 1:
+            array = self._to_array(array)
+        self._value = array
+        self._pending = []
+        self.specifier.value = len(array)
+        self._changed()
+
+    def _getitem(self, index):
+        if isinstance(index, (int, np.integer)) and 0 <= index < len(self._value):
+            return self._value[index]
+        return self.array[index]
+
+    def __getitem__(self, index):
+        value = self._getitem(index)
+        if isinstance(value, (np.ndarray, np.generic)):
+            return value.tolist()
+        return value
+
+    def __setitem__(self, index, value):
+        self._consolidate()
+        if isinstance(index, (int, np.integer)):
+            self._value[index] = self._cast(value)
+        else:
+            self._value[index] = self._to_array(value)
+        self._changed()
+
+    def iter_lines(self, chunksize: int = 10000) -> Iterator[str]:
+        for start in range(0, len(self), chunksize):
+            for value in self[start : start + chunksize]:
+                yield self._dummyline.replace("#", str(value))
+
+    @property
+    def lines(self):
+        return list(self._cached(lambda: list(self.iter_lines())))
+
+    def append(self, value):
+        self._pending.append(value)
+        self.specifier.value = len(self)
+        self._changed()
+
+    def extend(self, values):
+        self._consolidate()
+        self._value = np.concatenate([self._value, self._to_array(values)])
+        self.specifier.value = len(self)
+        self._changed()
+
+    def extend_lines(self, lines: List[str]):
+        # the first token of every line is cast by NumPy as a whole instead of by linecaster
+        self.extend([line.split(None, 1)[0] for line in lines])
+
+    def remove(self, index):
+        self._consolidate()
+        self._value = np.delete(self._value, index)
+        self.specifier.value = len(self)
+        self._changed()
+
+
+class ArrayDatetimeArgument(ArraySpecifierArgument):
+    """ArraySpecifierArgument for dates, stored as datetime64[s] and exposed as "YYYYMMDD HHMISS" strings."""
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        specifier: StaticSpecifierArgument,
+        type=None,
+        dummyline=None,
+    ):
+        super().__init__(specifier, type, dummyline, dtype="datetime64[s]")
+
+    linecaster = DynamicDatetimeArgument.linecaster
+
+    def extend_lines(self, lines: List[str]):
+        self.extend([" ".join(line.split(None, 2)[:2]) for line in lines])
+
+    def _cast(self, value):
+        return to_datetime64(value)[0]
+
+    def _to_array(self, values) -> np.ndarray:
+        return to_datetime64(values)
+
+    @property
+    def value(self):
+        return _ValueList(datetime64_to_strings(self.array).tolist(), self)
+
+    @value.setter
+    def value(self, value):
+        self._value = self._to_array(value)
+        self._pending = []
+        self._changed()
+
+    def __getitem__(self, index):
+        value = self._getitem(index)
+        if isinstance(value, np.ndarray):
+            return datetime64_to_strings(value).tolist()
+        return str(datetime64_to_strings(value)[0])
+
+
+class ArrayNestedSpecifierArgument(NestedSpecifierArgument):
+    """NestedSpecifierArgument that stores its values in a 2D NumPy array of shape (specifier1, specifier2)."""
+
+    __slots__ = ("_dtype", "_pending")
+
+    def __init__(
+        self,
+        specifier1: StaticSpecifierArgument,
+        specifier2: StaticSpecifierArgument,
+        type,
+        dummyline: str,
+        formatter: str = None,
+        dtype=None,
+    ):
+        super().__init__(specifier1, specifier2, type, dummyline, formatter)
+        self._dtype = np.dtype(type if dtype is None else dtype)
+        self._value = np.empty((0, 0), dtype=self._dtype)
+        self._pending = []
+
+    def _to_array(self, values) -> np.ndarray:
+        array = np.array(values, dtype=self._dtype)
+        if array.size == 0:
+            return np.empty((0, self.specifier2.value or 0), dtype=self._dtype)
+        if array.ndim != 2:
+            array = array.reshape(len(array), -1)
+        return array
+
+    def _consolidate(self):
+        if self._pending:
+            new_values = self._to_array(self._pending)
+            if len(self._value) == 0:
+                self._value = new_values
+            else:
+                self._value = np.concatenate([self._value, new_values])
+            self._pending = []
+
+    @property
+    def array(self) -> np.ndarray:
+        self._consolidate()
+        array = self._value.view()
+        array.flags.writeable = False
+        return array
+
+    @property
+    def value(self):
+        rows = [_ValueList(row, self, i) for i, row in enumerate(self.array.tolist())]
+        return _ValueList(rows, self, nested=True)
+
+    @value.setter
+    def value(self, value):
+        self._value = self._to_array(value)
+        self._pending = []
+        self._changed()
+
+    def __len__(self):
+        return len(self._value) + len(self._pending)
+
+    def set_array(self, array: np.ndarray):
+        """Replaces the values by a 2D array, which is used without a copy if it has the dtype of the argument.
+
+        Args:
+            array (np.ndarray): New values of shape (specifier1, specifier2).
+        """
+        if array.dtype != self._dtype or array.ndim != 2:
+            array = self._to_array(array)
+        self._value = array
+        self._pending = []
+        self.specifier1.value = len(array)
+        self._changed()
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)) and 0 <= index < len(self._value):
+            return self._value[index].tolist()
+        return self.array[index].tolist()
+
+    def __setitem__(self, index, value):
+        self._consolidate()
+        self._value[index] = np.asarray(value, dtype=self._dtype)
+        self._changed()
+
+    def readblock(self, f: TextIO):
+        new_values = []
+        for i in range(self.specifier2.value):
+            line = f.readline()
+            new_values.append(self.linecaster(line))
+        self.append(new_values)
+
+    def as_string(self):
+        strings = []
+        for values in self.value:
+            new_strings = [self.formatter.format(value) for value in values]
+            strings.append(new_strings)
+        return strings
+
+    def iter_lines(self, chunksize: int = 10000) -> Iterator[List[str]]:
+        for start in range(0, len(self), chunksize):
+            for values in self[start : start + chunksize]:
+                yield [
+                    self._dummyline.replace("#", self.formatter.format(value))
+                    for value in values
+                ]
+
+    @property
+    def lines(self):
+        return list(self._cached(lambda: list(self.iter_lines())))
+
+    def append(self, value):
+        self._pending.append([self._type(v) for v in value])
+        self.specifier1.value = len(self)
+        self._changed()
+
+    def extend(self, values):
+        new_values = self._to_array(values)
+        self._consolidate()
+        if len(self._value) == 0:
+            self._value = new_values
+        else:
+            self._value = np.concatenate([self._value, new_values])
+        self.specifier1.value = len(self)
+        self._changed()
+
+    def remove(self, index):
+        self._consolidate()
+        self._value = np.delete(self._value, index, axis=0)
+        self.specifier1.value = len(self)
+        self._changed()
 
 
 ####################################
@@ -372,10 +1064,53 @@ class NestedSpecifierArgument:
 ####################################
 
 
-class Pathnames:
+class BaseOption:
+    """Section of a flexwrf.input file.
+
+    The text of a section is cached when it is built (text, lines, write(cache=True)) and only formatted again
+    after one of its arguments was changed through a setter, append, extend, remove or __setitem__. Changing the list returned by value in place is not tracked.
+    """
+
+    _text = None
+
+    def _generate_lines(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    @property
+    def _state(self) -> tuple:
+        return tuple(
+            attribute._version
+            for attribute in vars(self).values()
+            if isinstance(attribute, (BaseArgument, NestedSpecifierArgument))
+        )
+
+    @property
+    def is_cached(self) -> bool:
+        return self._text is not None and self._text[0] == self._state
+
+    @property
+    def text(self) -> str:
+        state = self._state
+        if self._text is None or self._text[0] != state:
+            self._text = (state, "".join(self._generate_lines()))
+        return self._text[1]
+
+    def iter_lines(self) -> Iterator[str]:
+        if self.is_cached:
+            yield from io.StringIO(self._text[1])
+        else:
+            yield from self._generate_lines()
+
+    @property
+    def lines(self) -> List[str]:
+        return io.StringIO(self.text).readlines()
+
+
+class Pathnames(BaseOption):
+    _header = "=====================FORMER PATHNAMES FILE===================\n"
+    _footer = "=============================================================\n"
+
     def __init__(self):
-        self._header = "=====================FORMER PATHNAMES FILE===================\n"
-        self._footer = "=============================================================\n"
         self._outputpath = StaticArgument(type=Path, dummyline="#/\n")
         self._inputpath = DynamicArgument(type=Path, dummyline="#/\n")
         self._availablepath = DynamicArgument(type=Path, dummyline="#\n")
@@ -388,18 +1123,23 @@ class Pathnames:
             self.availablepath.readline(f)
         f.readline()
 
-    @property
-    def lines(self):
-        lines = []
-        lines.append(self._header)
-        lines.append(self.outputpath.line)
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index = self.outputpath.read_lines(lines, index + 1)
+        while "====" not in lines[index]:
+            self.inputpath.append(self.inputpath.linecaster(lines[index]))
+            self.availablepath.append(self.availablepath.linecaster(lines[index + 1]))
+            index += 2
+        return index + 1
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        yield self.outputpath.line
         for input_line, available_line in zip(
             self.inputpath.lines, self.availablepath.lines
         ):
-            lines.append(input_line)
-            lines.append(available_line)
-        lines.append(self._footer)
-        return lines
+            yield input_line
+            yield available_line
+        yield self._footer
 
     @property
     def outputpath(self):
@@ -426,9 +1166,10 @@ class Pathnames:
         self.availablepath.value = value
 
 
-class Command:
+class Command(BaseOption):
+    _header = "=====================FORMER COMMAND FILE=====================\n"
+
     def __init__(self):
-        self._header = "=====================FORMER COMMAND FILE=====================\n"
         self._ldirect = StaticArgument(
             type=int,
             dummyline="    #                LDIRECT:          1 for forward simulation, -1 for backward simulation\n",
@@ -606,47 +1347,56 @@ class Command:
         self.nctimerec.read(f)
         self.verbose.read(f)
 
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index += 1
+        for argument in self._arguments:
+            index = argument.read_lines(lines, index)
+        return index
+
     @property
-    def lines(self):
-        lines = [
-            self._header,
-            self.ldirect.line,
-            self.start.line,
-            self.stop.line,
-            self.outputrate.line,
-            self.averagerate.line,
-            self.samplingrate.line,
-            self.splittingtime.line,
-            self.syncronizationinterval.line,
-            self.ctl.line,
-            self.ifine.line,
-            self.iout.line,
-            self.ipout.line,
-            self.lsubgrid.line,
-            self.lconvection.line,
-            self.dtconv.line,
-            self.lagespectra.line,
-            self.ipin.line,
-            self.iflux.line,
-            self.ioutputforeachrel.line,
-            self.mdomainfill.line,
-            self.indsource.line,
-            self.indreceptor.line,
-            self.nestedoutput.line,
-            self.linitcond.line,
-            self.turboption.line,
-            self.luoption.line,
-            self.cblscheme.line,
-            self.sfcoption.line,
-            self.windoption.line,
-            self.timeoption.line,
-            self.outgridcoord.line,
-            self.releasecoord.line,
-            self.iouttype.line,
-            self.nctimerec.line,
-            self.verbose.line,
+    def _arguments(self) -> List[BaseArgument]:
+        return [
+            self.ldirect,
+            self.start,
+            self.stop,
+            self.outputrate,
+            self.averagerate,
+            self.samplingrate,
+            self.splittingtime,
+            self.syncronizationinterval,
+            self.ctl,
+            self.ifine,
+            self.iout,
+            self.ipout,
+            self.lsubgrid,
+            self.lconvection,
+            self.dtconv,
+            self.lagespectra,
+            self.ipin,
+            self.iflux,
+            self.ioutputforeachrel,
+            self.mdomainfill,
+            self.indsource,
+            self.indreceptor,
+            self.nestedoutput,
+            self.linitcond,
+            self.turboption,
+            self.luoption,
+            self.cblscheme,
+            self.sfcoption,
+            self.windoption,
+            self.timeoption,
+            self.outgridcoord,
+            self.releasecoord,
+            self.iouttype,
+            self.nctimerec,
+            self.verbose,
         ]
-        return lines
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        for argument in self._arguments:
+            yield argument.line
 
     @property
     def ldirect(self):
@@ -929,9 +1679,10 @@ class Command:
         self.verbose.value = value
 
 
-class Ageclasses:
+class Ageclasses(BaseOption):
+    _header = "=====================FORMER AGECLASESS FILE==================\n"
+
     def __init__(self):
-        self._header = "=====================FORMER AGECLASESS FILE==================\n"
         self._nageclasses = StaticSpecifierArgument(
             dummyline="    #                NAGECLASS        number of age classes\n"
         )
@@ -946,11 +1697,14 @@ class Ageclasses:
         self.nageclasses.read(f)
         self.ageclasses.read(f)
 
-    @property
-    def lines(self):
-        lines = [self._header, self.nageclasses.line]
-        lines.extend(self.ageclasses.lines)
-        return lines
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index = self.nageclasses.read_lines(lines, index + 1)
+        return self.ageclasses.read_lines(lines, index)
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        yield self.nageclasses.line
+        yield from self.ageclasses.lines
 
     @property
     def nageclasses(self):
@@ -969,9 +1723,10 @@ class Ageclasses:
         self.ageclasses.value = value
 
 
-class Outgrid:
+class Outgrid(BaseOption):
+    _header = "=====================FORMER OUTGRID FILE=====================\n"
+
     def __init__(self):
-        self._header = "=====================FORMER OUTGRID FILE=====================\n"
         self._outlonleft = StaticArgument(
             type=float,
             dummyline="   #            OUTLONLEFT      geograhical longitude of lower left corner of output grid\n",
@@ -1021,21 +1776,30 @@ class Outgrid:
         self.numzgrid.read(f)
         self.levels.read(f)
 
-    @property
-    def lines(self):
-        lines = [
-            self._header,
-            self.outlonleft.line,
-            self.outlatlower.line,
-            self.numxgrid.line,
-            self.numygrid.line,
-            self.outgriddef.line,
-            self.dxoutlon.line,
-            self.dyoutlat.line,
-            self.numzgrid.line,
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index += 1
+        for argument in self._arguments:
+            index = argument.read_lines(lines, index)
+        return self.levels.read_lines(lines, index)
+
+    @property
+    def _arguments(self) -> List[BaseArgument]:
+        return [
+            self.outlonleft,
+            self.outlatlower,
+            self.numxgrid,
+            self.numygrid,
+            self.outgriddef,
+            self.dxoutlon,
+            self.dyoutlat,
+            self.numzgrid,
         ]
-        lines.extend(self.levels.lines)
-        return lines
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        for argument in self._arguments:
+            yield argument.line
+        yield from self.levels.lines
 
     @property
     def outlonleft(self):
@@ -1110,9 +1874,10 @@ class Outgrid:
         self.levels.value = value
 
 
-class OutgridNest:
+class OutgridNest(BaseOption):
+    _header = "================OUTGRID_NEST==========================\n"
+
     def __init__(self):
-        self._header = "================OUTGRID_NEST==========================\n"
         self._outlonleft = StaticArgument(
             type=float,
             dummyline="   #            OUTLONLEFT      geograhical longitude of lower left corner of output grid\n",
@@ -1144,10 +1909,9 @@ class OutgridNest:
 
     def is_in_file(self, f: TextIO) -> bool:
         current_line = f.tell()
-        [f.readline() for i in range(8)]
-        expected_end_line = f.readline()
+        lines = [f.readline() for i in range(9)]
         f.seek(current_line)
-        return "=====" in expected_end_line
+        return "RECEPTOR" not in lines[0] and "=====" in lines[8]
 
     def read(self, f: TextIO):
         if self.is_in_file(f):
@@ -1162,22 +1926,38 @@ class OutgridNest:
         else:
             pass
 
-    @property
-    def lines(self):
+    def read_lines(self, lines: List[str], index: int) -> int:
+        # the section is followed by the next header or, if it is read on its own, by the end of the lines
+        if index + 8 > len(lines):
+            return index
+        if index + 8 < len(lines) and "=====" not in lines[index + 8]:
+            return index
+        # receptor and species sections can also span 8 lines
+        if "RECEPTOR" in lines[index]:
+            return index
+        index += 1
+        for argument in self._arguments:
+            index = argument.read_lines(lines, index)
+        return index
+
+    @property
+    def _arguments(self) -> List[BaseArgument]:
+        return [
+            self.outlonleft,
+            self.outlatlower,
+            self.numxgrid,
+            self.numygrid,
+            self.outgriddef,
+            self.dxoutlon,
+            self.dyoutlat,
+        ]
+
+    def _generate_lines(self) -> Iterator[str]:
         if self.outlonleft.value is None:
-            lines = []
-        else:
-            lines = [
-                self._header,
-                self.outlonleft.line,
-                self.outlatlower.line,
-                self.numxgrid.line,
-                self.numygrid.line,
-                self.outgriddef.line,
-                self.dxoutlon.line,
-                self.dyoutlat.line,
-            ]
-        return lines
+            return
+        yield self._header
+        for argument in self._arguments:
+            yield argument.line
 
     @property
     def outlonleft(self):
@@ -1236,9 +2016,10 @@ class OutgridNest:
         self.dyoutlat.value = value
 
 
-class Receptor:
+class Receptor(BaseOption):
+    _header = "=====================FORMER RECEPTOR FILE====================\n"
+
     def __init__(self):
-        self._header = "=====================FORMER RECEPTOR FILE====================\n"
         self._numreceptor = StaticSpecifierArgument(
             dummyline="    #                NUMRECEPTOR     number of receptors\n"
         )
@@ -1260,16 +2041,51 @@ class Receptor:
             self.x.readline(f)
             self.y.readline(f)
 
-    @property
-    def lines(self):
-        lines = [self._header, self.numreceptor.line]
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index = self.numreceptor.read_lines(lines, index + 1)
+        end_index = index + 3 * self.numreceptor.value
+        self.receptor.extend_lines(lines[index:end_index:3])
+        self.x.extend_lines(lines[index + 1 : end_index : 3])
+        self.y.extend_lines(lines[index + 2 : end_index : 3])
+        return end_index
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        yield self.numreceptor.line
         for receptor_line, x_line, y_line in zip(
             self.receptor.lines, self.x.lines, self.y.lines
         ):
-            lines.append(receptor_line)
-            lines.append(x_line)
-            lines.append(y_line)
-        return lines
+            yield receptor_line
+            yield x_line
+            yield y_line
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns the receptors as a DataFrame with the columns receptor, x and y."""
+        return pd.DataFrame(
+            dict(
+                receptor=np.array(self.receptor.value, dtype=object),
+                x=np.array(self.x.value, dtype=float),
+                y=np.array(self.y.value, dtype=float),
+            )
+        )
+
+    def from_dataframe(self, frame: pd.DataFrame):
+        """Replaces the receptors by the rows of a DataFrame with the columns receptor, x and y.
+
+        Args:
+            frame (pd.DataFrame): Receptors.
+
+        Raises:
+            ValueError: If columns are missing or unknown or values are invalid (see frame_to_columns).
+        """
+        columns = frame_to_columns(frame, dict(receptor=str, x=float, y=float))
+        for key, argument in [
+            ("receptor", self.receptor),
+            ("x", self.x),
+            ("y", self.y),
+        ]:
+            argument.value = []
+            argument.extend(columns[key].tolist())
 
     @property
     def numreceptor(self):
@@ -1304,10 +2120,12 @@ class Receptor:
         self.y.value = value
 
 
-class Species:
+class Species(BaseOption):
+    _header = "=====================FORMER SPECIES FILE=====================\n"
+    _legend = "XXXX|NAME    |decaytime |wetscava  |wetsb|drydif|dryhenry|drya|partrho  |parmean|partsig|dryvelo|weight |\n"
+    _table: Optional[FixedWidthTable] = None
+
     def __init__(self):
-        self._header = "=====================FORMER SPECIES FILE=====================\n"
-        self._legend = "XXXX|NAME    |decaytime |wetscava  |wetsb|drydif|dryhenry|drya|partrho  |parmean|partsig|dryvelo|weight |\n"
         self._numtable = StaticSpecifierArgument(
             dummyline="    #               NUMTABLE        number of variable properties. The following lines are fixed format\n"
         )
@@ -1390,6 +2208,17 @@ class Species:
             start_position=96,
             end_position=104,
         )
+        if Species._table is None:
+            # the row format only depends on the column definitions, so it is compiled once for all instances
+            Species._table = FixedWidthTable(
+                [argument.formatter for argument in self._columns],
+                [argument._type for argument in self._columns],
+                [
+                    (argument.start_position, argument.end_position)
+                    for argument in self._columns
+                ],
+                prefix="    ",
+            )
 
     def read(self, f: TextIO):
         f.readline()
@@ -1409,28 +2238,91 @@ class Species:
         self.weight.read(f)
         [f.readline() for i in range(self.numtable.value)]
 
-    @property
-    def lines(self):
-        lines = [self._header, self.numtable.line, self._legend]
-        for argument_strings in zip(
-            self.name.as_strings(),
-            self.decaytime.as_strings(),
-            self.wetscava.as_strings(),
-            self.wetsb.as_strings(),
-            self.drydif.as_strings(),
-            self.dryhenry.as_strings(),
-            self.drya.as_strings(),
-            self.partrho.as_strings(),
-            self.parmean.as_strings(),
-            self.partsig.as_strings(),
-            self.dryvelo.as_strings(),
-            self.weight.as_strings(),
-        ):
-            line = "    "
-            for string in argument_strings:
-                line += string
-            lines.append(line + "\n")
-        return lines
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index = self.numtable.read_lines(lines, index + 1) + 1
+        end_index = index + self.numtable.value
+        table_lines = lines[index:end_index]
+        for argument in self._columns:
+            argument.extend_lines(table_lines)
+        return end_index
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns the species table as a DataFrame with one column per property. Blank values are NaN."""
+        return pd.DataFrame(
+            {
+                key: np.array(argument.value, dtype=object if key == "name" else float)
+                for key, argument in self._named_columns.items()
+            }
+        )
+
+    def from_dataframe(self, frame: pd.DataFrame):
+        """Replaces the species table by the rows of a DataFrame in the layout of to_dataframe.
+
+        Args:
+            frame (pd.DataFrame): Species table. NaN values are written as blanks.
+
+        Raises:
+            ValueError: If columns are missing or unknown or values are invalid (see frame_to_columns).
+        """
+        named_columns = self._named_columns
+        columns = frame_to_columns(
+            frame,
+            {key: argument._type for key, argument in named_columns.items()},
+            allow_missing=True,
+        )
+        for key, argument in named_columns.items():
+            values = columns[key].astype(object)
+            if key != "name":
+                values[np.isnan(columns[key])] = None
+            argument.value = []
+            argument.extend(values.tolist())
+
+    @property
+    def _named_columns(self) -> Dict[str, SpeciesArgument]:
+        return dict(
+            zip(
+                [
+                    "name",
+                    "decaytime",
+                    "wetscava",
+                    "wetsb",
+                    "drydif",
+                    "dryhenry",
+                    "drya",
+                    "partrho",
+                    "parmean",
+                    "partsig",
+                    "dryvelo",
+                    "weight",
+                ],
+                self._columns,
+            )
+        )
+
+    @property
+    def _columns(self) -> List[SpeciesArgument]:
+        return [
+            self._name,
+            self._decaytime,
+            self._wetscava,
+            self._wetsb,
+            self._drydif,
+            self._dryhenry,
+            self._drya,
+            self._partrho,
+            self._parmean,
+            self._partsig,
+            self._dryvelo,
+            self._weight,
+        ]
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        yield self.numtable.line
+        yield self._legend
+        yield from self._table.iter_lines(
+            [argument.value for argument in self._columns]
+        )
 
     @property
     def numtable(self):
@@ -1537,9 +2429,12 @@ class Species:
         self._weight.value = value
 
 
-class Releases:
+class Releases(BaseOption):
+    _header = "=====================FORMER RELEEASES FILE===================\n"
+    _hour_table: Optional[FixedWidthTable] = None
+    _dow_table: Optional[FixedWidthTable] = None
+
     def __init__(self):
-        self._header = "=====================FORMER RELEEASES FILE===================\n"
         self._nspec = StaticSpecifierArgument(
             dummyline="   #                NSPEC           total number of species emitted\n"
         )
@@ -1604,74 +2499,95 @@ class Releases:
             formatter="{:12.3f}",
             type=float,
         )
+        if Releases._hour_table is None:
+            # the row formats only depend on the column definitions, so they are compiled once for all instances
+            Releases._hour_table = FixedWidthTable(
+                [
+                    self._ihour.formatter,
+                    self._area_hour.formatter,
+                    self._point_hour.formatter,
+                ],
+                [int, float, float],
+                prefix="   ",
+            )
+            Releases._dow_table = FixedWidthTable(
+                [
+                    self._idow.formatter,
+                    self._area_dow.formatter,
+                    self._point_dow.formatter,
+                ],
+                [int, float, float],
+                prefix="   ",
+            )
 
         self._numpoint = StaticSpecifierArgument(
             dummyline="#                 NUMPOINT        number of releases\n"
         )
 
-        self._start = DynamicDatetimeArgument(
+        self._start = ArrayDatetimeArgument(
             specifier=self._numpoint,
             type=str,
             dummyline="#   ID1, IT1        beginning date and time of release\n",
         )
 
-        self._stop = DynamicDatetimeArgument(
+        self._stop = ArrayDatetimeArgument(
             specifier=self._numpoint,
             type=str,
             dummyline="#   ID1, IT1        ending date and time of release\n",
         )
 
-        self._xpoint1 = DynamicSpecifierArgument(
+        self._xpoint1 = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=float,
             dummyline="#         XPOINT1 (real)  longitude [deg] of lower left corner\n",
         )
-        self._ypoint1 = DynamicSpecifierArgument(
+        self._ypoint1 = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=float,
             dummyline="#         YPOINT1 (real)  latitude [deg] of lower left corner\n",
         )
-        self._xpoint2 = DynamicSpecifierArgument(
+        self._xpoint2 = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=float,
             dummyline="#         XPOINT2 (real)  longitude [deg] of upper right corner\n",
         )
-        self._ypoint2 = DynamicSpecifierArgument(
+        self._ypoint2 = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=float,
             dummyline="#         YPOINT2 (real)  latitude [DEG] of upper right corner\n",
         )
-        self._kindz = DynamicSpecifierArgument(
+        self._kindz = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=int,
             dummyline="#         KINDZ  (int)  1 for m above ground, 2 for m above sea level, 3 pressure\n",
         )
-        self._zpoint1 = DynamicSpecifierArgument(
+        self._zpoint1 = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=float,
             dummyline="#        ZPOINT1 (real)  lower z-level\n",
         )
-        self._zpoint2 = DynamicSpecifierArgument(
+        self._zpoint2 = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=float,
             dummyline="#        ZPOINT2 (real)  upper z-level \n",
         )
-        self._npart = DynamicSpecifierArgument(
+        self._npart = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=int,
             dummyline="#          NPART (int)     total number of particles to be released\n",
         )
-        self._xmass = NestedSpecifierArgument(
+        self._xmass = ArrayNestedSpecifierArgument(
             specifier1=self._numpoint,
             specifier2=self._nspec,
             type=float,
             dummyline="#         XMASS (real)    total mass emitted\n",
             formatter="{:.4E}",
         )
-        self._name = DynamicSpecifierArgument(
+        self._name = ArraySpecifierArgument(
             specifier=self._numpoint,
             type=str,
             dummyline="#  NAME OF RELEASE LOCATION\n",
+            dtype=object,
         )
 
     def read(self, f: TextIO):
@@ -1704,12 +2620,59 @@ class Releases:
             self.xmass.readblock(f)
             self.name.readline(f)
 
-    @property
-    def lines(self):
-        lines = [self._header, self.nspec.line, self.emitvar.line]
+    def read_lines(self, lines: List[str], index: int) -> int:
+        index = self.nspec.read_lines(lines, index + 1)
+        index = self.emitvar.read_lines(lines, index)
+        for i in range(self.nspec.value):
+            self.link.extend_lines(lines[index : index + 1])
+            index += 1
+            if self.emitvar.value == 1:
+                self.ihour.readcolumn_lines(lines, index)
+                self.area_hour.readcolumn_lines(lines, index)
+                index = self.point_hour.readcolumn_lines(lines, index)
+                self.idow.readcolumn_lines(lines, index)
+                self.area_dow.readcolumn_lines(lines, index)
+                index = self.point_dow.readcolumn_lines(lines, index)
+        index = self.numpoint.read_lines(lines, index)
+
+        # every release is a block of lines, so each argument is a strided slice of the lines
+        numpoint = self.numpoint.value
+        nspec = self.nspec.value
+        block_length = 11 + nspec
+        end_index = index + numpoint * block_length
+        for offset, argument in enumerate(
+            [
+                self.start,
+                self.stop,
+                self.xpoint1,
+                self.ypoint1,
+                self.xpoint2,
+                self.ypoint2,
+                self.kindz,
+                self.zpoint1,
+                self.zpoint2,
+                self.npart,
+            ]
+        ):
+            argument.extend_lines(lines[index + offset : end_index : block_length])
+        xmass = [
+            [
+                line.split(None, 1)[0]
+                for line in lines[index + 10 + i : end_index : block_length]
+            ]
+            for i in range(nspec)
+        ]
+        self.xmass.extend(np.array(xmass, dtype=float).T.reshape(numpoint, nspec))
+        self.name.extend_lines(lines[index + 10 + nspec : end_index : block_length])
+        return end_index
+
+    def _generate_lines(self) -> Iterator[str]:
+        yield self._header
+        yield self.nspec.line
+        yield self.emitvar.line
 
         if self.emitvar.value == 0:
-            lines.extend(self.link.lines)
+            yield from self.link.lines
 
         else:
             for (
@@ -1722,79 +2685,313 @@ class Releases:
                 point_dow,
             ) in zip(
                 self.link.lines,
-                self.ihour.as_strings(),
-                self.area_hour.as_strings(),
-                self.point_hour.as_strings(),
-                self.idow.as_strings(),
-                self.area_dow.as_strings(),
-                self.point_dow.as_strings(),
+                self.ihour.value,
+                self.area_hour.value,
+                self.point_hour.value,
+                self.idow.value,
+                self.area_dow.value,
+                self.point_dow.value,
             ):
-                lines.append(link_line)
-                line_start = "   "
-                line_end = "\n"
-                for i, a, p in zip(ihour, area_hour, point_hour):
-                    lines.append(line_start + i + a + p + line_end)
-                for i, a, p in zip(idow, area_dow, point_dow):
-                    lines.append(line_start + i + a + p + line_end)
-        lines.append(self.numpoint.line)
-        for (
-            start_line,
-            stop_line,
-            xpoint1_line,
-            ypoint1_line,
-            xpoint2_line,
-            ypoint2_line,
-            kindz_line,
-            zpoint1_line,
-            zpoint2_line,
-            npart_line,
-            xmass_lines,
-            name_line,
-        ) in zip(
-            self.start.lines,
-            self.stop.lines,
-            self.xpoint1.lines,
-            self.ypoint1.lines,
-            self.xpoint2.lines,
-            self.ypoint2.lines,
-            self.kindz.lines,
-            self.zpoint1.lines,
-            self.zpoint2.lines,
-            self.npart.lines,
-            self.xmass.lines,
-            self.name.lines,
-        ):
-            lines.append(start_line)
-            lines.append(stop_line)
-            lines.append(xpoint1_line)
-            lines.append(ypoint1_line)
-            lines.append(xpoint2_line)
-            lines.append(ypoint2_line)
-            lines.append(kindz_line)
-            lines.append(zpoint1_line)
-            lines.append(zpoint2_line)
-            lines.append(npart_line)
-            lines.extend(xmass_lines)
-            lines.append(name_line)
-        return lines
+                yield link_line
+                yield from self._hour_table.iter_lines([ihour, area_hour, point_hour])
+                yield from self._dow_table.iter_lines([idow, area_dow, point_dow])
+        yield self.numpoint.line
+        release_lines = zip(
+            *[argument.iter_lines() for argument in self.release_arguments.values()]
+        )
+        for *point_lines, xmass_lines, name_line in release_lines:
+            yield from point_lines
+            yield from xmass_lines
+            yield name_line
+
+    @property
+    def release_arguments(self) -> Dict[str, Any]:
+        return {
+            "start": self.start,
+            "stop": self.stop,
+            "xpoint1": self.xpoint1,
+            "ypoint1": self.ypoint1,
+            "xpoint2": self.xpoint2,
+            "ypoint2": self.ypoint2,
+            "kindz": self.kindz,
+            "zpoint1": self.zpoint1,
+            "zpoint2": self.zpoint2,
+            "npart": self.npart,
+            "xmass": self.xmass,
+            "name": self.name,
+        }
 
     def add_copy(self, release_index: int):
-        release_arguments = [
-            self.start,
-            self.stop,
-            self.xpoint1,
-            self.ypoint1,
-            self.xpoint2,
-            self.ypoint2,
-            self.kindz,
-            self.zpoint1,
-            self.zpoint2,
-            self.npart,
-            self.xmass,
-            self.name,
-        ]
-        for release_argument in release_arguments:
-            release_argument.append(release_argument.value[release_index])
+        for release_argument in self.release_arguments.values():
+            release_argument.append(release_argument[release_index])
+
+    def add_copies(
+        self,
+        release_indices: Optional[Union[int, List[int], np.ndarray]] = None,
+        n_copies: int = 1,
+        **columns,
+    ):
+        """Appends n_copies copies of a set of releases in one call.
+
+        The copies are appended block by block, i.e. for the releases [a, b] and n_copies=2 the new releases are
+        [a, b, a, b]. Arguments given as columns replace the copied values. They are broadcast to the shape
+        (n_copies, n_selected) (with a trailing nspec axis for xmass): scalars are used for all copies, 1D values
+        (2D for xmass) give one value per copy and 2D values (3D for xmass) one value per copied release.
+
+        Args:
+            release_indices (Optional[Union[int, List[int], np.ndarray]], optional): Indices of the releases to copy.
+                Defaults to None (all releases).
+            n_copies (int, optional): Number of copies of the set. Defaults to 1.
+            **columns: New values for release arguments of the copies (e.g. start, stop, xpoint1).
+
+        Raises:
+            ValueError: If columns contain unknown release arguments.
+        """
+        release_arguments = self.release_arguments
+        unknown = [key for key in columns if key not in release_arguments]
+        if unknown:
+            raise ValueError(f"Unknown release arguments: {unknown}")
+        if release_indices is None:
+            release_indices = np.arange(len(self.start))
+        release_indices = np.atleast_1d(np.asarray(release_indices, dtype=int))
+        n_selected = len(release_indices)
+        nspec = self.nspec.value
+
+        new_columns = {}
+        for key, release_argument in release_arguments.items():
+            if key not in columns:
+                values = release_argument.array[release_indices]
+                reps = (n_copies, 1) if key == "xmass" else n_copies
+                new_columns[key] = np.tile(values, reps)
+                continue
+            values = np.asarray(columns[key])
+            if key == "xmass":
+                values = values.astype(float)
+                if values.ndim == 2:
+                    values = values[:, None, :]
+                shape = (n_copies, n_selected, nspec)
+            else:
+                values = release_argument._to_array(values.reshape(-1)).reshape(
+                    values.shape
+                )
+                if values.ndim == 1:
+                    values = values[:, None]
+                shape = (n_copies, n_selected)
+            new_columns[key] = np.broadcast_to(values, shape).reshape(
+                n_copies * n_selected, *shape[2:]
+            )
+        self.extend(**new_columns)
+
+    def tile_time(
+        self,
+        step: Union[str, np.timedelta64, timedelta],
+        n_steps: int,
+        release_indices: Optional[Union[int, List[int], np.ndarray]] = None,
+        first_start: Optional[Union[str, np.datetime64, datetime]] = None,
+        **columns,
+    ):
+        """Appends copies of a set of releases that are shifted in time by multiples of step.
+
+        Copy k (k = 1, ..., n_steps) of a release starts at its start plus k * step and keeps the duration of
+        the release, so the template release and its copies form a series without duplicate starts, e.g. hourly
+        releases. With first_start, copy k starts at first_start plus (k - 1) * step instead.
+
+        Args:
+            step (Union[str, np.timedelta64, timedelta]): Time between two copies (e.g. "1h").
+            n_steps (int): Number of copies of every release.
+            release_indices (Optional[Union[int, List[int], np.ndarray]], optional): Indices of the releases to copy.
+                Defaults to None (all releases).
+            first_start (Optional[Union[str, np.datetime64, datetime]], optional): If given, the first copies start at
+                this time instead of one step after the start of the copied releases. Defaults to None.
+            **columns: New values for other release arguments of the copies (see add_copies).
+        """
+        if release_indices is None:
+            release_indices = np.arange(len(self.start))
+        release_indices = np.atleast_1d(np.asarray(release_indices, dtype=int))
+        step = pd.to_timedelta(step).to_timedelta64().astype("timedelta64[s]")
+        starts = self.start.array[release_indices]
+        durations = self.stop.array[release_indices] - starts
+        if first_start is None:
+            first_starts = starts + step
+        else:
+            first_starts = np.full(starts.shape, to_datetime64(first_start)[0])
+        new_starts = first_starts[None, :] + (np.arange(n_steps) * step)[:, None]
+        self.add_copies(
+            release_indices,
+            n_steps,
+            start=new_starts,
+            stop=new_starts + durations,
+            **columns,
+        )
+
+    def extend(self, **columns):
+        """Appends releases given as one array per release argument in one call.
+
+        Args:
+            **columns: Values for every release argument (start, stop, xpoint1, ..., npart, xmass, name).
+                Scalars are broadcast to all new releases. xmass has to be of shape (n_releases, nspec); a single
+                release may also be given as (nspec,).
+
+        Raises:
+            ValueError: If columns are missing, unknown or of different lengths or xmass has the wrong shape.
+        """
+        release_arguments = self.release_arguments
+        missing = [key for key in release_arguments if key not in columns]
+        unknown = [key for key in columns if key not in release_arguments]
+        if missing or unknown:
+            raise ValueError(
+                f"Columns have to match the release arguments. Missing: {missing}, unknown: {unknown}"
+            )
+
+        lengths = {
+            key: len(value)
+            for key, value in columns.items()
+            if key != "xmass" and np.ndim(value) > 0
+        }
+        xmass = np.asarray(columns["xmass"], dtype=float)
+        if xmass.ndim == 2:
+            lengths["xmass"] = len(xmass)
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Columns have different lengths: {lengths}")
+        n_releases = lengths.popitem()[1] if lengths else 1
+        nspec = self.nspec.value
+        if xmass.ndim < 2 and n_releases == 1:
+            xmass = xmass.reshape(1, -1)
+        if xmass.shape != (n_releases, nspec):
+            # a 1D xmass would be ambiguous between one value per release and one per species
+            raise ValueError(
+                f"xmass has shape {xmass.shape}, expected (n_releases, nspec) = {(n_releases, nspec)}"
+            )
+        columns["xmass"] = xmass
+
+        new_values = {}
+        for key, release_argument in release_arguments.items():
+            values = columns[key]
+            if np.ndim(values) == 0:
+                values = np.repeat(release_argument._to_array([values]), n_releases)
+            new_values[key] = release_argument._to_array(values)
+        for key, release_argument in release_arguments.items():
+            release_argument.extend(new_values[key])
+
+    def clear(self):
+        for release_argument in self.release_arguments.values():
+            release_argument.value = []
+        self.numpoint.value = 0
+
+    def to_dataframe(self, copy: bool = False) -> pd.DataFrame:
+        """Returns the releases as a DataFrame with one column per release argument and xmass1, xmass2, ... for xmass.
+
+        Args:
+            copy (bool, optional): Whether to copy the columns. Without a copy the DataFrame wraps the read-only arrays
+                of the releases, so it is only valid until the releases are changed. Defaults to False.
+
+        Returns:
+            pd.DataFrame: Releases.
+        """
+        columns = {}
+        for key, release_argument in self.release_arguments.items():
+            array = release_argument.array
+            if key != "xmass":
+                columns[key] = array
+                continue
+            for i in range(self.nspec.value):
+                columns[f"xmass{i + 1}"] = array[:, i] if len(array) else np.empty(0)
+        return pd.DataFrame(columns, copy=copy)
+
+    def from_dataframe(self, frame: pd.DataFrame):
+        """Replaces the releases by the rows of a DataFrame in the layout of to_dataframe.
+
+        All columns are converted and checked in one pass. There has to be one xmass column per species (NSPEC).
+
+        Args:
+            frame (pd.DataFrame): Releases.
+
+        Raises:
+            ValueError: If columns are missing or unknown or values are invalid (see frame_to_columns).
+        """
+        nspec = self.nspec.value
+        types = {}
+        for key, release_argument in self.release_arguments.items():
+            if key == "xmass":
+                types.update({f"xmass{i + 1}": float for i in range(nspec)})
+            elif isinstance(release_argument, ArrayDatetimeArgument):
+                types[key] = "datetime64[s]"
+            else:
+                types[key] = release_argument._type
+        columns = frame_to_columns(frame, types)
+        xmass_keys = [f"xmass{i + 1}" for i in range(nspec)]
+        columns["xmass"] = np.stack(
+            [columns.pop(key) for key in xmass_keys], axis=-1
+        ).reshape(len(frame), nspec)
+        self.clear()
+        self.extend(**columns)
+
+    def columns(
+        self, release_indices: Optional[Union[List[int], np.ndarray]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Returns copies of the release arguments as arrays, e.g. to extend other Releases with them.
+
+        Args:
+            release_indices (Optional[Union[List[int], np.ndarray]], optional): Indices or boolean mask of the
+                releases to return. Defaults to None (all releases).
+
+        Returns:
+            Dict[str, np.ndarray]: One array per release argument. xmass is of shape (n_releases, nspec).
+        """
+        if release_indices is None:
+            return {
+                key: release_argument.array.copy()
+                for key, release_argument in self.release_arguments.items()
+            }
+        release_indices = np.asarray(release_indices)
+        if release_indices.dtype == bool:
+            release_indices = np.flatnonzero(release_indices)
+        release_indices = release_indices.astype(int)
+        return {
+            key: release_argument.array[release_indices]
+            for key, release_argument in self.release_arguments.items()
+        }
+
+    def shard_assignment(
+        self, n_shards: int, respect_time_order: bool = False
+    ) -> np.ndarray:
+        """Assigns every release to one of n_shards shards, so that the sums of npart of the shards are balanced.
+
+        Without time ordering the releases are distributed greedily, largest npart first, to the shard with the
+        fewest particles. With time ordering every shard gets a contiguous range of the releases sorted by start.
+        A single release with many particles can leave shards empty.
+
+        Args:
+            n_shards (int): Number of shards.
+            respect_time_order (bool, optional): Whether shards have to cover consecutive release times.
+                Defaults to False.
+
+        Returns:
+            np.ndarray: Shard of every release.
+        """
+        npart = self.npart.array.astype(np.int64)
+        shards = np.zeros(len(npart), dtype=np.int64)
+        total = npart.sum()
+        if len(npart) == 0 or n_shards <= 1:
+            return shards
+        if respect_time_order:
+            order = np.argsort(self.start.array, kind="stable")
+            cumulative = np.cumsum(npart[order])
+            # a release belongs to the shard in which the middle of its particles falls
+            middles = cumulative - npart[order] / 2
+            if total == 0:
+                middles = np.arange(len(npart)) + 0.5
+                total = len(npart)
+            shards[order] = np.minimum(
+                (middles * n_shards / total).astype(np.int64), n_shards - 1
+            )
+            return shards
+        loads = [(0, shard) for shard in range(n_shards)]
+        for release_index in np.argsort(-npart, kind="stable"):
+            load, shard = heapq.heappop(loads)
+            shards[release_index] = shard
+            heapq.heappush(loads, (load + int(npart[release_index]), shard))
+        return shards
 
     @property
     def nspec(self):
@@ -1988,7 +3185,7 @@ class FlexwrfInput:
         self._receptor = Receptor()
         self._species = Species()
         self._releases = Releases()
-        self.options = [
+        self._options = [
             self._pathnames,
             self._command,
             self._ageclasses,
@@ -1998,54 +3195,329 @@ class FlexwrfInput:
             self._species,
             self._releases,
         ]
+        # sections of a lazily read file that are not parsed yet: attribute name -> (start, end) byte offsets
+        self._unread_sections: Dict[str, tuple] = {}
+        self._unread_file = None
 
-    def read(self, file_path: Union[str, Path]):
+    @property
+    def options(self) -> List[BaseOption]:
+        self.read_sections()
+        return self._options
+
+    def read(
+        self,
+        file_path: Union[str, Path],
+        parser: Literal["lines", "file"] = "lines",
+        cache: Optional[ParseCache] = None,
+        lazy: bool = False,
+    ):
+        """Reads a flexwrf.input file.
+
+        Args:
+            file_path (Union[str, Path]): Path to the file.
+            parser (Literal["lines", "file"], optional): "lines" reads the file once and parses the sections by line
+                index, "file" parses the sections line by line from the open file. Defaults to "lines".
+            cache (Optional[ParseCache], optional): Cache to load the parsed file from. On a miss the parsed file is
+                stored in it. Defaults to None (no caching).
+            lazy (bool, optional): Whether to only index the sections and parse each of them when it is accessed
+                first. The file must not change until all sections are parsed. Ignored if cache is given.
+                Defaults to False.
+        """
         file_path = Path(file_path)
+        if lazy and cache is None and self._index_sections(file_path):
+            return
+        if cache is not None:
+            cached = cache.load(file_path)
+            if isinstance(cached, FlexwrfInput):
+                self.__dict__.update(cached.__dict__)
+                return
+        profiles = profiling.active_profiles()
         with file_path.open("r") as f:
+            if parser == "lines":
+                start_time = time.perf_counter() if profiles else 0.0
+                lines = f.readlines()
+                if profiles:
+                    profiling.record(
+                        "read",
+                        "file",
+                        time.perf_counter() - start_time,
+                        len(lines),
+                        file_path.stat().st_size,
+                    )
+                self.read_lines(lines)
+            elif profiles:
+                for option in self.options:
+                    start_time = time.perf_counter()
+                    position = f.tell()
+                    option.read(f)
+                    profiling.record(
+                        "read",
+                        type(option).__name__,
+                        time.perf_counter() - start_time,
+                        None,
+                        f.tell() - position,
+                    )
+            else:
+                for option in self.options:
+                    option.read(f)
+        if cache is not None:
+            cache.store(file_path, self)
+
+    def read_lines(self, lines: List[str]) -> int:
+        index = 0
+        if profiling.active_profiles():
             for option in self.options:
-                option.read(f)
+                start_time = time.perf_counter()
+                end_index = option.read_lines(lines, index)
+                profiling.record(
+                    "read",
+                    type(option).__name__,
+                    time.perf_counter() - start_time,
+                    end_index - index,
+                    sum(map(len, lines[index:end_index])),
+                )
+                index = end_index
+            return index
+        for option in self.options:
+            index = option.read_lines(lines, index)
+        return index
+
+    def _index_sections(self, file_path: Path) -> bool:
+        offsets = scan_section_offsets(file_path)
+        names = [
+            "_pathnames",
+            "_command",
+            "_ageclasses",
+            "_outgrid",
+            "_outgrid_nest",
+            "_receptor",
+            "_species",
+            "_releases",
+        ]
+        # the pathnames section has a header and a footer, the other sections only a header
+        if len(offsets) == 8:
+            names.remove("_outgrid_nest")
+        elif len(offsets) != 9:
+            return False
+        stat = file_path.stat()
+        starts = [offsets[0]] + offsets[2:]
+        ends = starts[1:] + [stat.st_size]
+        self._unread_sections = dict(zip(names, zip(starts, ends)))
+        self._unread_file = (file_path, stat.st_size, stat.st_mtime_ns)
+        return True
+
+    def _read_section(self, name: str):
+        start_time = time.perf_counter()
+        start, end = self._unread_sections.pop(name)
+        file_path, size, mtime = self._unread_file
+        stat = file_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+            raise RuntimeError(
+                f"{file_path} was changed after it was indexed. Read it again."
+            )
+        with file_path.open("rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        lines = io.TextIOWrapper(io.BytesIO(data)).readlines()
+        section = getattr(self, name)
+        section.read_lines(lines, 0)
+        if profiling.active_profiles():
+            profiling.record(
+                "read",
+                type(section).__name__,
+                time.perf_counter() - start_time,
+                len(lines),
+                end - start,
+            )
+
+    def _section(self, name: str) -> BaseOption:
+        if name in self._unread_sections:
+            self._read_section(name)
+        return getattr(self, name)
+
+    def read_sections(self):
+        """Parses all sections of a lazily read file that were not accessed yet."""
+        for name in list(self._unread_sections):
+            self._read_section(name)
+
+    def split(
+        self,
+        n_shards: int,
+        respect_time_order: bool = False,
+        shard_name: str = "shard_{:04d}",
+    ) -> tuple:
+        """Splits the releases into shard inputs with balanced numbers of particles (see Releases.shard_assignment).
+
+        Every shard is a copy of this input with a subset of the releases, in their original order. Its output path
+        is the subdirectory shard_name of the output path. The simulation window is trimmed to the releases on the
+        side at which they are released (start of forward runs, stop of backward runs), so the transport time of
+        every release stays the same. Empty shards are left out.
+
+        Args:
+            n_shards (int): Maximal number of shards.
+            respect_time_order (bool, optional): Whether shards have to cover consecutive release times.
+                Defaults to False.
+            shard_name (str, optional): Format string for the output subdirectories, formatted with the shard number.
+                Defaults to "shard_{:04d}".
+
+        Returns:
+            tuple: List of the shard inputs and a DataFrame with the columns release, shard and local_index, which
+                maps every release of this input to its shard and its index in the shard.
+        """
+        releases = self.releases
+        assignment = releases.shard_assignment(n_shards, respect_time_order)
+        # drop empty shards, the order of the others is kept
+        used_shards, shards = np.unique(assignment, return_inverse=True)
+        shards = shards.reshape(-1)
+
+        order = np.argsort(shards, kind="stable")
+        counts = np.bincount(shards, minlength=len(used_shards))
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        local_indices = np.empty(len(shards), dtype=np.int64)
+        local_indices[order] = np.arange(len(shards)) - np.repeat(offsets, counts)
+
+        # copy of this input without releases, the releases are replaced via the memo of deepcopy
+        empty_releases = copy.deepcopy(releases)
+        empty_releases.clear()
+        template = copy.deepcopy(self, {id(releases): empty_releases})
+
+        shard_inputs = []
+        for shard, release_indices in enumerate(
+            np.split(order, np.cumsum(counts)[:-1])
+        ):
+            shard_input = copy.deepcopy(template)
+            shard_input.releases.extend(**releases.columns(release_indices))
+            shard_input.pathnames.outputpath = Path(
+                self.pathnames.outputpath.value
+            ) / shard_name.format(shard)
+            command = shard_input.command
+            if command.ldirect.value == -1:
+                stop = releases.stop.array[release_indices].max()
+                command.stop = min(stop, command.stop.datetime64)
+            else:
+                start = releases.start.array[release_indices].min()
+                command.start = max(start, command.start.datetime64)
+            shard_inputs.append(shard_input)
 
-    def write(self, file_path: Union[str, Path]):
+        index = pd.DataFrame(
+            dict(
+                release=np.arange(len(shards)),
+                shard=shards,
+                local_index=local_indices,
+            )
+        )
+        return shard_inputs, index
+
+    def write(
+        self,
+        file_path: Union[str, Path],
+        buffer_size: int = 2**20,
+        cache: bool = False,
+    ):
+        """Writes the input file section by section.
+
+        Sections are streamed in buffers of buffer_size characters, so memory stays constant with the number of
+        releases. Sections whose text is already cached (see BaseOption.text) are written from it.
+
+        Args:
+            file_path (Union[str, Path]): Path to write to.
+            buffer_size (int, optional): Number of characters collected before each write call. Defaults to 2**20.
+            cache (bool, optional): Whether to build and keep the text of every section, so that writing again
+                after a change only formats the changed sections. This holds the whole file in memory and is
+                meant for loops that write the same input repeatedly. Defaults to False.
+        """
         file_path = Path(file_path)
+        profiles = profiling.active_profiles()
         with file_path.open("w") as f:
-            for line in self.lines:
-                f.write(line)
+            buffer = []
+            buffered_characters = 0
+            for option in self.options:
+                start_time = time.perf_counter() if profiles else 0.0
+                if cache or option.is_cached:
+                    f.write("".join(buffer))
+                    text = option.text
+                    f.write(text)
+                    buffer = []
+                    buffered_characters = 0
+                    if profiles:
+                        profiling.record(
+                            "write",
+                            type(option).__name__,
+                            time.perf_counter() - start_time,
+                            text.count("\n"),
+                            len(text),
+                        )
+                    continue
+                lines = option.iter_lines()
+                if profiles:
+                    counts = [0, 0]
+                    lines = _counted(lines, counts)
+                for line in lines:
+                    buffer.append(line)
+                    buffered_characters += len(line)
+                    if buffered_characters >= buffer_size:
+                        f.write("".join(buffer))
+                        buffer = []
+                        buffered_characters = 0
+                if profiles:
+                    profiling.record(
+                        "write",
+                        type(option).__name__,
+                        time.perf_counter() - start_time,
+                        *counts,
+                    )
+            f.write("".join(buffer))
+
+    def iter_lines(self) -> Iterator[str]:
+        for option in self.options:
+            yield from option.iter_lines()
 
     @property
-    def lines(self) -> str:
-        lines = []
-        for option in self.options:
-            lines.extend(option.lines)
-        return lines
+    def lines(self) -> List[str]:
+        if profiling.active_profiles():
+            lines = []
+            for option in self.options:
+                start_time = time.perf_counter()
+                option_lines = option.lines
+                profiling.record(
+                    "lines",
+                    type(option).__name__,
+                    time.perf_counter() - start_time,
+                    len(option_lines),
+                    sum(map(len, option_lines)),
+                )
+                lines.extend(option_lines)
+            return lines
+        return [line for option in self.options for line in option.lines]
 
     @property
     def pathnames(self):
-        return self._pathnames
+        return self._section("_pathnames")
 
     @property
     def command(self):
-        return self._command
+        return self._section("_command")
 
     @property
     def ageclasses(self):
-        return self._ageclasses
+        return self._section("_ageclasses")
 
     @property
     def outgrid(self):
-        return self._outgrid
+        return self._section("_outgrid")
 
     @property
     def outgrid_nest(self):
-        return self._outgrid_nest
+        return self._section("_outgrid_nest")
 
     @property
     def receptor(self):
-        return self._receptor
+        return self._section("_receptor")
 
     @property
     def species(self):
-        return self._species
+        return self._section("_species")
 
     @property
     def releases(self):
-        return self._releases
+        return self._section("_releases")
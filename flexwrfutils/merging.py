@@ -0,0 +1,227 @@
+import copy
+from typing import Dict, Hashable, List, Literal, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .flexwrfinput import Command, FlexwrfInput, Releases, Species
+
+
+def _command_key(command: Command) -> Tuple[str, ...]:
+    # the simulation windows of merged inputs are combined, all other settings have to match
+    return tuple(
+        argument.line
+        for argument in command._arguments
+        if argument is not command.start and argument is not command.stop
+    )
+
+
+def compatibility_key(flexwrf_input: FlexwrfInput) -> Tuple[Hashable, ...]:
+    """Returns a key that is equal for inputs that can be merged.
+
+    Inputs are compatible if their Command sections match apart from the simulation window, their Ageclasses,
+    Outgrid and OutgridNest sections are identical and their releases have the same EMITVAR. The Species sections
+    may differ, their tables are combined when merging. The key is built from the cached section texts, so
+    comparing many inputs is cheap.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input.
+
+    Returns:
+        Tuple[Hashable, ...]: Compatibility key.
+    """
+    return (
+        _command_key(flexwrf_input.command),
+        flexwrf_input.ageclasses.text,
+        flexwrf_input.outgrid.text,
+        flexwrf_input.outgrid_nest.text,
+        flexwrf_input.releases.emitvar.value,
+    )
+
+
+def check_compatibility(flexwrf_inputs: Sequence[FlexwrfInput]):
+    """Checks that inputs can be merged (see compatibility_key).
+
+    Args:
+        flexwrf_inputs (Sequence[FlexwrfInput]): Inputs.
+
+    Raises:
+        ValueError: If an input is not compatible with the first one.
+    """
+    reference = compatibility_key(flexwrf_inputs[0])
+    names = ["Command", "Ageclasses", "Outgrid", "OutgridNest", "EMITVAR"]
+    for input_index, flexwrf_input in enumerate(flexwrf_inputs[1:], 1):
+        key = compatibility_key(flexwrf_input)
+        if key != reference:
+            differing = [name for name, a, b in zip(names, reference, key) if a != b]
+            raise ValueError(
+                f"Input {input_index} is not compatible with input 0: {differing} differ."
+            )
+
+
+def _species_rows(species: Species) -> List[tuple]:
+    return list(zip(*[argument.value for argument in species._columns]))
+
+
+def _release_species_keys(releases: Releases, species_rows: List[tuple]) -> List[tuple]:
+    # a species of the releases is defined by its row in the species table and its emission variation
+    keys = []
+    for i, link in enumerate(releases.link.value):
+        key = (species_rows[link - 1],)
+        if releases.emitvar.value == 1:
+            key += tuple(
+                tuple(argument.value[i])
+                for argument in [
+                    releases.ihour,
+                    releases.area_hour,
+                    releases.point_hour,
+                    releases.idow,
+                    releases.area_dow,
+                    releases.point_dow,
+                ]
+            )
+        keys.append(key)
+    return keys
+
+
+def _group_ids(columns: Dict[str, np.ndarray], keys: List[str]) -> np.ndarray:
+    # exact grouping through the hash table of pandas, numbered in order of first occurrence
+    frame = pd.DataFrame({key: columns[key] for key in keys})
+    return frame.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+
+
+def merge_inputs(
+    flexwrf_inputs: Sequence[FlexwrfInput],
+    duplicates: Literal["keep", "drop", "aggregate"] = "drop",
+) -> Tuple[FlexwrfInput, pd.DataFrame]:
+    """Merges the releases of compatible inputs (see compatibility_key) into one input.
+
+    The merged input is a copy of the first input. Its simulation window covers the windows of all inputs and its
+    species table is the union of the species tables, in order of first occurrence. LINK and XMASS are remapped to
+    the combined species of the releases; a release has zero mass for species that its input does not emit.
+    Duplicate releases are found with a hash-based grouping of all release columns instead of pairwise comparisons.
+
+    Args:
+        flexwrf_inputs (Sequence[FlexwrfInput]): Inputs to merge.
+        duplicates (Literal["keep", "drop", "aggregate"], optional): "keep" keeps all releases, "drop" keeps the
+            first of releases that are identical in all columns and "aggregate" combines releases that only differ
+            in NPART and XMASS into one release with their sums. Defaults to "drop".
+
+    Raises:
+        ValueError: If the inputs are not compatible or duplicates is unknown.
+
+    Returns:
+        Tuple[FlexwrfInput, pd.DataFrame]: Merged input and a DataFrame with the columns input, release and
+            merged_release, which maps every release of the inputs to its release in the merged input.
+    """
+    if duplicates not in ("keep", "drop", "aggregate"):
+        raise ValueError(f"Unknown duplicates option: {duplicates}")
+    check_compatibility(flexwrf_inputs)
+
+    species_indices: Dict[tuple, int] = {}
+    release_species_indices: Dict[tuple, int] = {}
+    release_species_tables: List[List[list]] = []
+    input_columns = []
+    for flexwrf_input in flexwrf_inputs:
+        species_rows = _species_rows(flexwrf_input.species)
+        for row in species_rows:
+            species_indices.setdefault(row, len(species_indices))
+        releases = flexwrf_input.releases
+        mapping = []
+        for key in _release_species_keys(releases, species_rows):
+            if key not in release_species_indices:
+                release_species_indices[key] = len(release_species_indices)
+                release_species_tables.append([list(table) for table in key[1:]])
+            mapping.append(release_species_indices[key])
+        input_columns.append((releases.columns(), mapping))
+
+    nspec = len(release_species_indices)
+    columns = {}
+    for key in input_columns[0][0]:
+        if key != "xmass":
+            columns[key] = np.concatenate([values[key] for values, _ in input_columns])
+    xmass_blocks = []
+    for values, mapping in input_columns:
+        xmass = np.zeros((len(values["xmass"]), nspec))
+        for i, merged_index in enumerate(mapping):
+            xmass[:, merged_index] += values["xmass"][:, i]
+        xmass_blocks.append(xmass)
+    columns["xmass"] = np.concatenate(xmass_blocks)
+
+    release_keys = list(input_columns[0][0])
+    xmass_keys = [f"xmass_{i}" for i in range(nspec)]
+    columns.update(zip(xmass_keys, columns["xmass"].T))
+    if duplicates == "keep":
+        merged_releases = np.arange(len(columns["start"]))
+    else:
+        # aggregated releases only have to match in the columns other than npart and xmass
+        keys = [key for key in release_keys if key not in ("npart", "xmass")]
+        if duplicates == "drop":
+            keys += ["npart"] + xmass_keys
+        merged_releases = _group_ids(columns, keys)
+    first_releases = np.unique(merged_releases, return_index=True)[1]
+    merged_columns = {key: columns[key][first_releases] for key in release_keys}
+    if duplicates == "aggregate":
+        merged_columns["npart"] = (
+            np.bincount(merged_releases, weights=columns["npart"])
+            .round()
+            .astype(np.int64)
+        )
+        merged_columns["xmass"] = np.stack(
+            [np.bincount(merged_releases, weights=columns[key]) for key in xmass_keys],
+            axis=-1,
+        )
+
+    first = flexwrf_inputs[0]
+    releases = first.releases
+    empty_releases = copy.deepcopy(releases)
+    empty_releases.clear()
+    merged = copy.deepcopy(first, {id(releases): empty_releases})
+
+    command = merged.command
+    command.start = min(
+        flexwrf_input.command.start.datetime64 for flexwrf_input in flexwrf_inputs
+    )
+    command.stop = max(
+        flexwrf_input.command.stop.datetime64 for flexwrf_input in flexwrf_inputs
+    )
+
+    species_rows = list(species_indices)
+    for i, argument in enumerate(merged.species._columns):
+        argument.value = []
+        argument.extend([row[i] for row in species_rows])
+
+    merged_releases_option = merged.releases
+    merged_releases_option.link.value = []
+    merged_releases_option.link.extend(
+        [species_indices[key[0]] + 1 for key in release_species_indices]
+    )
+    if releases.emitvar.value == 1:
+        for i, argument in enumerate(
+            [
+                merged_releases_option.ihour,
+                merged_releases_option.area_hour,
+                merged_releases_option.point_hour,
+                merged_releases_option.idow,
+                merged_releases_option.area_dow,
+                merged_releases_option.point_dow,
+            ]
+        ):
+            argument.value = [tables[i] for tables in release_species_tables]
+    merged_releases_option.extend(**merged_columns)
+
+    input_indices = np.repeat(
+        np.arange(len(flexwrf_inputs)),
+        [len(values["start"]) for values, _ in input_columns],
+    )
+    release_indices = np.concatenate(
+        [np.arange(len(values["start"])) for values, _ in input_columns]
+    )
+    index = pd.DataFrame(
+        dict(
+            input=input_indices,
+            release=release_indices,
+            merged_release=merged_releases,
+        )
+    )
+    return merged, index
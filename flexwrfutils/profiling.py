@@ -0,0 +1,158 @@
+import atexit
+import cProfile
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+# "1" prints the report of the whole process to stderr at exit, any other value is the path of a JSON report
+ENVIRONMENT_VARIABLE = "FLEXWRFUTILS_PROFILE"
+# path of a cProfile dump of the whole process
+CPROFILE_ENVIRONMENT_VARIABLE = "FLEXWRFUTILS_CPROFILE"
+
+
+class SectionProfile:
+    """Collects wall time, lines and bytes per section of FlexwrfInput.read, .write and .lines.
+
+    Every record is a dict with the keys operation ("read", "write" or "lines"), section (class name of the
+    section), seconds, lines and bytes. lines is None if it is not known without extra work (parser="file").
+    Bytes are counted as characters, which equals bytes for the ASCII flexwrf.input files.
+    """
+
+    def __init__(self):
+        self.records: List[dict] = []
+
+    def add(
+        self,
+        operation: str,
+        section: str,
+        seconds: float,
+        lines: Optional[int],
+        n_bytes: Optional[int],
+    ):
+        self.records.append(
+            dict(
+                operation=operation,
+                section=section,
+                seconds=seconds,
+                lines=lines,
+                bytes=n_bytes,
+            )
+        )
+
+    def report(self) -> pd.DataFrame:
+        """Returns the totals per operation and section.
+
+        Returns:
+            pd.DataFrame: Columns operation, section, calls, seconds, lines and bytes, sorted by seconds.
+        """
+        columns = ["operation", "section", "calls", "seconds", "lines", "bytes"]
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        records = pd.DataFrame(self.records)
+        report = (
+            records.groupby(["operation", "section"], sort=False)
+            .agg(
+                calls=("seconds", "size"),
+                seconds=("seconds", "sum"),
+                lines=("lines", lambda values: values.sum(min_count=1)),
+                bytes=("bytes", lambda values: values.sum(min_count=1)),
+            )
+            .reset_index()
+        )
+        return report.sort_values("seconds", ascending=False, ignore_index=True)[
+            columns
+        ]
+
+    def to_dict(self) -> Dict[str, list]:
+        return dict(
+            records=self.records, report=self.report().to_dict(orient="records")
+        )
+
+    def __str__(self) -> str:
+        return self.report().to_string(index=False)
+
+
+_profiles: List[SectionProfile] = []
+
+
+def active_profiles() -> List[SectionProfile]:
+    """Returns the profiles that currently record. The list is empty (and checking it free) when profiling is off."""
+    return _profiles
+
+
+def record(
+    operation: str,
+    section: str,
+    seconds: float,
+    lines: Optional[int],
+    n_bytes: Optional[int],
+):
+    for profile in _profiles:
+        profile.add(operation, section, seconds, lines, n_bytes)
+
+
+@contextmanager
+def profile_sections(
+    cprofile_path: Optional[Union[str, Path]] = None,
+) -> Iterator[SectionProfile]:
+    """Records the sections of all reads, writes and lines of FlexwrfInput objects in the block.
+
+    Example:
+        with profile_sections("read.prof") as profile:
+            flexwrf_input.read(file_path)
+        print(profile.report())
+
+    Args:
+        cprofile_path (Optional[Union[str, Path]], optional): If given, the block also runs under cProfile and the
+            statistics are dumped to this path. Defaults to None.
+
+    Yields:
+        Iterator[SectionProfile]: Profile of the block.
+    """
+    profile = SectionProfile()
+    profiler = cProfile.Profile() if cprofile_path is not None else None
+    _profiles.append(profile)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(cprofile_path))
+        _profiles.remove(profile)
+
+
+def _profile_process(target: str, cprofile_path: Optional[str]):
+    profile = SectionProfile()
+    _profiles.append(profile)
+    profiler = None
+    if cprofile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        if target == "1":
+            print(profile, file=sys.stderr)
+        elif target:
+            with open(target, "w") as f:
+                json.dump(profile.to_dict(), f, indent=2)
+
+    atexit.register(finish)
+
+
+if os.environ.get(ENVIRONMENT_VARIABLE) or os.environ.get(
+    CPROFILE_ENVIRONMENT_VARIABLE
+):
+    _profile_process(
+        os.environ.get(ENVIRONMENT_VARIABLE, ""),
+        os.environ.get(CPROFILE_ENVIRONMENT_VARIABLE),
+    )
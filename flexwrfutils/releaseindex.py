@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import Literal, Tuple, Union
+
+import numpy as np
+
+from .flexwrfinput import Releases, to_datetime64
+
+TimeLike = Union[str, datetime, np.datetime64]
+
+
+class ReleaseIndex:
+    """Temporal and spatial index over the releases of a Releases section.
+
+    The time index keeps the release starts sorted, so window queries are binary searches. The spatial index sorts
+    the release centres ((xpoint1 + xpoint2) / 2, (ypoint1 + ypoint2) / 2) into the buckets of a regular grid; a
+    bounding box query only looks at the buckets that overlap the box. Distances are planar in the release
+    coordinates (degrees or meters, see RELEASE_COORD).
+
+    Queries return sorted release indices, mask turns them into boolean masks, e.g. for Releases.columns. The index
+    is a snapshot of the releases when it was built, is_current tells if they were changed since.
+
+    Args:
+        releases (Releases): Releases to index.
+        points_per_cell (float, optional): Average number of releases per grid cell, used to choose the cell size.
+            Defaults to 4.
+    """
+
+    def __init__(self, releases: Releases, points_per_cell: float = 4):
+        self._releases = releases
+        self._state = releases._state
+        self.n_releases = len(releases.start)
+
+        starts = releases.start.array
+        stops = releases.stop.array
+        self._start_order = np.argsort(starts, kind="stable")
+        self._sorted_starts = starts[self._start_order]
+        self._sorted_stops = stops[self._start_order]
+        durations = stops - starts
+        self._max_duration = (
+            durations.max() if self.n_releases else np.timedelta64(0, "s")
+        )
+
+        self.x = (releases.xpoint1.array + releases.xpoint2.array) / 2
+        self.y = (releases.ypoint1.array + releases.ypoint2.array) / 2
+        self._build_grid(points_per_cell)
+
+    def _build_grid(self, points_per_cell: float):
+        if self.n_releases == 0:
+            self._origin = np.zeros(2)
+            self.cell_size = 1.0
+            self._shape = (1, 1)
+        else:
+            self._origin = np.array([self.x.min(), self.y.min()])
+            extent = np.array([self.x.max(), self.y.max()]) - self._origin
+            if extent.max() == 0:
+                self.cell_size = 1.0
+            else:
+                # releases on a line would give cells of zero area
+                width, height = np.maximum(extent, extent.max() / self.n_releases)
+                self.cell_size = float(
+                    np.sqrt(width * height * points_per_cell / self.n_releases)
+                )
+            self._shape = tuple((extent // self.cell_size).astype(int) + 1)
+        # the buckets are stored like a CSR matrix: releases sorted by cell, and the offset of every cell
+        cells = self._cell_ids(self.x, self.y)
+        self._cell_order = np.argsort(cells, kind="stable")
+        self._cell_offsets = np.searchsorted(
+            cells[self._cell_order], np.arange(self._shape[0] * self._shape[1] + 1)
+        )
+
+    def _cell_coordinates(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        cell_x = np.floor((np.asarray(x) - self._origin[0]) / self.cell_size)
+        cell_y = np.floor((np.asarray(y) - self._origin[1]) / self.cell_size)
+        return (
+            np.clip(cell_x, 0, self._shape[0] - 1).astype(int),
+            np.clip(cell_y, 0, self._shape[1] - 1).astype(int),
+        )
+
+    def _cell_ids(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        cell_x, cell_y = self._cell_coordinates(x, y)
+        return cell_x * self._shape[1] + cell_y
+
+    def _cells_in_range(
+        self, cell_x0: int, cell_y0: int, cell_x1: int, cell_y1: int
+    ) -> np.ndarray:
+        # the cells of one column of the grid are contiguous in the sorted releases
+        rows = np.arange(cell_x0, cell_x1 + 1) * self._shape[1]
+        starts = self._cell_offsets[rows + cell_y0]
+        stops = self._cell_offsets[rows + cell_y1 + 1]
+        return np.concatenate(
+            [self._cell_order[start:stop] for start, stop in zip(starts, stops)]
+        )
+
+    @property
+    def is_current(self) -> bool:
+        return self._releases._state == self._state
+
+    def mask(self, release_indices: np.ndarray) -> np.ndarray:
+        """Converts release indices to a boolean mask over all releases.
+
+        Args:
+            release_indices (np.ndarray): Release indices, e.g. the result of a query.
+
+        Returns:
+            np.ndarray: Boolean mask of length n_releases.
+        """
+        mask = np.zeros(self.n_releases, dtype=bool)
+        mask[release_indices] = True
+        return mask
+
+    def in_window(
+        self,
+        start: TimeLike,
+        stop: TimeLike,
+        mode: Literal["start", "overlap"] = "start",
+    ) -> np.ndarray:
+        """Returns the releases that start in [start, stop) or, with mode="overlap", are active during it.
+
+        Args:
+            start (TimeLike): Start of the window.
+            stop (TimeLike): End of the window (exclusive).
+            mode (Literal["start", "overlap"], optional): "start" selects releases whose start is in the window,
+                "overlap" releases with start < stop and release stop > start. Defaults to "start".
+
+        Raises:
+            ValueError: If mode is unknown.
+
+        Returns:
+            np.ndarray: Sorted release indices.
+        """
+        start = to_datetime64(start)[0]
+        stop = to_datetime64(stop)[0]
+        if mode == "start":
+            first, last = np.searchsorted(self._sorted_starts, [start, stop], "left")
+            return np.sort(self._start_order[first:last])
+        if mode != "overlap":
+            raise ValueError(f"Unknown mode: {mode}")
+        # releases that are active during the window started at most max_duration before it
+        first = np.searchsorted(self._sorted_starts, start - self._max_duration, "left")
+        last = np.searchsorted(self._sorted_starts, stop, "left")
+        active = self._sorted_stops[first:last] > start
+        return np.sort(self._start_order[first:last][active])
+
+    def in_bbox(
+        self, x_min: float, y_min: float, x_max: float, y_max: float
+    ) -> np.ndarray:
+        """Returns the releases whose centre is in a bounding box (borders included).
+
+        Args:
+            x_min (float): Lower x (longitude) limit.
+            y_min (float): Lower y (latitude) limit.
+            x_max (float): Upper x (longitude) limit.
+            y_max (float): Upper y (latitude) limit.
+
+        Returns:
+            np.ndarray: Sorted release indices.
+        """
+        if self.n_releases == 0 or x_min > x_max or y_min > y_max:
+            return np.empty(0, dtype=int)
+        (cell_x0, cell_x1), (cell_y0, cell_y1) = self._cell_coordinates(
+            [x_min, x_max], [y_min, y_max]
+        )
+        candidates = self._cells_in_range(cell_x0, cell_y0, cell_x1, cell_y1)
+        x = self.x[candidates]
+        y = self.y[candidates]
+        inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+        return np.sort(candidates[inside])
+
+    def nearest(self, x: float, y: float, k: int = 1) -> np.ndarray:
+        """Returns the k releases whose centres are closest to a point.
+
+        The search grows a square of grid cells around the point until it holds k releases. All releases closer
+        than the k-th of them are then in the bounding box of that distance, which is searched exactly.
+
+        Args:
+            x (float): x (longitude) of the point.
+            y (float): y (latitude) of the point.
+            k (int, optional): Number of releases. Defaults to 1.
+
+        Returns:
+            np.ndarray: Release indices ordered by distance, ties by index.
+        """
+        k = min(k, self.n_releases)
+        if k <= 0:
+            return np.empty(0, dtype=int)
+        cell_x, cell_y = self._cell_coordinates(x, y)
+        radius = 0
+        while True:
+            candidates = self._cells_in_range(
+                max(cell_x - radius, 0),
+                max(cell_y - radius, 0),
+                min(cell_x + radius, self._shape[0] - 1),
+                min(cell_y + radius, self._shape[1] - 1),
+            )
+            if len(candidates) >= k:
+                break
+            radius += 1
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+        max_distance = np.partition(distances, k - 1)[k - 1]
+        candidates = np.union1d(
+            candidates,
+            self.in_bbox(
+                x - max_distance, y - max_distance, x + max_distance, y + max_distance
+            ),
+        )
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+        return candidates[np.lexsort((candidates, distances))[:k]]
@@ -0,0 +1,41 @@
+import argparse
+from pathlib import Path
+
+from flexwrfutils.binary import convert
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Script to convert flexwrf.input files between the text and the binary (.npz) format."
+    )
+    parser.add_argument(
+        "source",
+        type=str,
+        help="File to convert. Files with the suffix .npz are converted to text, all others to the binary format.",
+    )
+    parser.add_argument(
+        "destination",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Path of the converted file. If None, the suffix .npz is added to or removed from source.",
+    )
+    return parser
+
+
+def main():
+    parser = get_parser()
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    destination = args.destination
+    if destination is None:
+        if source.suffix == ".npz":
+            destination = source.with_suffix("")
+        else:
+            destination = source.with_name(f"{source.name}.npz")
+    convert(source, destination)
+
+
+if __name__ == "__main__":
+    main()
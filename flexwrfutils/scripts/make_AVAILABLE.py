@@ -1,11 +1,26 @@
 import argparse
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Literal, Tuple
+from time import monotonic, sleep
+from typing import Dict, Iterable, List, Literal, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import xarray as xr
 
+from flexwrfutils.fileutils import set_default_mode
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
 
 def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -42,21 +57,105 @@ def get_parser() -> argparse.ArgumentParser:
         choices=["start", "end"],
         help="Determines which to which file the overlaping times are assigned to. 'start'/'end' the file that starts/ends in the overlapping interval.",
     )
+    parser.add_argument(
+        "--reader",
+        default="light",
+        choices=["light", "full"],
+        help="How WRF output is opened. 'light' opens without decoding and loads only 'time_datavariable', 'full' opens with xarray's default decoding.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="Number of processes reading WRF output concurrently. The AVAILABLE file does not depend on it.",
+    )
+    parser.add_argument(
+        "--index_name",
+        type=str,
+        default=None,
+        help="Name of a SQLite index of the times of all files (saved into 'directory'). If given, reruns only read new or changed files.",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Poll 'directory' and extend the AVAILABLE file as new WRF output files are complete.",
+    )
+    parser.add_argument(
+        "--expected_times",
+        type=positive_int,
+        default=None,
+        help="Number of times in a complete WRF output file (required with --follow).",
+    )
+    parser.add_argument(
+        "--poll_interval",
+        type=float,
+        default=30,
+        help="Seconds between polls with --follow.",
+    )
+    parser.add_argument(
+        "--follow_timeout",
+        type=float,
+        default=None,
+        help="Seconds without new complete files after which --follow stops. If None, it runs until interrupted.",
+    )
     return parser
 
 
-def convert_to_datetime64(wrf_times: xr.DataArray) -> np.ndarray:
-    return np.char.replace(np.char.decode(wrf_times.values), "_", "T").astype(
+def convert_to_datetime64(wrf_times: Union[xr.DataArray, np.ndarray]) -> np.ndarray:
+    return np.char.replace(np.char.decode(np.asarray(wrf_times)), "_", "T").astype(
         "datetime64[s]"
     )
 
 
+def join_characters(wrf_times: np.ndarray) -> np.ndarray:
+    # undecoded WRF times are single characters with a last dimension DateStrLen
+    if wrf_times.dtype.kind != "S" or wrf_times.dtype.itemsize != 1:
+        return wrf_times
+    if wrf_times.ndim < 2:
+        wrf_times = wrf_times.reshape(1, -1)
+    length = wrf_times.shape[-1]
+    return np.ascontiguousarray(wrf_times).view(f"S{length}").reshape(-1)
+
+
+def read_file_times(
+    wrf_file: Union[str, Path],
+    time_datavariable: str = "Times",
+    reader: Literal["light", "full"] = "light",
+) -> np.ndarray:
+    """Reads the times of a WRF output file.
+
+    The light reader opens the file lazily without decoding (no coordinates, masks or CF times), loads only
+    time_datavariable and joins its characters itself. The file is closed before returning with both readers.
+
+    Args:
+        wrf_file (Union[str, Path]): Path of the WRF output file.
+        time_datavariable (str, optional): Variable with the times. Defaults to "Times".
+        reader (Literal["light", "full"], optional): "light" or "full" (xarray's default decoding).
+            Defaults to "light".
+
+    Raises:
+        ValueError: If reader is unknown.
+
+    Returns:
+        np.ndarray: Times as datetime64[s].
+    """
+    if reader == "light":
+        with xr.open_dataset(wrf_file, decode_cf=False, cache=False) as dataset:
+            wrf_times = dataset[time_datavariable].values
+        return convert_to_datetime64(join_characters(wrf_times))
+    if reader != "full":
+        raise ValueError(f"Unknown reader: {reader}")
+    with xr.open_dataset(wrf_file) as dataset:
+        return convert_to_datetime64(dataset[time_datavariable])
+
+
 def update_file_index(
     time: str,
     file_index: int,
     timerange_info: pd.DataFrame,
     overlap_choice: Literal["start", "end"],
 ) -> int:
+    # single step of the assignment, assign_file_indices does all steps at once
     # if the last WRF file is used then keep using it till the end
     if file_index == len(timerange_info) - 1:
         return file_index
@@ -79,31 +178,317 @@ def update_file_index(
     return file_index
 
 
+def assign_file_indices(
+    times: np.ndarray,
+    minima: np.ndarray,
+    maxima: np.ndarray,
+    overlap_choice: Literal["start", "end"],
+) -> np.ndarray:
+    """Assigns sorted times to files with the same result as stepping through them with update_file_index.
+
+    Stepping moves from file f to file f + 1 at the first time after the switch to f that is later than the
+    maximum of f (or, for overlap_choice="start", at least the minimum of f + 1). Both conditions only depend on
+    a threshold, so the first time fulfilling them is found with np.searchsorted. The step p[f + 1] at which file
+    f + 1 is reached is then max(p[f] + 1, k[f]) for the first fulfilling step k[f], which is a running maximum.
+
+    Args:
+        times (np.ndarray): Times, sorted ascending.
+        minima (np.ndarray): First time of every file, files sorted by it.
+        maxima (np.ndarray): Last time of every file.
+        overlap_choice (Literal["start", "end"]): File to use for times in the overlap of two files.
+
+    Raises:
+        ValueError: If times are not sorted.
+
+    Returns:
+        np.ndarray: Index of the file of every time.
+    """
+    times = np.asarray(times)
+    if len(times) > 1 and (times[1:] < times[:-1]).any():
+        raise ValueError("times have to be sorted.")
+    n_files = len(minima)
+    if n_files <= 1 or len(times) == 0:
+        return np.zeros(len(times), dtype=np.int64)
+    first_steps = np.searchsorted(times, np.asarray(maxima)[:-1], side="right")
+    if overlap_choice == "start":
+        first_steps = np.minimum(
+            first_steps, np.searchsorted(times, np.asarray(minima)[1:], side="left")
+        )
+    file_numbers = np.arange(1, n_files)
+    # p[f] - f is the running maximum of k[f - 1] - f, starting at p[0] = -1
+    switch_steps = (
+        np.maximum.accumulate(np.maximum(first_steps - file_numbers, -1)) + file_numbers
+    )
+    return np.searchsorted(switch_steps, np.arange(len(times)), side="right")
+
+
 def assign_files(
     times: np.ndarray,
     timerange_info: pd.DataFrame,
     overlap_choice: Literal["start", "end"],
 ):
-    file_list = []
-    file_index = 0
-
-    for time in times:
-        file_index = update_file_index(time, file_index, timerange_info, overlap_choice)
-        file_list.append(timerange_info.iloc[file_index]["file_path"])
-    return file_list
+    file_indices = assign_file_indices(
+        times,
+        timerange_info["min"].to_numpy(),
+        timerange_info["max"].to_numpy(),
+        overlap_choice,
+    )
+    return timerange_info["file_path"].to_numpy()[file_indices].tolist()
 
 
 def extract_datetime_strings(
     wrf_times: np.ndarray,
 ) -> Tuple[List[str], List[str]]:
-    dates = []
-    times = []
-    wrf_times = wrf_times.astype(str)
-    for wrf_time in wrf_times:
-        date, time = wrf_time.replace("-", "").replace(":", "").split("T")
-        dates.append(date)
-        times.append(time)
-    return dates, times
+    # "YYYY-MM-DDTHH:MM:SS" as characters, from which the digits of date and time are picked
+    iso_strings = np.datetime_as_string(
+        np.asarray(wrf_times, dtype="datetime64[s]").reshape(-1), unit="s"
+    )
+    chars = iso_strings.astype("U19").view(np.uint32).reshape(-1, 19)
+    dates = np.ascontiguousarray(chars[:, [0, 1, 2, 3, 5, 6, 8, 9]]).view("U8")
+    times = np.ascontiguousarray(chars[:, [11, 12, 14, 15, 17, 18]]).view("U6")
+    return dates.reshape(-1).tolist(), times.reshape(-1).tolist()
+
+
+def read_times(
+    wrf_files: List[Union[str, Path]],
+    time_datavariable: str = "Times",
+    reader: Literal["light", "full"] = "light",
+    workers: Optional[int] = 1,
+) -> List[np.ndarray]:
+    if workers == 1 or len(wrf_files) <= 1:
+        return [
+            read_file_times(wrf_file, time_datavariable, reader)
+            for wrf_file in wrf_files
+        ]
+    # map keeps the order of the files, so the result is the same as reading them one after another
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                read_file_times,
+                wrf_files,
+                repeat(time_datavariable),
+                repeat(reader),
+            )
+        )
+
+
+def combine_times(
+    wrf_files: List[Union[str, Path]], file_times: List[np.ndarray]
+) -> Tuple[np.ndarray, pd.DataFrame]:
+    timerange_info = pd.DataFrame(
+        dict(
+            file_path=wrf_files,
+            min=[wrf_file_times.min() for wrf_file_times in file_times],
+            max=[wrf_file_times.max() for wrf_file_times in file_times],
+        )
+    )
+    timerange_info = timerange_info.sort_values(by="min", kind="stable")
+    if file_times:
+        wrf_total_times = np.concatenate(file_times).astype("datetime64[s]")
+    else:
+        wrf_total_times = np.array([], dtype="datetime64[s]")
+    return np.unique(wrf_total_times), timerange_info
+
+
+def scan_files(
+    wrf_files: Iterable[Union[str, Path]],
+    time_datavariable: str = "Times",
+    reader: Literal["light", "full"] = "light",
+    workers: Optional[int] = 1,
+) -> Tuple[np.ndarray, pd.DataFrame]:
+    """Reads the times of WRF output files.
+
+    Args:
+        wrf_files (Iterable[Union[str, Path]]): Paths of the WRF output files.
+        time_datavariable (str, optional): Variable with the times. Defaults to "Times".
+        reader (Literal["light", "full"], optional): See read_file_times. Defaults to "light".
+        workers (Optional[int], optional): Number of worker processes. 1 reads in the current process, None uses
+            the number of CPUs. The result does not depend on it. Defaults to 1.
+
+    Returns:
+        Tuple[np.ndarray, pd.DataFrame]: Sorted unique times of all files and the file_path, min and max of every
+            file, sorted by min.
+    """
+    wrf_files = sorted(wrf_files)
+    file_times = read_times(wrf_files, time_datavariable, reader, workers)
+    return combine_times(wrf_files, file_times)
+
+
+def scan_files_indexed(
+    wrf_files: Iterable[Union[str, Path]],
+    index_path: Union[str, Path],
+    time_datavariable: str = "Times",
+    reader: Literal["light", "full"] = "light",
+    workers: Optional[int] = 1,
+) -> Tuple[np.ndarray, pd.DataFrame]:
+    """Like scan_files, but keeps the times of every file in a SQLite index and only reads new or changed files.
+
+    A file is read again if its size, modification time or time_datavariable differs from the index. Files that
+    are not in wrf_files anymore are dropped from the index. The index is updated in one transaction.
+
+    Args:
+        wrf_files (Iterable[Union[str, Path]]): Paths of the WRF output files.
+        index_path (Union[str, Path]): Path of the index, created if it does not exist.
+        time_datavariable (str, optional): Variable with the times. Defaults to "Times".
+        reader (Literal["light", "full"], optional): See read_file_times. Defaults to "light".
+        workers (Optional[int], optional): Number of worker processes for reading files. Defaults to 1.
+
+    Returns:
+        Tuple[np.ndarray, pd.DataFrame]: Same as scan_files.
+    """
+    wrf_files = sorted(wrf_files)
+    keys = [str(Path(wrf_file).resolve()) for wrf_file in wrf_files]
+    stats = [Path(wrf_file).stat() for wrf_file in wrf_files]
+
+    connection = sqlite3.connect(str(index_path))
+    try:
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                "time_datavariable TEXT, times BLOB)"
+            )
+            indexed = {
+                path: (size, mtime_ns, variable, times)
+                for path, size, mtime_ns, variable, times in connection.execute(
+                    "SELECT path, size, mtime_ns, time_datavariable, times FROM files"
+                )
+            }
+            file_times: List[Optional[np.ndarray]] = []
+            for key, stat in zip(keys, stats):
+                entry = indexed.get(key)
+                if entry is not None and entry[:3] == (
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    time_datavariable,
+                ):
+                    file_times.append(
+                        np.frombuffer(entry[3], dtype=np.int64).astype("datetime64[s]")
+                    )
+                else:
+                    file_times.append(None)
+
+            unread = [i for i, times in enumerate(file_times) if times is None]
+            read = read_times(
+                [wrf_files[i] for i in unread], time_datavariable, reader, workers
+            )
+            for i, times in zip(unread, read):
+                file_times[i] = times
+            connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        keys[i],
+                        stats[i].st_size,
+                        stats[i].st_mtime_ns,
+                        time_datavariable,
+                        np.asarray(times, dtype="datetime64[s]")
+                        .astype(np.int64)
+                        .tobytes(),
+                    )
+                    for i, times in zip(unread, read)
+                ],
+            )
+            connection.executemany(
+                "DELETE FROM files WHERE path = ?",
+                [(path,) for path in indexed.keys() - set(keys)],
+            )
+    finally:
+        connection.close()
+    return combine_times(wrf_files, file_times)
+
+
+def write_available(
+    output_file: Union[str, Path],
+    wrf_times: np.ndarray,
+    assigned_wrf_files: List[Union[str, Path]],
+):
+    """Writes an AVAILABLE file. It is written next to output_file and renamed, so output_file is always complete."""
+    output_file = Path(output_file)
+    dates, times = extract_datetime_strings(wrf_times)
+    file_descriptor, tmp_path = tempfile.mkstemp(
+        dir=output_file.parent, prefix=f".{output_file.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w") as available_file:
+            available_file.write("XXXXXX EMPTY LINES XXXXXXXXX\n")
+            available_file.write("XXXXXX EMPTY LINES XXXXXXXX\n")
+            available_file.write(
+                "YYYYMMDD HHMMSS      name of the file(up to 80 characters)\n"
+            )
+            for assigned_wrf_file, date, time in zip(assigned_wrf_files, dates, times):
+                available_file.write(
+                    f"{date} {time}      '{assigned_wrf_file}'      ' '\n"
+                )
+        set_default_mode(tmp_path)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def follow(
+    directory: Union[str, Path],
+    output_file: Union[str, Path],
+    expected_times: int,
+    filename: str = "wrfout_d01_",
+    time_datavariable: str = "Times",
+    reader: Literal["light", "full"] = "light",
+    overlap_choice: Literal["start", "end"] = "start",
+    poll_interval: float = 30,
+    timeout: Optional[float] = None,
+) -> int:
+    """Polls a directory for WRF output files and extends the AVAILABLE file whenever new files are complete.
+
+    A file is complete when it can be read and holds at least expected_times times; files that are still being
+    written are tried again at the next poll. After new files are complete, the AVAILABLE file of all complete
+    files is written (as by main for the same files) and replaces output_file atomically.
+
+    Args:
+        directory (Union[str, Path]): Directory with the WRF output.
+        output_file (Union[str, Path]): Path of the AVAILABLE file.
+        expected_times (int): Number of times of a complete file.
+        filename (str, optional): Common part of the WRF output filenames. Defaults to "wrfout_d01_".
+        time_datavariable (str, optional): Variable with the times. Defaults to "Times".
+        reader (Literal["light", "full"], optional): See read_file_times. Defaults to "light".
+        overlap_choice (Literal["start", "end"], optional): See assign_file_indices. Defaults to "start".
+        poll_interval (float, optional): Seconds between polls. Defaults to 30.
+        timeout (Optional[float], optional): Seconds without new complete files after which to return. Defaults
+            to None (never).
+
+    Returns:
+        int: Number of complete files.
+    """
+    directory = Path(directory)
+    complete_times: Dict[Path, np.ndarray] = {}
+    last_change = monotonic()
+    while True:
+        found = False
+        for wrf_file in sorted(
+            set(directory.glob(f"{filename}*")) - complete_times.keys()
+        ):
+            try:
+                wrf_file_times = read_file_times(wrf_file, time_datavariable, reader)
+            except (OSError, ValueError, KeyError, RuntimeError):
+                # files that are being written can have incomplete headers
+                continue
+            if len(wrf_file_times) >= expected_times:
+                complete_times[wrf_file] = wrf_file_times
+                found = True
+
+        if found:
+            wrf_files = sorted(complete_times)
+            wrf_times, timerange_info = combine_times(
+                wrf_files, [complete_times[wrf_file] for wrf_file in wrf_files]
+            )
+            write_available(
+                output_file,
+                wrf_times,
+                assign_files(wrf_times, timerange_info, overlap_choice),
+            )
+            last_change = monotonic()
+        elif timeout is not None and monotonic() - last_change >= timeout:
+            return len(complete_times)
+        sleep(poll_interval)
 
 
 def main():
@@ -112,37 +497,39 @@ def main():
 
     file_directory = Path(args.directory)
     output_file = file_directory / args.output_name
+    if args.follow:
+        if args.expected_times is None:
+            parser.error("--follow requires --expected_times")
+        follow(
+            file_directory,
+            output_file,
+            args.expected_times,
+            args.filename,
+            args.time_datavariable,
+            args.reader,
+            args.overlap_choice,
+            args.poll_interval,
+            args.follow_timeout,
+        )
+        return
     wrf_files = file_directory.glob(f"{args.filename}*")
 
-    wrf_total_times = []
-    timerange_info = dict(file_path=[], min=[], max=[])
-
-    for wrf_file in wrf_files:
-        wrf_file_times = xr.open_dataset(wrf_file)[args.time_datavariable]
-        wrf_file_times = convert_to_datetime64(wrf_file_times)
-        wrf_total_times.extend(wrf_file_times)
-        timerange_info["file_path"].append(wrf_file)
-        timerange_info["min"].append(wrf_file_times.min())
-        timerange_info["max"].append(wrf_file_times.max())
-
-    wrf_total_times = np.array(wrf_total_times).astype("datetime64[s]")
-    wrf_total_times = np.unique(wrf_total_times)
-    timerange_info = pd.DataFrame(timerange_info)
-    timerange_info = timerange_info.sort_values(by="min")
-
+    if args.index_name is None:
+        wrf_total_times, timerange_info = scan_files(
+            wrf_files, args.time_datavariable, args.reader, args.workers
+        )
+    else:
+        wrf_total_times, timerange_info = scan_files_indexed(
+            wrf_files,
+            file_directory / args.index_name,
+            args.time_datavariable,
+            args.reader,
+            args.workers,
+        )
     assigned_wrf_files = assign_files(
         wrf_total_times, timerange_info, args.overlap_choice
     )
-    dates, times = extract_datetime_strings(wrf_total_times)
-
-    with output_file.open("w") as available_file:
-        available_file.write("XXXXXX EMPTY LINES XXXXXXXXX\n")
-        available_file.write("XXXXXX EMPTY LINES XXXXXXXX\n")
-        available_file.write(
-            "YYYYMMDD HHMMSS      name of the file(up to 80 characters)\n"
-        )
-        for assigned_wrf_file, date, time in zip(assigned_wrf_files, dates, times):
-            available_file.write(f"{date} {time}      '{assigned_wrf_file}'      ' '\n")
+    write_available(output_file, wrf_total_times, assigned_wrf_files)
 
 
 if __name__ == "__main__":
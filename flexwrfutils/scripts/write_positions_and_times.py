@@ -1,4 +1,17 @@
 import argparse
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from flexwrfutils.flexwrfinput import FlexwrfInput, Releases
+
+RELEASE_KEYS = list(Releases().release_arguments)
+SECOND_CORNER_DEFAULTS = dict(
+    stop="start", xpoint2="xpoint1", ypoint2="ypoint1", zpoint2="zpoint1"
+)
 
 
 def get_parser():
@@ -6,7 +19,9 @@ def get_parser():
         description="Script to insert coordinates (times and positions) of releases from textfile into flexwrf.input file."
     )
     parser.add_argument(
-        "coordinate_file", type=str, help="Path to file with coordinate information."
+        "coordinate_file",
+        type=str,
+        help="Path to file with coordinate information (.csv, .npy or .npz). Columns/fields are named after the release arguments (start, stop, xpoint1, ypoint1, ...). xmass is given as 'xmass' (if NSPEC is 1) or as 'xmass1', 'xmass2', ... for each species.",
     )
     parser.add_argument(
         "flexwrf_input_file", type=str, help="Path to flexwrf.input file to insert in."
@@ -23,11 +38,201 @@ def get_parser():
         default=None,
         help="Name for output file. If None, an automaitc name is chosen.",
     )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100000,
+        help="Number of releases read from coordinate_file at once.",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Keep the releases of flexwrf_input_file and append the new ones. By default they are replaced.",
+    )
     return parser
 
 
+def _read_member_chunks(
+    archive: zipfile.ZipFile, name: str, chunksize: int
+) -> Iterator[Union[int, np.ndarray]]:
+    # yields the number of rows and then the rows in chunks, reading only one chunk at a time from the
+    # (compressed or stored) member
+    with archive.open(name) as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        if len(shape) == 0 or dtype.hasobject:
+            raise ValueError(
+                f"{name} has to contain an array with one row per release and no objects."
+            )
+        yield shape[0]
+        if fortran_order and len(shape) > 1:
+            # the rows are not contiguous, so the column has to be read at once
+            array = np.frombuffer(f.read(), dtype=dtype).reshape(shape, order="F")
+            for start in range(0, shape[0], chunksize):
+                yield array[start : start + chunksize]
+            return
+        row_shape = shape[1:]
+        row_size = dtype.itemsize * int(np.prod(row_shape))
+        for start in range(0, shape[0], chunksize):
+            n_rows = min(chunksize, shape[0] - start)
+            yield np.frombuffer(f.read(n_rows * row_size), dtype=dtype).reshape(
+                n_rows, *row_shape
+            )
+
+
+def read_coordinate_chunks(
+    coordinate_file: Union[str, Path], chunksize: int
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Reads columns of a coordinate file in chunks.
+
+    Args:
+        coordinate_file (Union[str, Path]): .csv file with header, .npy file with structured array or .npz file with one array per column.
+        chunksize (int): Maximal number of rows per chunk.
+
+    Yields:
+        Dict[str, np.ndarray]: Columns of the chunk.
+    """
+    coordinate_file = Path(coordinate_file)
+    if coordinate_file.suffix == ".npy":
+        array = np.load(coordinate_file, mmap_mode="r")
+        if array.dtype.names is None:
+            raise ValueError(
+                ".npy coordinate files have to contain a structured array."
+            )
+        for start in range(0, len(array), chunksize):
+            chunk = array[start : start + chunksize]
+            yield {key: np.asarray(chunk[key]) for key in array.dtype.names}
+    elif coordinate_file.suffix == ".npz":
+        with zipfile.ZipFile(coordinate_file) as archive:
+            names = [name for name in archive.namelist() if name.endswith(".npy")]
+            readers = [_read_member_chunks(archive, name, chunksize) for name in names]
+            n_rows = {name: next(reader) for name, reader in zip(names, readers)}
+            if len(set(n_rows.values())) > 1:
+                raise ValueError(f"Columns have different lengths: {n_rows}")
+            for chunks in zip(*readers):
+                yield {
+                    name[: -len(".npy")]: chunk for name, chunk in zip(names, chunks)
+                }
+    else:
+        string_columns = dict(start=str, stop=str, name=str)
+        for chunk in pd.read_csv(
+            coordinate_file,
+            chunksize=chunksize,
+            dtype=string_columns,
+            skipinitialspace=True,
+        ):
+            yield {key: chunk[key].to_numpy() for key in chunk.columns}
+
+
+def complete_columns(
+    columns: Dict[str, np.ndarray], nspec: int, template: Optional[Dict[str, Any]]
+) -> Dict[str, np.ndarray]:
+    """Fills the columns that are missing in a chunk.
+
+    Missing end points (stop, xpoint2, ypoint2, zpoint2) are set to their start points. All other missing
+    columns are taken from the template release.
+
+    Args:
+        columns (Dict[str, np.ndarray]): Columns read from the coordinate file.
+        nspec (int): Number of species of the releases.
+        template (Optional[Dict[str, Any]]): Values of a release used for missing columns.
+
+    Raises:
+        ValueError: If a column is missing and there is no template, or the xmass columns do not match nspec.
+
+    Returns:
+        Dict[str, np.ndarray]: Value for every release argument.
+    """
+    columns = dict(columns)
+    n_rows = next((len(value) for value in columns.values() if np.ndim(value) > 0), 1)
+    xmass_keys = [f"xmass{i + 1}" for i in range(nspec)]
+    given_xmass_keys = [
+        key for key in columns if key.startswith("xmass") and key != "xmass"
+    ]
+    if given_xmass_keys:
+        if "xmass" in columns or sorted(given_xmass_keys) != sorted(xmass_keys):
+            raise ValueError(
+                f"xmass has to be given as 'xmass' (nspec=1) or as the columns {xmass_keys}, got "
+                f"{sorted(given_xmass_keys + (['xmass'] if 'xmass' in columns else []))}"
+            )
+        columns["xmass"] = np.stack([columns.pop(key) for key in xmass_keys], axis=-1)
+    elif "xmass" in columns and np.ndim(columns["xmass"]) == 1:
+        if nspec != 1:
+            raise ValueError(
+                f"A single xmass column needs nspec=1, but there are {nspec} species. Use the columns {xmass_keys}."
+            )
+        columns["xmass"] = np.reshape(columns["xmass"], (-1, 1))
+    for key, default_key in SECOND_CORNER_DEFAULTS.items():
+        if key not in columns and default_key in columns:
+            columns[key] = columns[default_key]
+
+    for key in RELEASE_KEYS:
+        if key in columns:
+            continue
+        if template is None:
+            raise ValueError(
+                f"Column '{key}' is missing and there is no release to take it from."
+            )
+        columns[key] = template[key]
+    if np.ndim(columns["xmass"]) < 2:
+        columns["xmass"] = np.broadcast_to(
+            np.asarray(columns["xmass"], dtype=float).reshape(1, -1), (n_rows, nspec)
+        )
+    return {key: columns[key] for key in RELEASE_KEYS}
+
+
+def insert_coordinates(
+    flexwrf_input: FlexwrfInput,
+    coordinate_file: Union[str, Path],
+    chunksize: int = 100000,
+    append: bool = False,
+):
+    """Inserts all releases of a coordinate file into a FlexwrfInput.
+
+    Columns missing in the coordinate file are taken from the first release of flexwrf_input.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input to insert the releases in.
+        coordinate_file (Union[str, Path]): File with one column per release argument (see read_coordinate_chunks).
+        chunksize (int, optional): Number of releases inserted at once. Defaults to 100000.
+        append (bool, optional): Whether to keep the present releases. Defaults to False.
+    """
+    releases = flexwrf_input.releases
+    template = None
+    if len(releases.start) > 0:
+        template = {
+            key: release_argument[0]
+            for key, release_argument in releases.release_arguments.items()
+        }
+    if not append:
+        releases.clear()
+
+    for columns in read_coordinate_chunks(coordinate_file, chunksize):
+        columns = complete_columns(columns, releases.nspec.value, template)
+        releases.extend(**columns)
+
+
 def main():
-    raise NotImplementedError
+    parser = get_parser()
+    args = parser.parse_args()
+
+    coordinate_file = Path(args.coordinate_file)
+    flexwrf_input_file = Path(args.flexwrf_input_file)
+    output_dir = (
+        flexwrf_input_file.parent if args.output_dir is None else Path(args.output_dir)
+    )
+    output_name = args.output_name
+    if output_name is None:
+        output_name = f"{flexwrf_input_file.name}_{coordinate_file.stem}"
+
+    flexwrf_input = FlexwrfInput()
+    flexwrf_input.read(flexwrf_input_file)
+    insert_coordinates(flexwrf_input, coordinate_file, args.chunksize, args.append)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    flexwrf_input.write(output_dir / output_name)
 
 
 if __name__ == "__main__":
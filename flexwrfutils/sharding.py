@@ -0,0 +1,49 @@
+from pathlib import Path
+from typing import Union
+
+from .ensemble import write_atomic
+from .flexwrfinput import FlexwrfInput
+
+
+def write_shards(
+    flexwrf_input: FlexwrfInput,
+    n_shards: int,
+    output_directory: Union[str, Path],
+    respect_time_order: bool = False,
+    file_name: str = "flexwrf.input",
+    shard_name: str = "shard_{:04d}",
+) -> Path:
+    """Splits the releases of an input into shards (see FlexwrfInput.split) and writes one input file per shard.
+
+    The input of shard i is written to output_directory/shard_name.format(i)/file_name. The index
+    (shard_index.csv in output_directory) has one row per release of flexwrf_input with its shard and its index
+    in the shard, so the outputs of the shards can be combined again.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input to split.
+        n_shards (int): Maximal number of shards.
+        output_directory (Union[str, Path]): Directory in which the shard directories are created.
+        respect_time_order (bool, optional): Whether shards have to cover consecutive release times.
+            Defaults to False.
+        file_name (str, optional): Name of the input file of every shard. Defaults to "flexwrf.input".
+        shard_name (str, optional): Format string for the shard directories and output paths. Defaults to "shard_{:04d}".
+
+    Returns:
+        Path: Path of the index.
+    """
+    output_directory = Path(output_directory)
+    shard_inputs, index = flexwrf_input.split(n_shards, respect_time_order, shard_name)
+    for shard, shard_input in enumerate(shard_inputs):
+        shard_directory = output_directory / shard_name.format(shard)
+        shard_directory.mkdir(parents=True, exist_ok=True)
+        write_atomic(shard_input, shard_directory / file_name)
+
+    index["file"] = [
+        str(output_directory / shard_name.format(shard) / file_name)
+        for shard in index["shard"]
+    ]
+    index_path = output_directory / "shard_index.csv"
+    tmp_path = index_path.with_name(f".{index_path.name}.tmp")
+    index.to_csv(tmp_path, index=False)
+    tmp_path.replace(index_path)
+    return index_path
@@ -0,0 +1,288 @@
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .flexwrfinput import FlexwrfInput, Outgrid, OutgridNest
+
+
+class ValidationIssue:
+    """Failed check of a validation.
+
+    Args:
+        check (str): Name of the check, e.g. "release_time_order".
+        message (str): Description of the problem.
+        indices (Optional[Sequence[int]], optional): All offending indices (e.g. of releases). Defaults to None.
+    """
+
+    def __init__(
+        self, check: str, message: str, indices: Optional[Sequence[int]] = None
+    ):
+        self.check = check
+        self.message = message
+        self.indices = np.asarray(
+            [] if indices is None else indices, dtype=np.int64
+        ).reshape(-1)
+
+    def __str__(self) -> str:
+        if len(self.indices) == 0:
+            return f"{self.check}: {self.message}"
+        shown = ", ".join(str(index) for index in self.indices[:10])
+        if len(self.indices) > 10:
+            shown += ", ..."
+        return f"{self.check}: {self.message} ({len(self.indices)} offending: {shown})"
+
+    def __repr__(self) -> str:
+        return f"ValidationIssue({str(self)!r})"
+
+
+class ValidationReport:
+    """Result of validate with all failed checks."""
+
+    def __init__(self, issues: List[ValidationIssue]):
+        self.issues = issues
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.issues
+
+    def __bool__(self) -> bool:
+        return self.is_valid
+
+    def __str__(self) -> str:
+        if self.is_valid:
+            return "valid"
+        return "\n".join(str(issue) for issue in self.issues)
+
+    def __getitem__(self, check: str) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.check == check]
+
+    def raise_if_invalid(self):
+        """Raises a ValueError listing all issues if there are any."""
+        if not self.is_valid:
+            raise ValueError(f"Invalid flexwrf.input:\n{self}")
+
+
+def _domain(outgrid: Union[Outgrid, OutgridNest]) -> Tuple[float, float, float, float]:
+    left = outgrid.outlonleft.value
+    lower = outgrid.outlatlower.value
+    if outgrid.outgriddef.value == 1:
+        return left, lower, outgrid.dxoutlon.value, outgrid.dyoutlat.value
+    right = left + outgrid.numxgrid.value * outgrid.dxoutlon.value
+    upper = lower + outgrid.numygrid.value * outgrid.dyoutlat.value
+    return left, lower, right, upper
+
+
+def _check_counts(flexwrf_input: FlexwrfInput) -> List[ValidationIssue]:
+    pathnames = flexwrf_input.pathnames
+    ageclasses = flexwrf_input.ageclasses
+    outgrid = flexwrf_input.outgrid
+    receptor = flexwrf_input.receptor
+    species = flexwrf_input.species
+    releases = flexwrf_input.releases
+    counts = [
+        ("inputpath", len(pathnames.availablepath), len(pathnames.inputpath)),
+        ("nageclasses", ageclasses.nageclasses.value, len(ageclasses.ageclasses)),
+        ("numzgrid", outgrid.numzgrid.value, len(outgrid.levels)),
+    ]
+    counts += [
+        ("numreceptor", receptor.numreceptor.value, len(argument))
+        for argument in [receptor.receptor, receptor.x, receptor.y]
+    ]
+    counts += [
+        ("numtable", species.numtable.value, len(argument))
+        for argument in species._columns
+    ]
+    counts.append(("nspec", releases.nspec.value, len(releases.link)))
+    if releases.emitvar.value == 1:
+        counts += [
+            ("nspec", releases.nspec.value, len(argument))
+            for argument in [
+                releases.ihour,
+                releases.area_hour,
+                releases.point_hour,
+                releases.idow,
+                releases.area_dow,
+                releases.point_dow,
+            ]
+        ]
+    counts += [
+        (f"numpoint ({key})", releases.numpoint.value, len(argument.array))
+        for key, argument in releases.release_arguments.items()
+    ]
+    return [
+        ValidationIssue(
+            "specifier_count",
+            f"{name} is {expected}, but there are {length} values",
+        )
+        for name, expected, length in counts
+        if expected != length
+    ]
+
+
+def _check_command(flexwrf_input: FlexwrfInput) -> List[ValidationIssue]:
+    command = flexwrf_input.command
+    issues = []
+    if command.ldirect.value not in (1, -1):
+        issues.append(
+            ValidationIssue(
+                "ldirect", f"LDIRECT is {command.ldirect.value}, not 1 or -1"
+            )
+        )
+    if command.start.datetime64 >= command.stop.datetime64:
+        issues.append(
+            ValidationIssue(
+                "simulation_window",
+                "the beginning of the simulation is not before its end",
+            )
+        )
+    return issues
+
+
+def _check_release_times(flexwrf_input: FlexwrfInput) -> List[ValidationIssue]:
+    command = flexwrf_input.command
+    releases = flexwrf_input.releases
+    starts = releases.start.array
+    stops = releases.stop.array
+    issues = []
+    reversed_releases = np.flatnonzero(starts > stops)
+    if len(reversed_releases):
+        issues.append(
+            ValidationIssue(
+                "release_time_order",
+                "release starts after it stops",
+                reversed_releases,
+            )
+        )
+    outside = np.flatnonzero(
+        (starts < command.start.datetime64) | (stops > command.stop.datetime64)
+    )
+    if len(outside):
+        issues.append(
+            ValidationIssue(
+                "release_time_window",
+                f"release is not inside the simulation window ({command.start.value} - {command.stop.value})",
+                outside,
+            )
+        )
+    return issues
+
+
+def _check_release_domain(flexwrf_input: FlexwrfInput) -> List[ValidationIssue]:
+    command = flexwrf_input.command
+    releases = flexwrf_input.releases
+    issues = []
+    xpoint1 = releases.xpoint1.array
+    ypoint1 = releases.ypoint1.array
+    xpoint2 = releases.xpoint2.array
+    ypoint2 = releases.ypoint2.array
+    flipped = np.flatnonzero((xpoint1 > xpoint2) | (ypoint1 > ypoint2))
+    if len(flipped):
+        issues.append(
+            ValidationIssue(
+                "release_box",
+                "lower left corner of the release is not below and left of the upper right corner",
+                flipped,
+            )
+        )
+    # the domains can only be compared if both use the same coordinates
+    if command.outgridcoord.value != command.releasecoord.value:
+        return issues
+    left, lower, right, upper = _domain(flexwrf_input.outgrid)
+    outside = np.flatnonzero(
+        (np.minimum(xpoint1, xpoint2) < left)
+        | (np.maximum(xpoint1, xpoint2) > right)
+        | (np.minimum(ypoint1, ypoint2) < lower)
+        | (np.maximum(ypoint1, ypoint2) > upper)
+    )
+    if len(outside):
+        issues.append(
+            ValidationIssue(
+                "release_domain",
+                f"release box is not inside the output grid ({left}, {lower}, {right}, {upper})",
+                outside,
+            )
+        )
+    outgrid_nest = flexwrf_input.outgrid_nest
+    if outgrid_nest.outlonleft.value is not None:
+        nest_left, nest_lower, nest_right, nest_upper = _domain(outgrid_nest)
+        if (
+            nest_left < left
+            or nest_lower < lower
+            or nest_right > right
+            or nest_upper > upper
+        ):
+            issues.append(
+                ValidationIssue(
+                    "nest_domain",
+                    f"nested output grid ({nest_left}, {nest_lower}, {nest_right}, {nest_upper}) is not inside "
+                    f"the output grid ({left}, {lower}, {right}, {upper})",
+                )
+            )
+    return issues
+
+
+def _check_species(flexwrf_input: FlexwrfInput) -> List[ValidationIssue]:
+    releases = flexwrf_input.releases
+    numtable = flexwrf_input.species.numtable.value
+    issues = []
+    link = np.asarray(releases.link.value, dtype=np.int64)
+    invalid_links = np.flatnonzero((link < 1) | (link > numtable))
+    if len(invalid_links):
+        issues.append(
+            ValidationIssue(
+                "link",
+                f"LINK is not a species of the species table (1 - {numtable})",
+                invalid_links,
+            )
+        )
+    xmass = releases.xmass.array
+    expected_shape = (releases.numpoint.value, releases.nspec.value)
+    if len(xmass) and xmass.shape != expected_shape:
+        issues.append(
+            ValidationIssue(
+                "xmass_shape",
+                f"XMASS has shape {xmass.shape} instead of numpoint x nspec {expected_shape}",
+            )
+        )
+    return issues
+
+
+def _check_levels(flexwrf_input: FlexwrfInput) -> List[ValidationIssue]:
+    levels = np.asarray(flexwrf_input.outgrid.levels.value, dtype=float)
+    not_increasing = np.flatnonzero(np.diff(levels) <= 0) + 1
+    if len(not_increasing) == 0:
+        return []
+    return [
+        ValidationIssue(
+            "levels",
+            "output levels are not strictly increasing",
+            not_increasing,
+        )
+    ]
+
+
+def validate(flexwrf_input: FlexwrfInput) -> ValidationReport:
+    """Checks the consistency of an input in vectorized passes over its sections.
+
+    Checks that the specifier counts (NUMPOINT, NSPEC, NUMTABLE, ...) match the number of values, that LDIRECT is
+    1 or -1 and the simulation window is not empty, that every release starts before it stops and lies inside the
+    simulation window, that the release boxes lie inside the output grid and the nest inside the output grid (only
+    if OUTGRID_COORD equals RELEASE_COORD), that LINK refers to species of the species table, that XMASS has the
+    shape numpoint x nspec and that the output levels are strictly increasing. Every failed check reports all
+    offending indices at once.
+
+    Args:
+        flexwrf_input (FlexwrfInput): Input to validate.
+
+    Returns:
+        ValidationReport: Report with all issues.
+    """
+    issues = _check_counts(flexwrf_input)
+    issues += _check_command(flexwrf_input)
+    # the release checks need release arguments of length numpoint, other counts do not matter for them
+    if not any(issue.message.startswith("numpoint (") for issue in issues):
+        issues += _check_release_times(flexwrf_input)
+        issues += _check_release_domain(flexwrf_input)
+    issues += _check_species(flexwrf_input)
+    issues += _check_levels(flexwrf_input)
+    return ValidationReport(issues)
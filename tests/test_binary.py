@@ -0,0 +1,66 @@
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flexwrfutils.binary import convert, load_binary, save_binary
+from flexwrfutils.flexwrfinput import FlexwrfInput
+
+EXAMPLES_PATH = Path(__file__).parent / "file_examples"
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "flexwrf.input.backward1",
+        "flexwrf.input.backward2",
+        "flexwrf.input.forward1",
+        "flexwrf.input.forward2",
+    ],
+)
+@pytest.mark.parametrize("mmap", [False, True])
+def test_roundtrip(tmp_path, file_name, mmap):
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(EXAMPLES_PATH / file_name)
+    flexwrfinput.releases.add_copies(n_copies=3)
+    save_binary(flexwrfinput, tmp_path / "input.npz")
+    loaded = load_binary(tmp_path / "input.npz", mmap=mmap)
+    assert loaded.lines == flexwrfinput.lines
+
+
+def test_mmap(tmp_path):
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(EXAMPLES_PATH / "flexwrf.input.forward1")
+    save_binary(flexwrfinput, tmp_path / "input.npz")
+    loaded = load_binary(tmp_path / "input.npz", mmap=True)
+    releases = loaded.releases
+    assert isinstance(releases.xpoint1._value, np.memmap)
+    assert isinstance(releases.xmass._value, np.memmap)
+
+    # changes stay in memory
+    releases.xpoint1[0] = 1.5
+    assert releases.xpoint1[0] == 1.5
+    assert load_binary(tmp_path / "input.npz").releases.xpoint1[0] != 1.5
+    releases.add_copy(0)
+    assert releases.numpoint.value == flexwrfinput.releases.numpoint.value + 1
+
+
+def test_convert(tmp_path):
+    convert(EXAMPLES_PATH / "flexwrf.input.forward2", tmp_path / "input.npz")
+    convert(tmp_path / "input.npz", tmp_path / "flexwrf.input")
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(EXAMPLES_PATH / "flexwrf.input.forward2")
+    flexwrfinput.write(tmp_path / "flexwrf.input.expected")
+    assert (tmp_path / "flexwrf.input").read_text() == (
+        tmp_path / "flexwrf.input.expected"
+    ).read_text()
+
+
+def test_format_version(tmp_path):
+    file_path = tmp_path / "input.npz"
+    with zipfile.ZipFile(file_path, "w") as archive:
+        archive.writestr("header.json", json.dumps(dict(format_version=0)))
+    with pytest.raises(ValueError, match="format version"):
+        load_binary(file_path)
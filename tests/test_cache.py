@@ -0,0 +1,68 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from flexwrfutils.cache import ParseCache
+from flexwrfutils.flexwrfinput import FlexwrfInput
+
+
+@pytest.fixture
+def example_path(tmp_path):
+    example_path = tmp_path / "flexwrf.input"
+    shutil.copy(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.forward1",
+        example_path,
+    )
+    return example_path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(tmp_path / "cache")
+
+
+def test_read_cached(example_path, cache):
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(example_path, cache=cache)
+    assert len(cache.entries()) == 1
+    assert cache.load(example_path) is not None
+
+    cached_flexwrfinput = FlexwrfInput()
+    cached_flexwrfinput.read(example_path, cache=cache)
+    assert cached_flexwrfinput.lines == flexwrfinput.lines
+    cached_flexwrfinput.releases.add_copy(0)
+    assert (
+        cached_flexwrfinput.releases.numpoint.value
+        == len(cached_flexwrfinput.releases.start)
+        == flexwrfinput.releases.numpoint.value + 1
+    )
+
+
+def test_changed_file_misses(example_path, cache):
+    FlexwrfInput().read(example_path, cache=cache)
+    with example_path.open("a") as f:
+        f.write("\n")
+    assert cache.load(example_path) is None
+
+
+def test_eviction(example_path, tmp_path, cache):
+    FlexwrfInput().read(example_path, cache=cache)
+    first_entry = cache.entries()[0]
+    os.utime(first_entry, ns=(0, 0))
+    cache.max_size = first_entry.stat().st_size
+    second_path = tmp_path / "flexwrf.input2"
+    shutil.copy(example_path, second_path)
+    FlexwrfInput().read(second_path, cache=cache)
+    assert cache.entries() != [first_entry]
+    assert len(cache.entries()) == 1
+
+
+def test_clear_and_disable(example_path, cache):
+    FlexwrfInput().read(example_path, cache=cache)
+    cache.clear()
+    assert cache.entries() == []
+    cache.enabled = False
+    FlexwrfInput().read(example_path, cache=cache)
+    assert cache.entries() == []
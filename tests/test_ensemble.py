@@ -0,0 +1,101 @@
+import json
+import stat
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flexwrfutils import fileutils
+from flexwrfutils.ensemble import (
+    apply_overrides,
+    build_variant,
+    parameter_grid,
+    write_atomic,
+    write_ensemble,
+)
+from flexwrfutils.flexwrfinput import FlexwrfInput
+
+
+@pytest.fixture
+def base():
+    base = FlexwrfInput()
+    base.read(Path(__file__).parent / "file_examples" / "flexwrf.input.forward1")
+    return base
+
+
+def double_npart(argument):
+    return argument.array * 2
+
+
+def test_parameter_grid():
+    grid = parameter_grid({"command.turboption": [1, 2], "command.outputrate": [60]})
+    assert grid == [
+        {"command.turboption": 1, "command.outputrate": 60},
+        {"command.turboption": 2, "command.outputrate": 60},
+    ]
+
+
+def test_apply_overrides(base):
+    npart = base.releases.npart.array.copy()
+    apply_overrides(
+        base,
+        {
+            "command.turboption": 3,
+            "releases.zpoint1": 100.0,
+            "releases.npart": double_npart,
+            "releases.xmass": 1.0,
+        },
+    )
+    assert base.command.turboption.value == 3
+    assert base.releases.zpoint1.value == [100.0] * base.releases.numpoint.value
+    assert (base.releases.npart.array == 2 * npart).all()
+    assert (base.releases.xmass.array == 1.0).all()
+
+
+def test_build_variant_keeps_base(base):
+    variant = build_variant(base, {"releases.zpoint2": 5.0}, "run/dir")
+    assert variant.releases.zpoint2.value != base.releases.zpoint2.value
+    assert variant.pathnames.outputpath.value == Path("run/dir")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_write_ensemble(base, tmp_path, workers):
+    variants = parameter_grid(
+        {"command.turboption": [1, 2], "releases.zpoint1": [10.0, 20.0]}
+    )
+    manifest_path = write_ensemble(
+        base, variants, tmp_path, workers=workers, set_outputpath=True
+    )
+    with manifest_path.open() as f:
+        manifest = json.load(f)
+    assert len(manifest) == 4
+    for entry, overrides in zip(manifest, variants):
+        assert entry["parameters"] == overrides
+        variant = FlexwrfInput()
+        variant.read(entry["file"])
+        assert variant.command.turboption.value == overrides["command.turboption"]
+        assert np.all(variant.releases.zpoint1.array == overrides["releases.zpoint1"])
+        assert variant.pathnames.outputpath.value == Path(entry["directory"])
+    assert not list(tmp_path.glob("**/*.tmp"))
+
+
+def test_write_ensemble_callables(base, tmp_path):
+    # lambdas can not be sent to worker processes, they are resolved before
+    variants = [{"releases.npart": lambda argument: argument.array * 3}]
+    manifest_path = write_ensemble(base, variants, tmp_path, workers=2)
+    with manifest_path.open() as f:
+        manifest = json.load(f)
+    npart = (base.releases.npart.array * 3).tolist()
+    assert manifest[0]["parameters"]["releases.npart"] == npart
+    variant = FlexwrfInput()
+    variant.read(manifest[0]["file"])
+    assert variant.releases.npart.value == npart
+    assert variant.pathnames.outputpath.value == Path(manifest[0]["directory"])
+
+
+def test_write_atomic_mode(base, tmp_path):
+    write_atomic(base, tmp_path / "atomic")
+    base.write(tmp_path / "direct")
+    mode = stat.S_IMODE((tmp_path / "atomic").stat().st_mode)
+    assert mode == 0o666 & ~fileutils.UMASK
+    assert (tmp_path / "atomic").stat().st_mode == (tmp_path / "direct").stat().st_mode
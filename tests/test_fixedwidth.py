@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from flexwrfutils.fixedwidth import (
+    FixedWidthTable,
+    parse_fixed_width,
+    to_printf_format,
+)
+
+
+@pytest.mark.parametrize(
+    "formatter, type, expected",
+    [
+        ("{:10.1f}", float, "%10.1f"),
+        ("{:11.1E}", float, "%11.1E"),
+        ("{:.4E}", float, "%.4E"),
+        ("{:10}", str, "%-10s"),
+        ("{:2}", int, "%2d"),
+    ],
+)
+def test_to_printf_format(formatter, type, expected):
+    assert to_printf_format(formatter, type) == expected
+
+
+def test_to_printf_format_invalid():
+    with pytest.raises(ValueError):
+        to_printf_format("{:>10}", float)
+    with pytest.raises(ValueError):
+        to_printf_format("{:10}", float)
+
+
+def test_format_matches_str_format():
+    rng = np.random.default_rng(0)
+    formatters = ["{:10}", "{:10.1f}", "{:11.1E}", "{:2}", "{:8.2f}"]
+    types = [str, float, float, int, float]
+    positions = [(4, 14), (14, 24), (24, 35), (35, 37), (37, 45)]
+    n_rows = 500
+    columns = [
+        [f"S{i}" for i in range(n_rows)],
+        (rng.normal(size=n_rows) * 1e3).tolist(),
+        (10.0 ** rng.integers(-12, 12, size=n_rows) * rng.normal(size=n_rows)).tolist(),
+        rng.integers(0, 24, size=n_rows).tolist(),
+        [None if i % 7 == 0 else -9.99 for i in range(n_rows)],
+    ]
+    table = FixedWidthTable(formatters, types, positions, prefix="    ")
+    expected = ""
+    for row in zip(*columns):
+        expected += "    "
+        for formatter, (start, end), value in zip(formatters, positions, row):
+            expected += (
+                " " * (end - start) if value is None else formatter.format(value)
+            )
+        expected += "\n"
+    assert table.format(columns) == expected
+    assert "".join(table.iter_lines(columns, chunksize=64)) == expected
+
+    lines = expected.splitlines(keepends=True)
+    assert parse_fixed_width(lines, 4, 14, str) == [f"{name:10}" for name in columns[0]]
+    assert parse_fixed_width(lines, 35, 37, int) == columns[3]
+    parsed = parse_fixed_width(lines, 37, 45, float, allow_blank=True)
+    assert parsed == columns[4]
+    with pytest.raises(ValueError):
+        parse_fixed_width(lines, 37, 45, float)
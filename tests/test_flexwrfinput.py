@@ -4,11 +4,17 @@ from flexwrfutils.flexwrfinput import (
     StaticSpecifierArgument,
     DynamicSpecifierArgument,
     DatetimeArgument,
+    DynamicDatetimeArgument,
     FlexwrfInput,
     SpeciesArgument,
+    datetime64_to_strings,
+    strings_to_datetime64,
 )
+from flexwrfutils import flexwrfinput as flexwrfinput_module
 import numpy as np
+import pandas as pd
 from datetime import datetime
+import copy
 import pytest
 from pathlib import Path
 
@@ -191,6 +197,54 @@ class Test_Datetime:
         datetimeinstance.value = timedt
         valuedt = datetimeinstance.value
         assert timestring == valuestr == valuenp == valuedt
+        assert type(valuenp) is type(valuedt) is str
+        assert datetimeinstance.datetime64 == timenp
+
+
+class Test_DynamicDatetime:
+    def test_vectorized_assignment(self):
+        numpoint = StaticSpecifierArgument(dummyline="#\n")
+        times = DynamicDatetimeArgument(numpoint, type=str, dummyline="#\n")
+        index = pd.date_range("2009-01-01", periods=1000, freq="h")
+        times.value = index
+        assert times.value[1] == "20090101 010000"
+        assert (times.array == index.values.astype("datetime64[s]")).all()
+        times.value = index.values
+        assert times.value[-1] == index[-1].strftime("%Y%m%d %H%M%S")
+        times[0] = datetime(2010, 1, 1)
+        times[1:3] = np.array(["2011-01-01", "2012-01-01"], dtype="datetime64[s]")
+        assert times.value[:3] == [
+            "20100101 000000",
+            "20110101 000000",
+            "20120101 000000",
+        ]
+        times.value = ["20100101 000000", np.datetime64("2011-01-01")]
+        assert times.value == ["20100101 000000", "20110101 000000"]
+
+    def test_array_cache(self, monkeypatch):
+        numpoint = StaticSpecifierArgument(dummyline="#\n")
+        times = DynamicDatetimeArgument(numpoint, type=str, dummyline="#\n")
+        index = pd.date_range("2009-01-01", periods=10, freq="h")
+        times.value = index
+        parsed = []
+        monkeypatch.setattr(
+            flexwrfinput_module,
+            "strings_to_datetime64",
+            lambda strings: parsed.append(strings) or strings_to_datetime64(strings),
+        )
+        # assigned datetimes are kept, repeated access does not parse the strings
+        assert (times.array == index.values.astype("datetime64[s]")).all()
+        assert parsed == []
+        with pytest.raises(ValueError):
+            times.array[0] = np.datetime64("2000-01-01")
+
+        times.append("20200101 000000")
+        assert times.array[-1] == np.datetime64("2020-01-01")
+        assert times.array[0] == index[0]
+        assert len(parsed) == 1
+        times[0] = "20210101 000000"
+        assert times.array[0] == np.datetime64("2021-01-01")
+        assert len(parsed) == 2
 
 
 class Test_Species:
@@ -324,3 +378,349 @@ class Test_FlexwrfInput:
         assert (
             len(wrong_endings) == 0
         ), f"No proper end of line character in lines:\n{wrong_endings}"
+
+
+class Test_Releases:
+    def test_array_backend(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        numpoint = releases.numpoint.value
+        assert releases.start.array.dtype == np.dtype("datetime64[s]")
+        assert releases.xpoint1.array.dtype == np.float64
+        assert releases.kindz.array.dtype.kind == "i"
+        assert releases.npart.array.dtype.kind == "i"
+        assert releases.xmass.array.shape == (numpoint, releases.nspec.value)
+        assert len(releases.name) == numpoint
+        with pytest.raises(ValueError):
+            releases.xpoint1.array[0] = 0
+
+    def test_value_write_through(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        lines = releases.lines
+        releases.zpoint1.value[0] = 123.5
+        assert releases.zpoint1.array[0] == 123.5
+        releases.xmass.value[1][-1] = 7.0
+        assert releases.xmass.array[1, -1] == 7.0
+        xmass = releases.xmass.value
+        xmass[0] = [2.0] * releases.nspec.value
+        xmass[0][0] = 3.0
+        assert releases.xmass[0][0] == 3.0 and xmass[0][0] == 3.0
+        releases.start.value[0] = datetime(2010, 5, 18, 12)
+        assert releases.start[0] == "20100518 120000"
+        assert type(releases.start[0]) is type(releases.start.value[0]) is str
+        npart = releases.npart.value
+        npart[:2] = [5, 6]
+        assert npart[:2] == releases.npart[:2] == [5, 6]
+        assert releases.lines != lines
+        assert "123.5" in "".join(releases.lines)
+
+        with pytest.raises(TypeError):
+            releases.zpoint1.value.append(1.0)
+        with pytest.raises(TypeError):
+            del releases.xmass.value[0]
+        assert type(copy.deepcopy(npart)) is list
+
+    def test_append_extend_remove(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        numpoint = releases.numpoint.value
+        releases.add_copy(0)
+        assert releases.numpoint.value == numpoint + 1
+        assert releases.start[-1] == releases.start[0]
+        assert releases.xmass[-1] == releases.xmass[0]
+        releases.xmass[-1] = [0.0] * releases.nspec.value
+        assert releases.xmass[0] != releases.xmass[-1]
+        releases.npart.extend(np.array([1, 2]))
+        assert releases.numpoint.value == numpoint + 3
+        assert releases.npart.value[-2:] == [1, 2]
+        releases.npart.remove(-1)
+        assert releases.numpoint.value == len(releases.npart) == numpoint + 2
+
+    def test_add_copies(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        numpoint = releases.numpoint.value
+        nspec = releases.nspec.value
+        releases.add_copies([0, 1], 3, zpoint1=[10.0, 20.0, 30.0], npart=5)
+        assert releases.numpoint.value == len(releases.xmass) == numpoint + 6
+        assert (
+            releases.name.value[numpoint:]
+            == [
+                releases.name[0],
+                releases.name[1],
+            ]
+            * 3
+        )
+        assert releases.zpoint1.value[numpoint:] == [10.0, 10.0, 20.0, 20.0, 30.0, 30.0]
+        assert releases.npart.value[numpoint:] == [5] * 6
+        assert releases.xmass.array.shape == (numpoint + 6, nspec)
+        releases.xmass[-1] = [0.0] * nspec
+        assert releases.xmass[numpoint + 1] == releases.xmass[1]
+        with pytest.raises(ValueError):
+            releases.add_copies(0, unknown=1)
+
+    def test_extend_xmass_shape(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        nspec = releases.nspec.value
+        columns = releases.columns([0, 0])
+        columns["xmass"] = np.ones(nspec)
+        with pytest.raises(ValueError):
+            releases.extend(**columns)
+        columns = releases.columns([0])
+        columns["xmass"] = np.arange(nspec, dtype=float)
+        releases.extend(**columns)
+        assert releases.xmass[-1] == list(range(nspec))
+
+    def test_extend_zero_releases(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        numpoint = releases.numpoint.value
+        lines = releases.lines
+        columns = releases.columns(np.zeros(numpoint, dtype=bool))
+        assert columns["xmass"].shape == (0, releases.nspec.value)
+        releases.extend(**columns)
+        releases.add_copies(n_copies=0)
+        releases.add_copies([], 3)
+        releases.xmass.extend([])
+        assert releases.numpoint.value == numpoint
+        assert releases.xmass.array.shape == (numpoint, releases.nspec.value)
+        assert releases.lines == lines
+
+    def test_tile_time(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        numpoint = releases.numpoint.value
+        duration = releases.stop.array[0] - releases.start.array[0]
+        releases.tile_time("1h", 24, 0, first_start="20100518 000000")
+        starts = releases.start.array[numpoint:]
+        assert len(starts) == 24
+        assert starts[0] == np.datetime64("2010-05-18T00:00:00")
+        assert (np.diff(starts) == np.timedelta64(3600, "s")).all()
+        assert (releases.stop.array[numpoint:] - starts == duration).all()
+        assert releases.start.value[numpoint + 1] == "20100518 010000"
+
+    def test_tile_time_series(self, example_path, flexwrfinput):
+        # hourly series from a single template release
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        template = releases.columns([0])
+        releases.clear()
+        releases.extend(**template)
+        template_start = releases.start.array[0]
+        releases.tile_time("1h", 23)
+        starts = releases.start.array
+        assert len(starts) == 24
+        assert len(np.unique(starts)) == 24
+        np.testing.assert_array_equal(
+            starts, template_start + np.arange(24) * np.timedelta64(3600, "s")
+        )
+
+    def test_dataframe(self, example_path, flexwrfinput):
+        flexwrfinput.read(example_path)
+        releases = flexwrfinput.releases
+        frame = releases.to_dataframe()
+        assert list(frame.columns[:2]) == ["start", "stop"]
+        assert frame["start"].dtype == "datetime64[s]"
+        assert frame["npart"].dtype == np.int64
+        assert np.shares_memory(frame["xpoint1"].to_numpy(), releases.xpoint1.array)
+        assert np.shares_memory(frame["xmass2"].to_numpy(), releases.xmass.array)
+        assert not np.shares_memory(
+            releases.to_dataframe(copy=True)["xpoint1"].to_numpy(),
+            releases.xpoint1.array,
+        )
+
+        text = releases.text
+        frame = frame.copy()
+        frame["start"] = releases.start.value
+        releases.from_dataframe(frame)
+        assert releases.text == text
+
+        frame["npart"] = frame["npart"].astype(object)
+        frame.loc[1, "npart"] = "many"
+        frame.loc[0, "xpoint1"] = np.nan
+        with pytest.raises(ValueError) as error:
+            releases.from_dataframe(frame.drop(columns="xmass2"))
+        message = str(error.value)
+        assert "missing columns ['xmass2']" in message
+        assert "npart: 1 invalid values in rows [1]" in message
+        assert "xpoint1: 1 invalid values in rows [0]" in message
+        assert releases.text == text
+
+
+def test_datetime_strings_roundtrip():
+    strings = ["20100518 110000", "20091231 235959"]
+    times = strings_to_datetime64(strings)
+    assert times[0] == np.datetime64("2010-05-18T11:00:00")
+    assert datetime64_to_strings(times).tolist() == strings
+
+
+@pytest.mark.parametrize("cache", [True, False])
+@pytest.mark.parametrize("buffer_size", [1, 2**20])
+def test_write_streaming(tmp_path, example_path, flexwrfinput, buffer_size, cache):
+    flexwrfinput.read(example_path)
+    flexwrfinput.write(tmp_path / "test_file", buffer_size=buffer_size, cache=cache)
+    with (tmp_path / "test_file").open() as f:
+        assert f.read() == "".join(flexwrfinput.lines)
+    for option in flexwrfinput.options:
+        assert list(option.iter_lines()) == option.lines
+
+
+@pytest.mark.parametrize(
+    "test_file",
+    [
+        ("flexwrf.input.backward1"),
+        ("flexwrf.input.backward2"),
+        ("flexwrf.input.forward1"),
+        ("flexwrf.input.forward2"),
+    ],
+)
+def test_read_parsers(test_file, flexwrfinput, flexwrfinput2):
+    file_path = Path(__file__).parent / "file_examples" / test_file
+    flexwrfinput.read(file_path, parser="file")
+    flexwrfinput2.read(file_path, parser="lines")
+    for option1, option2 in zip(flexwrfinput.options, flexwrfinput2.options):
+        assert option1.lines == option2.lines
+    releases1, releases2 = flexwrfinput.releases, flexwrfinput2.releases
+    for key, argument in releases1.release_arguments.items():
+        array = releases2.release_arguments[key].array
+        assert array.dtype == argument.array.dtype
+        assert (array == argument.array).all()
+    assert flexwrfinput.species.wetsb.value == flexwrfinput2.species.wetsb.value
+    assert (
+        flexwrfinput.pathnames.inputpath.value
+        == flexwrfinput2.pathnames.inputpath.value
+    )
+
+
+def test_section_cache(tmp_path, example_path, flexwrfinput, flexwrfinput2):
+    flexwrfinput.read(example_path)
+    flexwrfinput.write(tmp_path / "first")
+    # the default write streams without keeping the text of the sections
+    assert not any(option.is_cached for option in flexwrfinput.options)
+    flexwrfinput.write(tmp_path / "first", cache=True)
+    assert all(option.is_cached for option in flexwrfinput.options)
+    releases_text = flexwrfinput.releases.text
+
+    flexwrfinput.command.outputrate = 1234
+    assert not flexwrfinput.command.is_cached
+    assert flexwrfinput.releases.is_cached
+    flexwrfinput.write(tmp_path / "second", cache=True)
+    assert flexwrfinput.releases.text is releases_text
+    assert "1234" in flexwrfinput.command.text
+    assert (tmp_path / "second").read_text() == "".join(flexwrfinput.lines)
+
+    flexwrfinput2.read(tmp_path / "second")
+    assert flexwrfinput2.command.outputrate.value == 1234
+    assert flexwrfinput2.lines == flexwrfinput.lines
+
+
+def test_section_cache_invalidation(example_path, flexwrfinput):
+    flexwrfinput.read(example_path)
+    releases = flexwrfinput.releases
+    ageclasses = flexwrfinput.ageclasses
+
+    lines = releases.lines
+    releases.zpoint1[0] = 1.5
+    assert releases.lines != lines
+    assert releases.zpoint1.lines[0].startswith("1.5 ")
+
+    n_lines = len(releases.lines)
+    releases.add_copy(0)
+    assert len(releases.lines) == n_lines + 11 + releases.nspec.value
+    releases.xmass[0] = [2.0] * releases.nspec.value
+    assert "2.0000E+00" in releases.xmass.lines[0][0]
+    assert releases.xmass.lines[0][0] in releases.lines
+
+    ageclasses.ageclasses.append(7200)
+    assert ageclasses.lines[-1].strip().startswith("7200")
+    ageclasses.ageclasses.remove(-1)
+    ageclasses.ageclasses[0] = 60
+    assert ageclasses.nageclasses.line in ageclasses.lines
+    assert ageclasses.lines[2].strip().startswith("60")
+
+
+@pytest.mark.parametrize(
+    "test_file",
+    [
+        ("flexwrf.input.backward1"),
+        ("flexwrf.input.backward2"),
+        ("flexwrf.input.forward1"),
+        ("flexwrf.input.forward2"),
+    ],
+)
+def test_read_lazy(test_file, flexwrfinput, flexwrfinput2):
+    file_path = Path(__file__).parent / "file_examples" / test_file
+    flexwrfinput.read(file_path, lazy=True)
+    flexwrfinput2.read(file_path)
+    assert "_releases" in flexwrfinput._unread_sections
+    assert flexwrfinput.command.start.value == flexwrfinput2.command.start.value
+    assert flexwrfinput.outgrid.levels.value == flexwrfinput2.outgrid.levels.value
+    assert "_command" not in flexwrfinput._unread_sections
+    assert "_releases" in flexwrfinput._unread_sections
+    assert flexwrfinput.releases.xmass.value == flexwrfinput2.releases.xmass.value
+    assert flexwrfinput.lines == flexwrfinput2.lines
+    assert not flexwrfinput._unread_sections
+
+
+def test_read_lazy_changed_file(tmp_path, example_path, flexwrfinput):
+    file_path = tmp_path / "flexwrf.input"
+    file_path.write_text(example_path.read_text())
+    flexwrfinput.read(file_path, lazy=True)
+    file_path.write_text("")
+    with pytest.raises(RuntimeError):
+        flexwrfinput.releases
+
+
+def test_arguments_are_slotted(example_path, flexwrfinput):
+    flexwrfinput.read(example_path)
+    for option in flexwrfinput.options:
+        for attribute in vars(option).values():
+            if hasattr(attribute, "_dummyline"):
+                assert not hasattr(attribute, "__dict__")
+    copied = copy.deepcopy(flexwrfinput)
+    assert copied.lines == flexwrfinput.lines
+
+
+@pytest.mark.parametrize("parser", ["lines", "file"])
+def test_read_without_nest_of_nest_length(tmp_path, parser):
+    # with one more species, receptor and species sections span as many lines as an OUTGRID_NEST section
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.backward2"
+    )
+    for argument in flexwrfinput.species._columns:
+        argument.append(argument[0])
+    flexwrfinput.write(tmp_path / "flexwrf.input")
+    flexwrfinput2 = FlexwrfInput()
+    flexwrfinput2.read(tmp_path / "flexwrf.input", parser=parser)
+    assert flexwrfinput2.outgrid_nest.outlonleft.value is None
+    assert flexwrfinput2.lines == flexwrfinput.lines
+
+
+def test_species_dataframe(example_path, flexwrfinput):
+    flexwrfinput.read(example_path)
+    species = flexwrfinput.species
+    text = species.text
+    frame = species.to_dataframe()
+    assert frame["name"].str.strip().tolist() == ["AIRTRACER", "Cs-137"]
+    assert np.isnan(frame.loc[0, "wetsb"])
+    species.from_dataframe(frame)
+    assert species.text == text
+    species.from_dataframe(frame.iloc[:1])
+    assert species.numtable.value == 1
+
+
+def test_receptor_dataframe(example_path, flexwrfinput):
+    flexwrfinput.read(example_path)
+    receptor = flexwrfinput.receptor
+    receptor.from_dataframe(
+        pd.DataFrame(dict(receptor=["A", "B"], x=[1.0, 2.0], y=[3, 4]))
+    )
+    assert receptor.numreceptor.value == 2
+    assert receptor.y.value == [3.0, 4.0]
+    frame = receptor.to_dataframe()
+    assert frame["receptor"].tolist() == ["A", "B"]
+    with pytest.raises(ValueError, match="unknown columns"):
+        receptor.from_dataframe(frame.assign(z=0))
@@ -1,12 +1,25 @@
+import sqlite3
+import sys
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 import pytest
 import xarray as xr
 
+from flexwrfutils.scripts import make_AVAILABLE
 from flexwrfutils.scripts.make_AVAILABLE import (
+    assign_file_indices,
     assign_files,
     convert_to_datetime64,
     extract_datetime_strings,
+    follow,
+    get_parser,
+    join_characters,
+    main,
+    read_file_times,
+    scan_files,
+    scan_files_indexed,
     update_file_index,
 )
 
@@ -36,6 +49,200 @@ def test_convert_to_datetime64():
     ), f"Wrong output type. Should be np.ndarray but is {type(datetime64_times)}"
 
 
+@pytest.fixture
+def wrf_dataset(monkeypatch):
+    # no netCDF backend is needed: open_dataset returns an in-memory WRF-like dataset
+    times = np.array([b"2010-05-18_00:00:00", b"2010-05-18_01:00:00"])
+    characters = times[:, None].view("S1")
+    calls = []
+
+    class Dataset(xr.Dataset):
+        __slots__ = ()
+
+        def close(self):
+            calls.append("close")
+
+    def open_dataset(file_path, **kwargs):
+        calls.append(kwargs)
+        if kwargs.get("decode_cf", True):
+            return Dataset(dict(Times=("Time", times)))
+        return Dataset(dict(Times=(("Time", "DateStrLen"), characters)))
+
+    monkeypatch.setattr(xr, "open_dataset", open_dataset)
+    return calls
+
+
+@pytest.fixture
+def opened_files():
+    return []
+
+
+@pytest.fixture
+def wrf_directory(tmp_path, monkeypatch, opened_files):
+    # hourly WRF output with 7 times per file, the last time of a file is the first of the next
+    starts = pd.date_range("2010-05-18", periods=6, freq="6h")
+    for start in starts:
+        (tmp_path / f"wrfout_d01_{start:%Y-%m-%d_%H:%M:%S}").touch()
+
+    def open_dataset(file_path, **kwargs):
+        opened_files.append(Path(file_path).name)
+        start = pd.Timestamp(Path(file_path).name[11:].replace("_", "T"))
+        times = pd.date_range(start, periods=7, freq="1h").strftime("%Y-%m-%d_%H:%M:%S")
+        times = times.to_numpy().astype("S19")
+        if kwargs.get("decode_cf", True):
+            return xr.Dataset(dict(Times=("Time", times)))
+        return xr.Dataset(
+            dict(Times=(("Time", "DateStrLen"), times[:, None].view("S1")))
+        )
+
+    monkeypatch.setattr(xr, "open_dataset", open_dataset)
+    return tmp_path
+
+
+def test_scan_files(wrf_directory):
+    wrf_files = list(wrf_directory.glob("wrfout_d01_*"))
+    wrf_times, timerange_info = scan_files(wrf_files)
+    assert len(wrf_times) == 6 * 6 + 1
+    assert timerange_info["file_path"].tolist() == sorted(wrf_files)
+    assert (timerange_info["max"] - timerange_info["min"] == pd.Timedelta("6h")).all()
+
+    parallel_times, parallel_timerange_info = scan_files(wrf_files, workers=2)
+    np.testing.assert_array_equal(parallel_times, wrf_times)
+    pd.testing.assert_frame_equal(parallel_timerange_info, timerange_info)
+
+
+def test_scan_files_indexed(wrf_directory, opened_files):
+    index_path = wrf_directory / "index.sqlite"
+    wrf_files = list(wrf_directory.glob("wrfout_d01_*"))
+    expected_times, expected_timerange_info = scan_files(wrf_files)
+    opened_files.clear()
+
+    wrf_times, timerange_info = scan_files_indexed(wrf_files, index_path)
+    assert len(opened_files) == 6
+    np.testing.assert_array_equal(wrf_times, expected_times)
+    pd.testing.assert_frame_equal(timerange_info, expected_timerange_info)
+
+    # unchanged files are taken from the index
+    opened_files.clear()
+    wrf_times, timerange_info = scan_files_indexed(wrf_files, index_path)
+    assert opened_files == []
+    np.testing.assert_array_equal(wrf_times, expected_times)
+    pd.testing.assert_frame_equal(timerange_info, expected_timerange_info)
+
+    # changed files are read again, deleted ones are dropped
+    wrf_files = sorted(wrf_files)
+    wrf_files[0].write_bytes(b"changed")
+    wrf_files[-1].unlink()
+    wrf_times, timerange_info = scan_files_indexed(wrf_files[:-1], index_path)
+    assert opened_files == [wrf_files[0].name]
+    assert len(wrf_times) == 5 * 6 + 1
+    assert len(timerange_info) == 5
+    with sqlite3.connect(str(index_path)) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM files").fetchone() == (5,)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_main(wrf_directory, monkeypatch, workers):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "make_AVAILABLE",
+            "--directory",
+            str(wrf_directory),
+            "--workers",
+            str(workers),
+        ],
+    )
+    main()
+    available = (wrf_directory / "AVAILABLE").read_text()
+    monkeypatch.setattr(sys, "argv", sys.argv + ["--index_name", ".AVAILABLE.sqlite"])
+    main()
+    main()
+    assert (wrf_directory / "AVAILABLE").read_text() == available
+    lines = available.splitlines()
+    assert len(lines) == 3 + 6 * 6 + 1
+    assert lines[3] == (
+        f"20100518 000000      '{wrf_directory}/wrfout_d01_2010-05-18_00:00:00'      ' '"
+    )
+    # with overlap_choice "start" the shared time belongs to the next file
+    assert lines[3 + 6].startswith("20100518 060000")
+    assert "wrfout_d01_2010-05-18_06:00:00" in lines[3 + 6]
+
+
+def test_follow(wrf_directory, monkeypatch):
+    wrf_files = sorted(wrf_directory.glob("wrfout_d01_*"))
+    for wrf_file in wrf_files[3:]:
+        wrf_file.rename(wrf_file.with_name(f"later_{wrf_file.name}"))
+    # a file that is still being written can not be read
+    (wrf_directory / "wrfout_d01_partial").touch()
+    output_file = wrf_directory / "AVAILABLE"
+    line_counts = []
+
+    def sleep(seconds):
+        # WRF finishes the remaining files while follow waits
+        line_counts.append(len(output_file.read_text().splitlines()))
+        for later_file in sorted(wrf_directory.glob("later_*")):
+            later_file.rename(wrf_directory / later_file.name[6:])
+
+    monkeypatch.setattr(make_AVAILABLE, "sleep", sleep)
+    n_files = follow(wrf_directory, output_file, 7, poll_interval=0, timeout=0)
+    assert n_files == 6
+    assert line_counts == [3 + 3 * 6 + 1, 3 + 6 * 6 + 1]
+
+    available = output_file.read_text()
+    (wrf_directory / "wrfout_d01_partial").unlink()
+    wrf_times, timerange_info = scan_files(wrf_files)
+    make_AVAILABLE.write_available(
+        output_file, wrf_times, assign_files(wrf_times, timerange_info, "start")
+    )
+    assert output_file.read_text() == available
+
+
+@pytest.mark.parametrize("workers", ["0", "-2"])
+def test_parser_rejects_workers(workers):
+    with pytest.raises(SystemExit):
+        get_parser().parse_args(["--workers", workers])
+    assert get_parser().parse_args(["--workers", "4"]).workers == 4
+
+
+def test_write_available_mode(tmp_path):
+    output_file = tmp_path / "AVAILABLE"
+    make_AVAILABLE.write_available(output_file, np.array([], dtype="datetime64[s]"), [])
+    (tmp_path / "direct").touch()
+    assert output_file.stat().st_mode == (tmp_path / "direct").stat().st_mode
+
+
+def test_follow_incomplete(wrf_directory, monkeypatch):
+    monkeypatch.setattr(make_AVAILABLE, "sleep", lambda seconds: None)
+    output_file = wrf_directory / "AVAILABLE"
+    assert follow(wrf_directory, output_file, 8, poll_interval=0, timeout=0) == 0
+    assert not output_file.exists()
+
+
+def test_join_characters():
+    times = np.array([b"2010-05-18_00:00:00", b"2010-05-18_01:00:00"])
+    assert join_characters(times[:, None].view("S1")).tolist() == times.tolist()
+    assert join_characters(times) is times
+
+
+@pytest.mark.parametrize("reader", ["light", "full"])
+def test_read_file_times(wrf_dataset, reader):
+    wrf_times = read_file_times("wrfout_d01_2010-05-18_00:00:00", reader=reader)
+    np.testing.assert_array_equal(
+        wrf_times,
+        np.array(["2010-05-18T00:00:00", "2010-05-18T01:00:00"], dtype="datetime64[s]"),
+    )
+    assert wrf_dataset[-1] == "close"
+    if reader == "light":
+        assert wrf_dataset[0]["decode_cf"] is False
+
+
+def test_read_file_times_unknown_reader(wrf_dataset):
+    with pytest.raises(ValueError):
+        read_file_times("wrfout_d01_2010-05-18_00:00:00", reader="fast")
+
+
 @pytest.mark.parametrize(
     "time,start_input_index,start_output_index,end_input_index,end_output_index",
     [
@@ -75,6 +282,55 @@ def test_assign_files(timerange_info):
     assert assign_files(times, timerange_info, "end") == ["file1", "file1", "file2"]
 
 
+def sequential_file_indices(times, timerange_info, overlap_choice):
+    file_index = 0
+    file_indices = []
+    for time in times:
+        file_index = update_file_index(time, file_index, timerange_info, overlap_choice)
+        file_indices.append(file_index)
+    return file_indices
+
+
+@pytest.mark.parametrize("overlap_choice", ["start", "end"])
+@pytest.mark.parametrize("seed", range(20))
+def test_assign_file_indices_matches_sequential(seed, overlap_choice):
+    # files with overlaps, gaps and times that skip several files at once
+    rng = np.random.default_rng(seed)
+    n_files = rng.integers(1, 8)
+    minima = np.sort(rng.integers(0, 100, n_files))
+    maxima = minima + rng.integers(0, 30, n_files)
+    timerange_info = pd.DataFrame(
+        dict(
+            file_path=[f"file{i}" for i in range(n_files)],
+            min=np.datetime64("2010-01-01T00:00:00") + minima.astype("m8[h]"),
+            max=np.datetime64("2010-01-01T00:00:00") + maxima.astype("m8[h]"),
+        )
+    )
+    times = np.unique(
+        np.datetime64("2010-01-01T00:00:00")
+        + rng.integers(-5, 140, rng.integers(0, 60)).astype("m8[h]")
+    )
+    file_indices = assign_file_indices(
+        times,
+        timerange_info["min"].to_numpy(),
+        timerange_info["max"].to_numpy(),
+        overlap_choice,
+    )
+    assert file_indices.tolist() == sequential_file_indices(
+        times, timerange_info, overlap_choice
+    )
+
+
+def test_assign_file_indices_unsorted(timerange_info):
+    times = np.array(
+        [np.datetime64("2010-06-01T00:00:00"), np.datetime64("2009-06-01T00:00:00")]
+    )
+    with pytest.raises(ValueError):
+        assign_file_indices(
+            times, timerange_info["min"], timerange_info["max"], "start"
+        )
+
+
 def test_extract_datetime_strings():
     wrf_times = np.array([np.datetime64("2009-01-01T00:00:00")])
     dates, times = extract_datetime_strings(wrf_times)
@@ -85,3 +341,5 @@ def test_extract_datetime_strings():
     assert (
         len(times[0]) == 6
     ), f"Time string do not have correct lenghts (got {len(times[0])} instead of 6)"
+    assert dates[0] == "20090101"
+    assert times[0] == "000000"
@@ -0,0 +1,96 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from flexwrfutils.merging import check_compatibility, merge_inputs
+
+
+@pytest.fixture
+def flexwrfinput():
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.forward1"
+    )
+    return flexwrfinput
+
+
+def emit_only_second_species(flexwrf_input):
+    # species table in reversed order and releases that only emit the former second species
+    species = flexwrf_input.species
+    for argument in species._columns:
+        values = argument.value
+        argument.value = []
+        argument.extend(values[::-1])
+    releases = flexwrf_input.releases
+    xmass = releases.xmass.array[:, 1:].copy()
+    columns = releases.columns()
+    columns["xmass"] = xmass
+    releases.clear()
+    releases.link.value = []
+    releases.link.extend([1])
+    releases.extend(**columns)
+    return flexwrf_input
+
+
+@pytest.mark.parametrize(
+    "duplicates, n_releases", [("keep", 2), ("drop", 1), ("aggregate", 1)]
+)
+def test_merge_duplicates(flexwrfinput, duplicates, n_releases):
+    numpoint = flexwrfinput.releases.numpoint.value
+    merged, index = merge_inputs([flexwrfinput, flexwrfinput], duplicates)
+    releases = merged.releases
+    assert releases.numpoint.value == n_releases * numpoint
+    assert len(index) == 2 * numpoint
+    assert (index["input"] == np.repeat([0, 1], numpoint)).all()
+    factor = 2 if duplicates == "aggregate" else 1
+    original = flexwrfinput.releases
+    assert (releases.npart.array[:numpoint] == factor * original.npart.array).all()
+    assert np.allclose(releases.xmass.array[:numpoint], factor * original.xmass.array)
+    assert merged.species.text == flexwrfinput.species.text
+
+
+def test_merge_remaps_species(flexwrfinput):
+    other = emit_only_second_species(copy.deepcopy(flexwrfinput))
+    other.releases.start = ["20100610 000000"] * other.releases.numpoint.value
+    merged, index = merge_inputs([flexwrfinput, other], "keep")
+    assert merged.species.name.value == flexwrfinput.species.name.value
+    assert merged.releases.link.value == flexwrfinput.releases.link.value
+    xmass = merged.releases.xmass.array
+    numpoint = flexwrfinput.releases.numpoint.value
+    assert (xmass[numpoint:, 0] == 0).all()
+    assert (xmass[numpoint:, 1] == flexwrfinput.releases.xmass.array[:, 1]).all()
+
+    lines = merged.lines
+    reread = FlexwrfInput()
+    reread.read_lines(lines)
+    assert reread.releases.numpoint.value == 2 * numpoint
+
+
+def test_merge_extends_window(flexwrfinput):
+    other = copy.deepcopy(flexwrfinput)
+    other.command.stop = other.command.stop.datetime64 + np.timedelta64(1, "D")
+    merged, _ = merge_inputs([flexwrfinput, other])
+    assert merged.command.start.value == flexwrfinput.command.start.value
+    assert merged.command.stop.value == other.command.stop.value
+
+
+def test_incompatible_inputs(flexwrfinput):
+    other = copy.deepcopy(flexwrfinput)
+    other.outgrid.outlonleft = other.outgrid.outlonleft.value + 1
+    with pytest.raises(ValueError, match="Outgrid"):
+        check_compatibility([flexwrfinput, other])
+    with pytest.raises(ValueError, match="Outgrid"):
+        merge_inputs([flexwrfinput, other])
+
+
+def test_merge_with_emission_variation():
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.forward2"
+    )
+    merged, _ = merge_inputs([flexwrfinput, copy.deepcopy(flexwrfinput)])
+    assert merged.releases.text == flexwrfinput.releases.text
+    assert merged.species.text == flexwrfinput.species.text
@@ -0,0 +1,107 @@
+import json
+import os
+import pstats
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from flexwrfutils import profiling
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from flexwrfutils.profiling import profile_sections
+
+EXAMPLE_PATH = Path(__file__).parent / "file_examples" / "flexwrf.input.forward1"
+SECTIONS = [
+    "Pathnames",
+    "Command",
+    "Ageclasses",
+    "Outgrid",
+    "OutgridNest",
+    "Receptor",
+    "Species",
+    "Releases",
+]
+
+
+def test_read_lines_write(tmp_path):
+    flexwrfinput = FlexwrfInput()
+    n_lines = len(EXAMPLE_PATH.read_text().splitlines())
+    n_bytes = EXAMPLE_PATH.stat().st_size
+    with profile_sections() as profile:
+        flexwrfinput.read(EXAMPLE_PATH)
+        flexwrfinput.lines
+        flexwrfinput.write(tmp_path / "flexwrf.input", cache=False)
+    assert profiling.active_profiles() == []
+
+    written_bytes = (tmp_path / "flexwrf.input").stat().st_size
+    report = profile.report().set_index(["operation", "section"])
+    for operation, expected_bytes in [
+        ("read", n_bytes),
+        ("lines", written_bytes),
+        ("write", written_bytes),
+    ]:
+        sections = report.loc[operation].drop(index="file", errors="ignore")
+        assert sorted(sections.index) == sorted(SECTIONS)
+        assert sections["lines"].sum() == n_lines
+        assert sections["bytes"].sum() == expected_bytes
+        assert (sections["seconds"] >= 0).all()
+    assert report.loc[("read", "file"), "bytes"] == n_bytes
+
+
+@pytest.mark.parametrize("parser", ["file", "lazy"])
+def test_read_parsers(parser):
+    flexwrfinput = FlexwrfInput()
+    with profile_sections() as profile:
+        if parser == "lazy":
+            flexwrfinput.read(EXAMPLE_PATH, lazy=True)
+            flexwrfinput.releases
+        else:
+            flexwrfinput.read(EXAMPLE_PATH, parser=parser)
+    sections = [record["section"] for record in profile.records]
+    if parser == "lazy":
+        assert sections == ["Releases"]
+    else:
+        assert sections == SECTIONS
+        assert sum(record["bytes"] for record in profile.records) == (
+            EXAMPLE_PATH.stat().st_size
+        )
+
+
+def test_disabled_records_nothing(tmp_path, monkeypatch):
+    def record(*args):
+        raise AssertionError("recorded without an active profile")
+
+    monkeypatch.setattr(profiling, "record", record)
+    assert profiling.active_profiles() == []
+    FlexwrfInput().read(EXAMPLE_PATH, parser="file")
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(EXAMPLE_PATH)
+    flexwrfinput.write(tmp_path / "flexwrf.input")
+    flexwrfinput.lines
+    assert profiling.active_profiles() == []
+
+
+def test_cprofile_dump(tmp_path):
+    with profile_sections(tmp_path / "read.prof"):
+        FlexwrfInput().read(EXAMPLE_PATH)
+    stats = pstats.Stats(str(tmp_path / "read.prof"))
+    assert any("read_lines" in function[2] for function in stats.stats)
+
+
+def test_environment_variable(tmp_path):
+    report_path = tmp_path / "report.json"
+    code = (
+        "from flexwrfutils.flexwrfinput import FlexwrfInput; "
+        f"FlexwrfInput().read({str(EXAMPLE_PATH)!r})"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, profiling.ENVIRONMENT_VARIABLE: str(report_path)},
+        cwd=Path(__file__).parents[1],
+        check=True,
+    )
+    report = json.loads(report_path.read_text())
+    assert {record["section"] for record in report["report"]} == set(SECTIONS) | {
+        "file"
+    }
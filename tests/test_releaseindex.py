@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from flexwrfutils.releaseindex import ReleaseIndex
+
+
+@pytest.fixture
+def releases():
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.backward2"
+    )
+    releases = flexwrfinput.releases
+    rng = np.random.default_rng(0)
+    n_copies = 2000
+    x = rng.uniform(-10, 30, n_copies)
+    y = rng.uniform(40, 60, n_copies)
+    starts = np.datetime64("2010-05-01T00:00:00") + rng.integers(
+        0, 30 * 24, n_copies
+    ) * np.timedelta64(1, "h")
+    releases.add_copies(
+        0,
+        n_copies,
+        start=starts,
+        stop=starts + rng.integers(0, 12, n_copies) * np.timedelta64(1, "h"),
+        xpoint1=x - 0.1,
+        xpoint2=x + 0.1,
+        ypoint1=y - 0.1,
+        ypoint2=y + 0.1,
+    )
+    return releases
+
+
+@pytest.mark.parametrize("mode", ["start", "overlap"])
+def test_in_window(releases, mode):
+    index = ReleaseIndex(releases)
+    window_start = np.datetime64("2010-05-10T03:00:00")
+    window_stop = window_start + np.timedelta64(3, "h")
+    starts = releases.start.array
+    stops = releases.stop.array
+    if mode == "start":
+        expected = (starts >= window_start) & (starts < window_stop)
+    else:
+        expected = (starts < window_stop) & (stops > window_start)
+    result = index.in_window("20100510 030000", "20100510 060000", mode)
+    assert (result == np.flatnonzero(expected)).all()
+    assert (index.mask(result) == expected).all()
+
+
+def test_in_bbox(releases):
+    index = ReleaseIndex(releases)
+    x = (releases.xpoint1.array + releases.xpoint2.array) / 2
+    y = (releases.ypoint1.array + releases.ypoint2.array) / 2
+    for bbox in [(0, 45, 5, 50), (-20, 30, 40, 70), (50, 0, 60, 10), (10, 50, 10, 50)]:
+        x_min, y_min, x_max, y_max = bbox
+        expected = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+        assert (index.in_bbox(*bbox) == np.flatnonzero(expected)).all()
+
+
+@pytest.mark.parametrize("k", [1, 5, 50])
+def test_nearest(releases, k):
+    index = ReleaseIndex(releases)
+    x = (releases.xpoint1.array + releases.xpoint2.array) / 2
+    y = (releases.ypoint1.array + releases.ypoint2.array) / 2
+    for point in [(10, 50), (-40, 80), (29.9, 40.1)]:
+        distances = np.hypot(x - point[0], y - point[1])
+        expected = np.lexsort((np.arange(len(x)), distances))[:k]
+        assert (index.nearest(*point, k) == expected).all()
+
+
+def test_mask_subsets_releases(releases):
+    index = ReleaseIndex(releases)
+    mask = index.mask(index.in_bbox(0, 45, 5, 50)) & index.mask(
+        index.in_window("20100501 000000", "20100515 000000")
+    )
+    columns = releases.columns(mask)
+    assert len(columns["start"]) == mask.sum()
+    assert (columns["xpoint1"] == releases.xpoint1.array[mask]).all()
+    assert index.is_current
+    releases.add_copy(0)
+    assert not index.is_current
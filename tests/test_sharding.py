@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from flexwrfutils.sharding import write_shards
+
+
+@pytest.fixture
+def flexwrfinput():
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.backward2"
+    )
+    releases = flexwrfinput.releases
+    releases.tile_time("15min", 40, 0, first_start="2010-05-18T00:00")
+    releases.npart = np.random.default_rng(0).integers(100, 1000, len(releases.npart))
+    return flexwrfinput
+
+
+@pytest.mark.parametrize("respect_time_order", [False, True])
+def test_split(flexwrfinput, respect_time_order):
+    releases = flexwrfinput.releases
+    shard_inputs, index = flexwrfinput.split(4, respect_time_order)
+    assert len(shard_inputs) == 4
+    assert (index["release"] == np.arange(len(releases.npart))).all()
+
+    npart_sums = [shard.releases.npart.array.sum() for shard in shard_inputs]
+    assert sum(npart_sums) == releases.npart.array.sum()
+    assert max(npart_sums) - min(npart_sums) <= 2 * releases.npart.array.max()
+
+    for shard, shard_input in enumerate(shard_inputs):
+        rows = index[index["shard"] == shard]
+        shard_releases = shard_input.releases
+        assert shard_releases.numpoint.value == len(rows)
+        assert (rows["local_index"] == np.arange(len(rows))).all()
+        assert (
+            shard_releases.xpoint1.array == releases.xpoint1.array[rows["release"]]
+        ).all()
+        assert shard_input.pathnames.outputpath.value.name == f"shard_{shard:04d}"
+        # backward run: the stop is trimmed to the last release
+        assert shard_input.command.stop.datetime64 == shard_releases.stop.array.max()
+        assert shard_input.command.start.value == flexwrfinput.command.start.value
+
+    if respect_time_order:
+        last_starts = [shard.releases.start.array.max() for shard in shard_inputs]
+        first_starts = [shard.releases.start.array.min() for shard in shard_inputs]
+        assert all(
+            last < first for last, first in zip(last_starts[:-1], first_starts[1:])
+        )
+
+
+def test_write_shards(flexwrfinput, tmp_path):
+    index_path = write_shards(flexwrfinput, 3, tmp_path)
+    index = pd.read_csv(index_path)
+    assert len(index) == flexwrfinput.releases.numpoint.value
+    for shard, rows in index.groupby("shard"):
+        shard_input = FlexwrfInput()
+        shard_input.read(rows["file"].iloc[0])
+        assert shard_input.releases.numpoint.value == len(rows)
+        assert shard_input.releases.start.value == [
+            flexwrfinput.releases.start[i] for i in rows["release"]
+        ]
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from flexwrfutils.validation import validate
+
+EXAMPLES_PATH = Path(__file__).parent / "file_examples"
+
+
+@pytest.fixture
+def flexwrfinput():
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(EXAMPLES_PATH / "flexwrf.input.forward1")
+    flexwrfinput.releases.add_copies(0, 9)
+    return flexwrfinput
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "flexwrf.input.backward1",
+        "flexwrf.input.backward2",
+        "flexwrf.input.forward1",
+        "flexwrf.input.forward2",
+    ],
+)
+def test_examples_are_valid(file_name):
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(EXAMPLES_PATH / file_name)
+    report = validate(flexwrfinput)
+    assert report.is_valid, str(report)
+    report.raise_if_invalid()
+
+
+def test_reports_all_offending_releases(flexwrfinput):
+    releases = flexwrfinput.releases
+    command = flexwrfinput.command
+    starts = releases.start.array.copy()
+    starts[[2, 5]] = releases.stop.array[[2, 5]] + np.timedelta64(1, "h")
+    starts[7] = command.start.datetime64 - np.timedelta64(1, "D")
+    releases.start = starts
+    xpoint2 = releases.xpoint2.array.copy()
+    xpoint2[[1, 8]] = 1000.0
+    releases.xpoint2 = xpoint2
+    releases.link = [1, 3]
+    levels = flexwrfinput.outgrid.levels.value
+    flexwrfinput.outgrid.levels = [levels[0], levels[0]] + levels[2:]
+
+    report = validate(flexwrfinput)
+    assert not report
+    assert report["release_time_order"][0].indices.tolist() == [2, 5]
+    assert report["release_time_window"][0].indices.tolist() == [7]
+    assert report["release_domain"][0].indices.tolist() == [1, 8]
+    assert report["link"][0].indices.tolist() == [1]
+    assert report["levels"][0].indices.tolist() == [1]
+    with pytest.raises(ValueError, match="release_time_order"):
+        report.raise_if_invalid()
+
+
+def test_specifier_counts(flexwrfinput):
+    flexwrfinput.releases.numpoint = 3
+    flexwrfinput.outgrid.numzgrid = 1
+    report = validate(flexwrfinput)
+    messages = [issue.message for issue in report["specifier_count"]]
+    assert "numzgrid is 1, but there are 3 values" in messages
+    assert "numpoint (start) is 3, but there are 11 values" in messages
+    assert report["xmass_shape"]
+    assert not report["release_time_window"]
+
+
+def test_other_counts_keep_release_checks(flexwrfinput):
+    releases = flexwrfinput.releases
+    releases.start[0] = "20000101 000000"
+    flexwrfinput.outgrid.numzgrid = 1
+    flexwrfinput.species.numtable = 1
+    report = validate(flexwrfinput)
+    assert len(report["specifier_count"]) > 1
+    assert report["release_time_window"][0].indices.tolist() == [0]
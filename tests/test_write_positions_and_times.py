@@ -0,0 +1,132 @@
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flexwrfutils.flexwrfinput import FlexwrfInput
+from flexwrfutils.scripts.write_positions_and_times import (
+    complete_columns,
+    insert_coordinates,
+    read_coordinate_chunks,
+)
+
+
+@pytest.fixture
+def flexwrfinput():
+    flexwrfinput = FlexwrfInput()
+    flexwrfinput.read(
+        Path(__file__).parent / "file_examples" / "flexwrf.input.backward2"
+    )
+    return flexwrfinput
+
+
+@pytest.fixture
+def coordinates():
+    return pd.DataFrame(
+        dict(
+            start=["20100518 110000", "20100518 120000", "20100518 130000"],
+            xpoint1=[-117.1, -117.2, -117.3],
+            ypoint1=[34.1, 34.2, 34.3],
+            zpoint1=[10.0, 20.0, 30.0],
+        )
+    )
+
+
+@pytest.fixture
+def csv_file(tmp_path, coordinates):
+    csv_file = tmp_path / "coordinates.csv"
+    coordinates.to_csv(csv_file, index=False)
+    return csv_file
+
+
+def test_read_coordinate_chunks_csv(csv_file):
+    chunks = list(read_coordinate_chunks(csv_file, chunksize=2))
+    assert [len(chunk["xpoint1"]) for chunk in chunks] == [2, 1]
+    assert chunks[0]["start"][0] == "20100518 110000"
+
+
+@pytest.mark.parametrize("save", [np.savez, np.savez_compressed])
+def test_read_coordinate_chunks_npz(tmp_path, coordinates, monkeypatch, save):
+    npz_file = tmp_path / "coordinates.npz"
+    columns = {key: np.array(coordinates[key].tolist()) for key in coordinates}
+    columns["xmass"] = np.asfortranarray(np.arange(6.0).reshape(3, 2))
+    save(npz_file, **columns)
+
+    read_sizes = []
+    read = zipfile.ZipExtFile.read
+
+    def recording_read(self, n=-1):
+        read_sizes.append(n)
+        return read(self, n)
+
+    monkeypatch.setattr(zipfile.ZipExtFile, "read", recording_read)
+    chunks = list(read_coordinate_chunks(npz_file, chunksize=2))
+    assert [len(chunk["ypoint1"]) for chunk in chunks] == [2, 1]
+    for key, column in columns.items():
+        np.testing.assert_array_equal(
+            np.concatenate([chunk[key] for chunk in chunks]), column
+        )
+    # only the Fortran ordered xmass is read at once, the other columns one chunk at a time
+    assert read_sizes.count(-1) == 1
+    row_size = columns["start"].dtype.itemsize
+    assert 2 * row_size in read_sizes and 3 * row_size not in read_sizes
+
+
+def test_read_coordinate_chunks_npz_lengths(tmp_path):
+    npz_file = tmp_path / "coordinates.npz"
+    np.savez(npz_file, xpoint1=np.zeros(3), ypoint1=np.zeros(2))
+    with pytest.raises(ValueError):
+        list(read_coordinate_chunks(npz_file, chunksize=2))
+
+
+def test_complete_columns(coordinates):
+    columns = {key: coordinates[key].to_numpy() for key in coordinates}
+    with pytest.raises(ValueError):
+        complete_columns(columns, 1, None)
+    template = dict(kindz=1, npart=10, xmass=[1.0], name="template")
+    columns = complete_columns(columns, 1, template)
+    assert (columns["xpoint2"] == columns["xpoint1"]).all()
+    assert (columns["stop"] == columns["start"]).all()
+    assert columns["name"] == "template"
+    assert columns["xmass"].shape == (3, 1)
+
+
+def test_complete_columns_xmass(coordinates):
+    columns = {key: coordinates[key].to_numpy() for key in coordinates}
+    template = dict(kindz=1, npart=10, xmass=[1.0, 2.0], name="template")
+    with pytest.raises(ValueError):
+        complete_columns(dict(columns, xmass=np.ones(3)), 2, template)
+    with pytest.raises(ValueError):
+        complete_columns(dict(columns, xmass1=np.ones(3)), 2, template)
+    with pytest.raises(ValueError):
+        complete_columns(
+            dict(columns, xmass1=np.ones(3), xmass3=np.ones(3)), 2, template
+        )
+    completed = complete_columns(
+        dict(columns, xmass1=np.ones(3), xmass2=np.zeros(3)), 2, template
+    )
+    assert completed["xmass"].tolist() == [[1.0, 0.0]] * 3
+
+
+def test_insert_coordinates_xmass_column(flexwrfinput, tmp_path, coordinates):
+    # NSPEC is 1 in the example, so a single xmass column gives one value per release
+    csv_file = tmp_path / "coordinates.csv"
+    coordinates.assign(xmass=[1.0, 2.0, 3.0]).to_csv(csv_file, index=False)
+    insert_coordinates(flexwrfinput, csv_file, chunksize=2)
+    assert flexwrfinput.releases.xmass.value == [[1.0], [2.0], [3.0]]
+
+
+def test_insert_coordinates(flexwrfinput, csv_file):
+    template_npart = flexwrfinput.releases.npart[0]
+    insert_coordinates(flexwrfinput, csv_file, chunksize=2)
+    releases = flexwrfinput.releases
+    assert releases.numpoint.value == len(releases.start) == 3
+    assert releases.start.value[2] == "20100518 130000"
+    assert releases.zpoint2.value == [10.0, 20.0, 30.0]
+    assert releases.npart.value == [template_npart] * 3
+    assert releases.xmass.array.shape == (3, releases.nspec.value)
+
+    insert_coordinates(flexwrfinput, csv_file, append=True)
+    assert releases.numpoint.value == len(releases.name) == 6